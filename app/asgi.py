@@ -0,0 +1,484 @@
+"""ASGI serving mode: ``python app/asgi.py`` (uvicorn) or any ASGI server with ``asgi:app``.
+
+Response bodies move on the event loop, so a slow download costs a coroutine
+instead of a thread. ``/analyze`` uploads are parsed on the loop as well: the
+STL part goes straight into its ingest file, which rejects a broken header
+after the first chunk, and Flask only sees the finished upload. Other
+requests with a body run on their own pool of upload threads, reading the
+body as the loop receives it, so slow uploads cannot hold the handler pool
+that serves status, download and repair requests.
+Response bodies (downloads included) are read from disk in pool threads one
+chunk at a time, and the loop waits on the client between chunks.
+``/status/<id>/events`` is streamed from the loop directly. ``/analyze``
+runs its admesh inspection through ``asyncio.create_subprocess_exec``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import io
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.datastructures import FileStorage, ImmutableMultiDict, MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+from werkzeug.wsgi import FileWrapper
+
+import main
+from session_store import clear_jobs
+
+ASGI_WORKERS = max(1, int(os.getenv("ASGI_WORKERS", "1")))
+ASGI_HANDLER_THREADS = max(1, int(os.getenv("ASGI_HANDLER_THREADS", "8")))
+ASGI_UPLOAD_THREADS = max(1, int(os.getenv("ASGI_UPLOAD_THREADS", "8")))
+ASGI_EVENT_POLL_SECONDS = max(0.05, float(os.getenv("ASGI_EVENT_POLL_SECONDS", "0.25")))
+BODY_BUFFER_BYTES = 1024 * 1024
+BODY_CHUNK_BYTES = 1024 * 1024
+EVENTS_PATH = re.compile(r"^/status/([^/]+)/events$")
+
+handler_pool = ThreadPoolExecutor(ASGI_HANDLER_THREADS, thread_name_prefix="asgi-handler")
+# Requests that stream a body block on it; they never take a handler thread.
+upload_pool = ThreadPoolExecutor(ASGI_UPLOAD_THREADS, thread_name_prefix="asgi-upload")
+
+
+class ChunkedFileWrapper(FileWrapper):
+    """``wsgi.file_wrapper`` that reads 1 MiB at a time, so each pool hop moves a useful amount."""
+
+    def __init__(self, file, buffer_size: int = 8192) -> None:
+        super().__init__(file, max(buffer_size, BODY_CHUNK_BYTES))
+
+
+def build_environ(scope: dict, body) -> dict:
+    server_name, server_port = scope.get("server") or ("localhost", main.PORT)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": ASGI_WORKERS > 1,
+        "wsgi.run_once": False,
+        "wsgi.file_wrapper": ChunkedFileWrapper,
+    }
+    for raw_name, raw_value in scope["headers"]:
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        key = name if name in ("CONTENT_TYPE", "CONTENT_LENGTH") else f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def send_simple(send, status: int, headers: list, body: bytes) -> None:
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_flask_response(send, response) -> None:
+    headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.to_wsgi_list()]
+    await send_simple(send, response.status_code, headers, response.get_data())
+
+
+def declared_length(scope: dict) -> int | None:
+    declared = dict(scope["headers"]).get(b"content-length")
+    return int(declared) if declared is not None and declared.isdigit() else None
+
+
+def has_body(scope: dict) -> bool:
+    headers = dict(scope["headers"])
+    return b"transfer-encoding" in headers or (declared_length(scope) or 0) > 0
+
+
+def body_too_large(scope: dict) -> bool:
+    limit = main.MAX_CONTENT_LENGTH
+    declared = declared_length(scope)
+    return bool(limit and declared is not None and declared > limit)
+
+
+async def send_too_large(send) -> None:
+    await send_simple(
+        send,
+        413,
+        [(b"content-type", b"application/json")],
+        f'{{"error": "Upload exceeds the {main.MAX_CONTENT_LENGTH} byte limit."}}'.encode(),
+    )
+
+
+class StreamedBody:
+    """``wsgi.input`` that the event loop fills while a handler thread reads it.
+
+    Flask starts on the first byte, so multipart uploads go straight into their
+    final file (an STL header is checked before the rest arrives) instead of
+    being spooled first. The loop stops reading from the client while
+    BODY_BUFFER_BYTES are waiting. Werkzeug's LimitedStream enforces
+    MAX_CONTENT_LENGTH on top of it and turns a disconnect into a 400.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.cond = threading.Condition()
+        self.chunks: collections.deque[bytes] = collections.deque()
+        self.buffered = 0
+        self.eof = False
+        self.error: str | None = None
+        self.closed = False
+        self.room = asyncio.Event()
+        self.room.set()
+
+    def feed(self, data: bytes) -> None:
+        """Loop side: queue one chunk from the client."""
+        with self.cond:
+            self.chunks.append(data)
+            self.buffered += len(data)
+            if self.buffered >= BODY_BUFFER_BYTES:
+                self.room.clear()
+            self.cond.notify_all()
+
+    def finish(self, error: str | None = None) -> None:
+        """Loop side: the body is complete, or the client went away with ``error``."""
+        with self.cond:
+            self.eof = True
+            self.error = error
+            self.cond.notify_all()
+
+    def read(self, size: int = -1) -> bytes:
+        """Handler side: at least one byte unless the body is over; all of it for ``size < 0``."""
+        with self.cond:
+            if size < 0:
+                parts: list[bytes] = []
+                while True:
+                    parts.extend(self.chunks)
+                    self.take_all()
+                    if self.eof:
+                        break
+                    self.cond.wait()
+                data = b"".join(parts)
+            else:
+                while not self.chunks and not self.eof:
+                    self.cond.wait()
+                if not self.chunks:
+                    data = b""
+                else:
+                    data = self.chunks.popleft()
+                    if len(data) > size:
+                        self.chunks.appendleft(data[size:])
+                        data = data[:size]
+                    self.buffered -= len(data)
+                    self.wake_loop()
+            if not data and self.error is not None:
+                raise OSError(self.error)
+            return data
+
+    def take_all(self) -> None:
+        self.chunks.clear()
+        self.buffered = 0
+        self.wake_loop()
+
+    def wake_loop(self) -> None:
+        if self.buffered < BODY_BUFFER_BYTES and not self.room.is_set():
+            self.loop.call_soon_threadsafe(self.room.set)
+
+    def close(self) -> None:
+        with self.cond:
+            if not self.eof:
+                self.eof, self.error = True, "request closed"
+            self.closed = True
+            self.chunks.clear()
+            self.buffered = 0
+            self.cond.notify_all()
+        self.room.set()
+
+
+async def pump_body(receive, body: StreamedBody, disconnected: asyncio.Event) -> None:
+    """Feed the request into ``body``, then keep watching for the client going away."""
+    while True:
+        await body.room.wait()
+        if body.closed:
+            # The handler answered without reading the rest of the body.
+            break
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            body.finish("client disconnected")
+            disconnected.set()
+            return
+        body.feed(message.get("body", b""))
+        if not message.get("more_body", False):
+            body.finish()
+            break
+    await watch_disconnect(receive, disconnected)
+
+
+async def watch_disconnect(receive, disconnected: asyncio.Event) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            disconnected.set()
+            return
+
+
+async def call_flask(scope: dict, receive, send) -> None:
+    """Run one Flask request on the handler pool and stream both bodies from the loop."""
+    loop = asyncio.get_running_loop()
+    body = StreamedBody(loop)
+    environ = build_environ(scope, body)
+    started: dict = {}
+
+    def start_response(status: str, headers: list, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+        return None
+
+    disconnected = asyncio.Event()
+    pump = asyncio.create_task(pump_body(receive, body, disconnected))
+    iterable = None
+    pool = upload_pool if has_body(scope) else handler_pool
+    try:
+        iterable = await loop.run_in_executor(pool, main.app, environ, start_response)
+        await send({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+        chunks = iter(iterable)
+        while not disconnected.is_set():
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        pump.cancel()
+        body.close()
+        close = getattr(iterable, "close", None)
+        if close is not None:
+            await asyncio.to_thread(close)
+
+
+async def send_json_error(send, status: int, message: str) -> None:
+    with main.app.app_context():
+        response = main.app.make_response((main.jsonify({"error": message}), status))
+    await send_flask_response(send, response)
+
+
+async def receive_analyze_form(scope: dict, receive, send) -> tuple[MultiDict, MultiDict] | None:
+    """Parse an /analyze multipart body on the loop; (form, files), or None once the client is answered or gone.
+
+    The ``file`` part, if it names an STL, is written into an ingest stream
+    as it arrives; other file parts are dropped, keeping only their names so
+    the route can report them.
+    """
+    _mimetype, options = parse_options_header(dict(scope["headers"]).get(b"content-type", b"").decode("latin-1"))
+    decoder = MultipartDecoder(
+        options.get("boundary", "").encode("latin-1"), main.app.config.get("MAX_FORM_MEMORY_SIZE")
+    )
+    form, files = MultiDict(), MultiDict()
+    stream = None
+    target: str | None = None  # field name, "" for the STL part, None for a dropped file
+    field_data = bytearray()
+    pending: list[bytes] = []
+    pending_size = 0
+    limit = main.MAX_CONTENT_LENGTH
+    received = 0
+    finished = False
+    try:
+        while not finished:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                if stream is not None:
+                    stream.discard()
+                return None
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if limit and received > limit:
+                if stream is not None:
+                    stream.discard()
+                await send_too_large(send)
+                return None
+            more = message.get("more_body", False)
+            decoder.receive_data(chunk)
+            if not more:
+                decoder.receive_data(None)
+            while not isinstance(event := decoder.next_event(), NeedData):
+                if isinstance(event, Epilogue):
+                    finished = True
+                    break
+                if isinstance(event, Field):
+                    target, field_data = event.name, bytearray()
+                elif isinstance(event, File):
+                    if event.name == "file" and stream is None and main.allowed_repair_file(event.filename):
+                        stream = main.open_ingest_stream(declared_length(scope))
+                        files.add("file", FileStorage(stream, event.filename, "file", headers=event.headers))
+                        target = ""
+                    else:
+                        files.add(event.name, FileStorage(io.BytesIO(), event.filename, event.name))
+                        target = None
+                elif isinstance(event, Data):
+                    if target == "":
+                        pending.append(event.data)
+                        pending_size += len(event.data)
+                    elif target is not None:
+                        field_data += event.data
+                        if not event.more_data:
+                            form.add(target, field_data.decode("utf-8", "replace"))
+            # Write at once until the ingest stream has checked the STL header, then in 1 MiB batches.
+            if pending and (pending_size >= BODY_CHUNK_BYTES or stream.ascii is None or finished or not more):
+                data = b"".join(pending)
+                pending, pending_size = [], 0
+                await asyncio.to_thread(stream.write, data)
+            if not more and not finished:
+                raise ValueError("Unexpected end of form data.")
+    except main.InvalidUpload as exc:
+        await send_json_error(send, 400, exc.description)
+        return None
+    except ValueError as exc:
+        if stream is not None:
+            stream.discard()
+        await send_json_error(send, 400, f"Malformed upload: {exc}")
+        return None
+    return form, files
+
+
+def stage_analyze(environ: dict, form: MultiDict, files: MultiDict):
+    """Store an /analyze upload parsed on the loop inside a Flask request context."""
+    ctx = main.app.request_context(environ)
+    ctx.request.__dict__.update(form=ImmutableMultiDict(form), files=ImmutableMultiDict(files))
+    with ctx:
+        try:
+            staged, error = main.receive_analyze_upload()
+        except HTTPException as exc:
+            staged, error = None, main.app.handle_user_exception(exc)
+        return staged, (main.app.make_response(error) if error else None)
+
+
+def finish_analyze(staged: tuple, inspection: tuple):
+    with main.app.app_context():
+        return main.app.make_response(main.jsonify(main.create_analyze_session(*staged, inspection=inspection)))
+
+
+async def analyze(scope: dict, receive, send) -> None:
+    parsed = await receive_analyze_form(scope, receive, send)
+    if parsed is None:
+        return
+    loop = asyncio.get_running_loop()
+    staged, error = await loop.run_in_executor(
+        handler_pool, stage_analyze, build_environ(scope, io.BytesIO()), *parsed
+    )
+    if error is not None:
+        await send_flask_response(send, error)
+        return
+    _session_id, session_dir, input_path, file_digest, inspector = staged
+    try:
+        _key, cached = await loop.run_in_executor(handler_pool, main.cached_inspection, file_digest, inspector)
+        inspection = None if cached else await main.inspect_mesh_async(input_path, inspector)
+        response = await loop.run_in_executor(handler_pool, finish_analyze, staged, inspection)
+    except Exception:
+        main.remove_session_files(str(session_dir))
+        raise
+    await send_flask_response(send, response)
+
+
+async def session_events(scope: dict, receive, send, session_id: str) -> None:
+    """``/status/<id>/events`` on the event loop: store reads hop to a thread, waits do not."""
+    sess = await asyncio.to_thread(main.get_session, session_id)
+    if not sess:
+        await send_simple(send, 404, [(b"content-type", b"application/json")], b'{"error": "Session not found"}')
+        return
+    try:
+        resume_from = int(dict(scope["headers"]).get(b"last-event-id", b"").decode("latin-1"))
+    except ValueError:
+        resume_from = None
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+    disconnected = asyncio.Event()
+    watcher = asyncio.create_task(watch_disconnect(receive, disconnected))
+    messages = main.session_event_stream(session_id, sess, resume_from, wait_seconds=0)
+    try:
+        while not disconnected.is_set():
+            message = await asyncio.to_thread(next, messages, StopIteration)
+            if message is StopIteration:
+                break
+            if message:
+                await send({"type": "http.response.body", "body": message.encode("utf-8"), "more_body": True})
+            else:
+                try:
+                    await asyncio.wait_for(disconnected.wait(), timeout=ASGI_EVENT_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        watcher.cancel()
+        messages.close()
+
+
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            main.start_background_services()
+            await send({"type": "lifespan.startup.complete"})
+            # uvicorn binds its socket after startup completes.
+            main.start_warm_up(main.PORT)
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope: dict, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    events = EVENTS_PATH.match(scope["path"])
+    if events and scope["method"] == "GET":
+        await session_events(scope, receive, send, events.group(1))
+        return
+    if body_too_large(scope):
+        await send_too_large(send)
+        return
+    content_type = dict(scope["headers"]).get(b"content-type", b"")
+    if scope["path"] == "/analyze" and scope["method"] == "POST" and content_type.startswith(b"multipart/form-data"):
+        await analyze(scope, receive, send)
+        return
+    await call_flask(scope, receive, send)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    if ASGI_WORKERS > 1:
+        # Several processes only work with a store they all share.
+        os.environ.setdefault("SESSION_STORE", "sqlite")
+    main.ensure_dirs()
+    # No worker from an earlier run survives a restart; drop their scheduler jobs.
+    clear_jobs(main.SESSION_DB_PATH)
+    uvicorn.run(
+        "asgi:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host="0.0.0.0",
+        port=main.PORT,
+        workers=ASGI_WORKERS,
+        loop="asyncio",
+    )
@@ -0,0 +1,27 @@
+import os
+import tempfile
+from pathlib import Path
+
+wsgi_app = "wsgi:app"
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = max(1, int(os.getenv("WEB_WORKERS", "2")))
+# Threads per worker; each open /status/<id>/events stream holds one.
+threads = max(1, int(os.getenv("WEB_THREADS", "16")))
+worker_class = "gthread"
+accesslog = "-"
+
+
+def on_starting(server):
+    # No worker from an earlier run survives a master restart; drop their scheduler jobs.
+    from session_store import clear_jobs
+
+    default_db = Path(tempfile.gettempdir()) / "manifixer-sessions" / "sessions.sqlite3"
+    clear_jobs(Path(os.getenv("SESSION_DB_PATH", str(default_db))))
+
+
+def post_worker_init(worker):
+    # The master bound the port before forking, so the worker can warm up now.
+    from main import start_warm_up
+
+    start_warm_up()
@@ -1,39 +1,161 @@
 from __future__ import annotations
 
+import asyncio
+import cProfile
+import ctypes
+import ctypes.util
+import fcntl
+import functools
+import gzip
+import heapq
+import importlib.metadata
+import io
+import itertools
+import json
+import multiprocessing
 import os
+import pstats
 import queue
 import re
+import resource
+import select
 import shutil
+import socket
+import sqlite3
+import struct
 import subprocess
+import sys
 import tempfile
 import threading
 import time
 import uuid
-from collections import deque
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from hashlib import sha256
-from pathlib import Path
-
-from flask import Flask, jsonify, render_template_string, request, send_file
-import trimesh
+from pathlib import Path, PurePosixPath
+from types import ModuleType
+from typing import Callable
+
+from flask import Flask, Request, Response, jsonify, render_template, request, send_file
+from jinja2 import DictLoader
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+from werkzeug.http import parse_content_range_header
 from werkzeug.utils import secure_filename
 
+from metrics import (
+    BYTES_PER_SECOND_BUCKETS,
+    RATIO_BUCKETS,
+    SECONDS_BUCKETS,
+    TRIANGLE_BUCKETS,
+    Histogram,
+    render_sample,
+)
+from session_store import MemorySessionStore, SqliteSessionStore
+
+# trimesh and native_mesh (numpy) are imported inside the functions that use
+# them, so watch-only and admesh-only processes start without loading them.
+
+
+def native_mesh_module() -> ModuleType:
+    """The numpy mesh engine, imported on first use."""
+    import native_mesh
+    return native_mesh
+
+
+try:
+    import zstandard
+except ImportError:  # zstd delivery is optional; gzip always works
+    zstandard = None
+
 APP_TITLE = "Manifixer"
 INPUT_DIR = Path(os.getenv("INPUT_DIR", "/data/input"))
 OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", "/data/output"))
 POLL_SECONDS = int(os.getenv("POLL_SECONDS", "30"))
+WATCH_BACKEND = os.getenv("WATCH_BACKEND", "auto").strip().lower()
+LEDGER_PATH = Path(os.getenv("LEDGER_PATH", str(OUTPUT_DIR / ".manifixer-ledger.sqlite3")))
 WATCH_MODE = os.getenv("WATCH_MODE", "1") == "1"
+WATCH_RECURSIVE = os.getenv("WATCH_RECURSIVE", "1") == "1"
+WATCH_CONVERT_BACK = os.getenv("WATCH_CONVERT_BACK", "0") == "1"
 PORT = int(os.getenv("PORT", "8080"))
 SESSION_ROOT = Path(tempfile.gettempdir()) / "manifixer-sessions"
 WATCH_WORKERS = max(1, int(os.getenv("WATCH_WORKERS", "1")))
+# admesh and the native engine are single-threaded; leave one core for the web tier.
+SCHEDULER_WORKERS = max(1, int(os.getenv("SCHEDULER_WORKERS", str(max(1, (os.cpu_count() or 2) - 1)))))
+SCHEDULER_MAX_PENDING = max(1, int(os.getenv("SCHEDULER_MAX_PENDING", "32")))
 SESSION_TTL_SECONDS = max(60, int(os.getenv("SESSION_TTL_SECONDS", "7200")))
 CLEANUP_SECONDS = max(30, int(os.getenv("CLEANUP_SECONDS", "300")))
 STABILITY_CHECK_SECONDS = max(1, int(os.getenv("STABILITY_CHECK_SECONDS", "3")))
 STABILITY_MAX_WAIT_SECONDS = max(
     STABILITY_CHECK_SECONDS, int(os.getenv("STABILITY_MAX_WAIT_SECONDS", "120"))
 )
+WATCH_QUEUE_SIZE = max(1, int(os.getenv("WATCH_QUEUE_SIZE", "16")))
 MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "40"))
-MAX_SESSION_LOG_CHARS = int(os.getenv("MAX_SESSION_LOG_CHARS", "60000"))
+MAX_CONTENT_LENGTH = max(0, int(os.getenv("MAX_CONTENT_LENGTH", str(2 * 1024 * 1024 * 1024))))
+OUTPUT_PRECOMPRESS = os.getenv("OUTPUT_PRECOMPRESS", "1") == "1"
+OUTPUT_COMPRESS_AT_REST = os.getenv("OUTPUT_COMPRESS_AT_REST", "0") == "1"
+PRECOMPRESS_MIN_BYTES = max(0, int(os.getenv("PRECOMPRESS_MIN_BYTES", "65536")))
+OUTPUT_ENCODING_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+OUTPUT_ENCODINGS = [
+    encoding
+    for encoding in (item.strip().lower() for item in os.getenv("OUTPUT_ENCODINGS", "zstd,gzip").split(","))
+    if encoding == "gzip" or (encoding == "zstd" and zstandard is not None)
+]
+# 3MF is already a zip container; everything else the converter writes compresses well.
+PRECOMPRESS_EXTENSIONS = {"stl", "obj", "ply", "off", "glb"}
+USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "0") == "1"
+MAX_UPLOAD_BYTES = max(1, int(os.getenv("MAX_UPLOAD_BYTES", str(8 * 1024 * 1024 * 1024))))
+UPLOAD_CHUNK_READ_BYTES = 1024 * 1024
+MAX_BATCH_FILES = max(1, int(os.getenv("MAX_BATCH_FILES", "500")))
+CONVERT_ASYNC_MIN_BYTES = max(0, int(os.getenv("CONVERT_ASYNC_MIN_BYTES", str(16 * 1024 * 1024))))
+CONVERT_PROCESSES = max(1, int(os.getenv("CONVERT_PROCESSES", str(SCHEDULER_WORKERS))))
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+PROFILE_WATCH_JOBS = os.getenv("PROFILE_WATCH_JOBS", "0") == "1"
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(OUTPUT_DIR / ".manifixer-profiles")))
+PROFILE_TOP_FUNCTIONS = 20
+MAX_SESSION_LOG_BYTES = max(1024, int(os.getenv("MAX_SESSION_LOG_BYTES", os.getenv("MAX_SESSION_LOG_CHARS", "60000"))))
+SESSION_EVENT_BACKLOG = 256
+SESSION_EVENT_FIELDS = (
+    "status",
+    "stage",
+    "issues_current",
+    "metrics_current",
+    "remaining_errors",
+    "quality_report",
+    "output_name",
+    "artifacts",
+    "conversion_errors",
+    "timings",
+)
+SSE_HEARTBEAT_SECONDS = 15
+# Each WSGI progress stream holds a server thread, so keep some threads free for other requests.
+SSE_MAX_STREAMS = max(1, int(os.getenv("SSE_MAX_STREAMS", str(max(1, int(os.getenv("WEB_THREADS", "16")) // 2)))))
+SSE_MAX_STREAM_SECONDS = max(5, int(os.getenv("SSE_MAX_STREAM_SECONDS", "60")))
+SSE_RETRY_MS = 1000
+SSE_BUSY_RETRY_MS = 5000
+# "sqlite" shares sessions, uploads and stats between the worker processes of a WSGI server.
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").strip().lower()
+if SESSION_STORE not in {"memory", "sqlite"}:
+    SESSION_STORE = "memory"
+SESSION_DB_PATH = Path(os.getenv("SESSION_DB_PATH", str(SESSION_ROOT / "sessions.sqlite3")))
 ADMESH_TIMEOUT_SECONDS = int(os.getenv("ADMESH_TIMEOUT_SECONDS", "180"))
+INSPECT_BACKENDS = {"admesh", "native"}
+INSPECT_BACKEND = os.getenv("INSPECT_BACKEND", "admesh").strip().lower()
+if INSPECT_BACKEND not in INSPECT_BACKENDS:
+    INSPECT_BACKEND = "admesh"
+REPAIR_BACKENDS = {"admesh", "native"}
+REPAIR_BACKEND = os.getenv("REPAIR_BACKEND", "admesh").strip().lower()
+if REPAIR_BACKEND not in REPAIR_BACKENDS:
+    REPAIR_BACKEND = "admesh"
+NATIVE_MIN_SHELL_FACES = max(1, int(os.getenv("NATIVE_MIN_SHELL_FACES", "4")))
+REPAIR_SESSION_MODES = {"fast", "diagnostic"}
+REPAIR_SESSION_MODE = os.getenv("REPAIR_SESSION_MODE", "fast").strip().lower()
+if REPAIR_SESSION_MODE not in REPAIR_SESSION_MODES:
+    REPAIR_SESSION_MODE = "fast"
+CACHE_DIR = Path(os.getenv("CACHE_DIR", str(Path(tempfile.gettempdir()) / "manifixer-cache")))
+CACHE_MAX_BYTES = max(0, int(os.getenv("CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024))))
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") == "1" and CACHE_MAX_BYTES > 0
 
 REPAIR_ALLOWED_EXTENSIONS = {"stl"}
 CONVERTER_ALLOWED_EXTENSIONS = {"3mf", "stl", "obj", "ply", "off", "glb"}
@@ -48,6 +170,54 @@ CONVERTER_EXPORT_TYPES = {
 CONVERTER_SCENE_TARGETS = {"3mf", "glb"}
 DEFAULT_CONVERTER_TARGET = "stl"
 PROCESSED_SUFFIX = ".fixed.stl"
+STL_HEADER_BYTES = 84
+STL_FACET_BYTES = 50
+STL_SNIFF_BYTES = 512
+STREAMING_INGEST_ENDPOINTS = {"analyze_upload", "repair_upload"}
+# inotify(7) constants.
+IN_CLOEXEC = 0o2000000
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_EVENT_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+# Filesystems where changes made by other hosts never raise local inotify events.
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "fuse.sshfs", "ceph", "glusterfs"}
+INSPECT_FLAGS = ["--exact"]
+REPAIR_FLAGS = [
+    "--exact",
+    "--normal-directions",
+    "--remove-unconnected",
+    "--fill-holes",
+    "--nearby",
+    "--tolerance=0.01",
+    "--iterations=2",
+]
+REPAIR_STAGE_PLAN = [
+    {
+        "name": "Fix normal directions",
+        "flags": ["--exact", "--normal-directions"],
+        "resolves": ["flipped_normals"],
+    },
+    {
+        "name": "Remove disconnected shells",
+        "flags": ["--remove-unconnected"],
+        "resolves": ["disconnected_shells"],
+    },
+    {
+        "name": "Fill holes/open boundaries",
+        "flags": ["--fill-holes"],
+        "resolves": ["holes_open_boundaries"],
+    },
+    {
+        "name": "Repair nearby/non-manifold edges",
+        "flags": ["--nearby", "--tolerance=0.01", "--iterations=2"],
+        "resolves": ["non_manifold_edges"],
+    },
+]
 
 HTML = """
 <!doctype html>
@@ -443,6 +613,10 @@ HTML = """
         <h2>2) Errors Detected</h2>
         <div id="issuesGrid" class="issues"></div>
         <div class="row" style="margin-top:0.9rem;">
+          <select id="repairMode">
+            <option value="fast">Fast (single pass)</option>
+            <option value="diagnostic" {% if repair_mode == "diagnostic" %}selected{% endif %}>Diagnostic (per stage)</option>
+          </select>
           <button id="repairBtn" type="button" disabled>Repair</button>
           <span id="statusPill" class="status-pill">idle</span>
         </div>
@@ -503,12 +677,14 @@ HTML = """
       const state = {
         sessionId: null,
         initialTotal: 0,
-        polling: null
+        events: null,
+        view: null
       };
 
       const fileInput = document.getElementById("fileInput");
       const analyzeBtn = document.getElementById("analyzeBtn");
       const repairBtn = document.getElementById("repairBtn");
+      const repairMode = document.getElementById("repairMode");
       const analyzeMsg = document.getElementById("analyzeMsg");
       const issuesCard = document.getElementById("issuesCard");
       const issuesGrid = document.getElementById("issuesGrid");
@@ -537,7 +713,7 @@ HTML = """
           statusPill.classList.add("bad");
           return;
         }
-        if (statusText === "repairing" || statusText === "starting repair" || statusText === "analyzed") {
+        if (statusText === "repairing" || statusText === "queued" || statusText === "starting repair" || statusText === "analyzed") {
           statusPill.classList.add("active");
         }
       }
@@ -590,14 +766,37 @@ HTML = """
         ].join("\\n");
       }
 
-      async function pollStatus() {
+      function stopStatusEvents() {
+        if (state.events) state.events.close();
+        state.events = null;
+      }
+
+      function watchStatus() {
+        stopStatusEvents();
         if (!state.sessionId) return;
-        const res = await fetch(`/status/${state.sessionId}`);
-        if (!res.ok) return;
+        const events = new EventSource(`/status/${state.sessionId}/events`);
+        events.addEventListener("snapshot", (event) => {
+          state.view = JSON.parse(event.data);
+          renderStatus(state.view);
+        });
+        events.addEventListener("update", (event) => {
+          if (!state.view) return;
+          const { logs_append: appended, logs_reset: reset, ...changes } = JSON.parse(event.data);
+          if (reset) state.view.logs = reset;
+          if (appended) state.view.logs = [...(state.view.logs || []), ...appended];
+          Object.assign(state.view, changes);
+          renderStatus(state.view);
+        });
+        state.events = events;
+      }
 
-        const data = await res.json();
+      function renderStatus(data) {
         renderIssues(data.issues_current || {});
-        statusPill.textContent = `${data.status}${data.stage ? " | " + data.stage : ""}`;
+        if (data.queue_position) {
+          statusPill.textContent = `queued | position ${data.queue_position}`;
+        } else {
+          statusPill.textContent = `${data.status}${data.stage ? " | " + data.stage : ""}`;
+        }
         setStatusTone(data.status);
 
         const remaining = Number(data.remaining_errors || 0);
@@ -608,8 +807,7 @@ HTML = """
         renderQualityReport(data.quality_report);
 
         if (data.status === "completed") {
-          clearInterval(state.polling);
-          state.polling = null;
+          stopStatusEvents();
           progressFill.style.width = "100%";
           resultCard.style.display = "";
           if ((data.remaining_errors || 0) === 0) {
@@ -623,8 +821,7 @@ HTML = """
         }
 
         if (data.status === "failed") {
-          clearInterval(state.polling);
-          state.polling = null;
+          stopStatusEvents();
           resultCard.style.display = "";
           resultMsg.textContent = "Repair failed. See logs for details.";
           downloadBtn.style.display = "none";
@@ -632,6 +829,46 @@ HTML = """
         }
       }
 
+      const CHUNKED_UPLOAD_THRESHOLD = 64 * 1024 * 1024;
+      const UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024;
+
+      async function chunkedAnalyze(file) {
+        const created = await fetch("/uploads", {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ filename: file.name, size: file.size }),
+        });
+        const upload = await created.json();
+        if (!created.ok) return { res: created, data: upload };
+
+        let offset = upload.offset;
+        let failures = 0;
+        while (offset < file.size) {
+          const end = Math.min(offset + UPLOAD_CHUNK_BYTES, file.size);
+          try {
+            const res = await fetch(`/uploads/${upload.upload_id}`, {
+              method: "PUT",
+              headers: { "Content-Range": `bytes ${offset}-${end - 1}/${file.size}` },
+              body: file.slice(offset, end),
+            });
+            const data = await res.json();
+            if (res.status === 400 || res.status === 404) return { res, data };
+            offset = data.offset ?? offset;
+            failures = 0;
+          } catch (err) {
+            if (++failures > 5) throw err;
+            await new Promise((resolve) => setTimeout(resolve, 1000 * failures));
+            const status = await fetch(`/uploads/${upload.upload_id}`).then((r) => r.json());
+            offset = status.offset ?? offset;
+          }
+          analyzeMsg.textContent = `Uploading... ${Math.floor((offset / file.size) * 100)}%`;
+        }
+
+        analyzeMsg.textContent = "Analyzing mesh...";
+        const res = await fetch(`/uploads/${upload.upload_id}/finalize`, { method: "POST" });
+        return { res, data: await res.json() };
+      }
+
       analyzeBtn.addEventListener("click", async () => {
         const file = (fileInput.files && fileInput.files[0]) ? fileInput.files[0] : null;
         if (!file) {
@@ -639,6 +876,7 @@ HTML = """
           return;
         }
 
+        stopStatusEvents();
         analyzeBtn.disabled = true;
         repairBtn.disabled = true;
         analyzeMsg.textContent = "Analyzing mesh...";
@@ -649,8 +887,14 @@ HTML = """
         form.append("file", file);
 
         try {
-          const res = await fetch("/analyze", { method: "POST", body: form });
-          const data = await res.json();
+          let res;
+          let data;
+          if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+            ({ res, data } = await chunkedAnalyze(file));
+          } else {
+            res = await fetch("/analyze", { method: "POST", body: form });
+            data = await res.json();
+          }
 
           if (!res.ok) {
             analyzeMsg.textContent = data.error || "Analyze failed.";
@@ -685,7 +929,9 @@ HTML = """
         logsCard.style.display = "";
         logs.textContent = "";
 
-        const res = await fetch(`/repair/${state.sessionId}`, { method: "POST" });
+        const form = new FormData();
+        form.append("mode", repairMode.value);
+        const res = await fetch(`/repair/${state.sessionId}`, { method: "POST", body: form });
         const data = await res.json();
 
         if (!res.ok) {
@@ -697,9 +943,7 @@ HTML = """
           return;
         }
 
-        if (state.polling) clearInterval(state.polling);
-        state.polling = setInterval(pollStatus, 1000);
-        pollStatus();
+        watchStatus();
       });
 
       convertBtn.addEventListener("click", async () => {
@@ -726,6 +970,25 @@ HTML = """
             return;
           }
 
+          if (res.status === 202) {
+            // Large files are converted as a background job; poll it, then link the result.
+            let job = await res.json();
+            while (job.status === "queued" || job.status === "converting") {
+              convertMsg.textContent = `Converting file... (${job.stage})`;
+              await new Promise((resolve) => setTimeout(resolve, 1000));
+              job = await (await fetch(job.job_url)).json();
+            }
+            if (job.status !== "completed" || !job.artifacts || !job.artifacts.length) {
+              convertMsg.textContent = job.error || Object.values(job.errors || {})[0] || "Conversion failed.";
+              return;
+            }
+            convertDownloadBtn.href = job.artifacts[0].download_url;
+            convertDownloadBtn.download = job.artifacts[0].output_name;
+            convertDownloadBtn.style.display = "inline-block";
+            convertMsg.textContent = `Converted successfully to ${target.toUpperCase()}.`;
+            return;
+          }
+
           const outputName = res.headers.get("X-Output-Name") || "converted-model";
           const blob = await res.blob();
           const objectUrl = URL.createObjectURL(blob);
@@ -747,21 +1010,129 @@ HTML = """
 """
 
 app = Flask(__name__)
-sessions: dict[str, dict] = {}
-sessions_lock = threading.Lock()
-watch_queue: queue.Queue[tuple[Path, float]] = queue.Queue()
+# Compiled on first render (or by warm_up) and then reused, instead of on every request.
+app.jinja_loader = DictLoader({"index.html": HTML})
+app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH or None
+app.config["USE_X_SENDFILE"] = USE_X_SENDFILE
+upload_streams: dict[str, StlIngestStream] = {}
+upload_streams_lock = threading.Lock()
+sse_streams = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+watch_queue: queue.Queue[tuple[Path, float, float]] = queue.Queue(maxsize=WATCH_QUEUE_SIZE)
+pending_files: dict[Path, dict] = {}
+pending_lock = threading.Lock()
+pending_wakeup = threading.Event()
 queued_versions: dict[Path, float] = {}
 queued_versions_lock = threading.Lock()
-session_order: deque[str] = deque()
-stats_lock = threading.Lock()
-stats = {
-    "analyze_requests": 0,
-    "repair_requests": 0,
-    "repair_success": 0,
-    "repair_failed": 0,
-    "watch_processed": 0,
-    "watch_failed": 0,
-}
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+scheduler_cond = threading.Condition()
+scheduler_heap: list[tuple[int, int, str]] = []
+scheduler_jobs: dict[str, dict] = {}
+scheduler_seq = itertools.count()
+scheduler_state = {"running": 0, "started": False}
+# How often a waiting scheduler re-checks the store for slots freed by other processes.
+SCHEDULER_POLL_SECONDS = 0.25
+watch_state = {"backend": None}
+convert_pool_lock = threading.Lock()
+convert_pool_state: dict[str, ProcessPoolExecutor | int | None] = {"pool": None, "busy": 0}
+step_usage = threading.local()
+# Python 3.12+ allows one active cProfile per process; concurrent profiled jobs skip profiling.
+profile_lock = threading.Lock()
+background_lock = threading.Lock()
+background_state: dict[str, object] = {"started": False, "warmed": False, "watch_lock": None}
+ledger_lock = threading.Lock()
+ledger_state: dict[str, sqlite3.Connection | None] = {"conn": None}
+cache_lock = threading.Lock()
+STAT_KEYS = [
+    "analyze_requests",
+    "repair_requests",
+    "repair_success",
+    "repair_failed",
+    "watch_processed",
+    "watch_failed",
+    "cache_hits",
+    "cache_misses",
+]
+if SESSION_STORE == "sqlite":
+    session_store = SqliteSessionStore(
+        SESSION_DB_PATH,
+        MAX_SESSIONS,
+        MAX_SESSION_LOG_BYTES,
+        SESSION_EVENT_FIELDS,
+        SESSION_EVENT_BACKLOG,
+        STAT_KEYS,
+    )
+else:
+    session_store = MemorySessionStore(
+        MAX_SESSIONS, MAX_SESSION_LOG_BYTES, SESSION_EVENT_FIELDS, SESSION_EVENT_BACKLOG, STAT_KEYS
+    )
+
+mesh_operation_seconds = Histogram(
+    "manifixer_mesh_operation_seconds",
+    "Wall time of one inspection or repair run (an admesh process or the native backend).",
+    ("backend", "operation", "stage"),
+    SECONDS_BUCKETS,
+    session_store.add_metrics,
+)
+repair_session_seconds = Histogram(
+    "manifixer_repair_session_seconds",
+    "Wall time of a web repair session from start to completion or failure.",
+    ("mode", "backend", "status"),
+    SECONDS_BUCKETS,
+    session_store.add_metrics,
+)
+conversion_seconds = Histogram(
+    "manifixer_conversion_seconds",
+    "Wall time of a conversion by source and target format (targets converted together share one run).",
+    ("source", "target"),
+    SECONDS_BUCKETS,
+    session_store.add_metrics,
+)
+watch_queue_wait_seconds = Histogram(
+    "manifixer_watch_queue_wait_seconds",
+    "Time a settled watch-folder file waited in the watch queue.",
+    (),
+    SECONDS_BUCKETS,
+    session_store.add_metrics,
+)
+scheduler_wait_seconds = Histogram(
+    "manifixer_scheduler_wait_seconds",
+    "Time a job waited in the repair scheduler before a worker picked it up.",
+    ("priority",),
+    SECONDS_BUCKETS,
+    session_store.add_metrics,
+)
+worker_utilization_ratio = Histogram(
+    "manifixer_worker_utilization_ratio",
+    "Share of a worker pool busy when it starts a job, including that job.",
+    ("pool",),
+    RATIO_BUCKETS,
+    session_store.add_metrics,
+)
+upload_bytes_per_second = Histogram(
+    "manifixer_upload_bytes_per_second",
+    "Request body receive rate of uploads by endpoint.",
+    ("endpoint",),
+    BYTES_PER_SECOND_BUCKETS,
+    session_store.add_metrics,
+)
+input_triangles = Histogram(
+    "manifixer_input_triangles",
+    "Triangle count of inspected input meshes by pipeline.",
+    ("pipeline",),
+    TRIANGLE_BUCKETS,
+    session_store.add_metrics,
+)
+METRIC_HISTOGRAMS = [
+    mesh_operation_seconds,
+    repair_session_seconds,
+    conversion_seconds,
+    watch_queue_wait_seconds,
+    scheduler_wait_seconds,
+    worker_utilization_ratio,
+    upload_bytes_per_second,
+    input_triangles,
+]
 
 ISSUE_PATTERNS = {
     "non_manifold_edges": [
@@ -784,12 +1155,25 @@ ISSUE_PATTERNS = {
     ],
 }
 PARTS_PATTERN = re.compile(r"number of parts\s*:\s*(\d+)", flags=re.IGNORECASE)
+# "Number of facets : 1280 1276" rows of the Original/Final facet status table.
+ADMESH_STATUS_ROW_PATTERN = re.compile(
+    r"^\s*([a-z][a-z0-9 ]*?)\s*:\s*(\d+)\s+(\d+)\s*$", flags=re.IGNORECASE | re.MULTILINE
+)
+# Progress lines admesh prints as it enters each repair step of a combined run.
+ADMESH_PROGRESS_STAGES = [
+    ("checking normal directions", "Fix normal directions"),
+    ("removing unconnected", "Remove disconnected shells"),
+    ("filling holes", "Fill holes/open boundaries"),
+    ("checking nearby", "Repair nearby/non-manifold edges"),
+]
 
 
 def ensure_dirs() -> None:
     INPUT_DIR.mkdir(parents=True, exist_ok=True)
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     SESSION_ROOT.mkdir(parents=True, exist_ok=True)
+    if CACHE_ENABLED:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def file_extension(filename: str) -> str:
@@ -806,52 +1190,21 @@ def allowed_converter_file(filename: str) -> bool:
     return file_extension(filename) in CONVERTER_ALLOWED_EXTENSIONS
 
 
-def increment_stat(key: str) -> None:
-    with stats_lock:
-        stats[key] = int(stats.get(key, 0)) + 1
+def allowed_watch_file(filename: str) -> bool:
+    return not filename.startswith(".") and allowed_converter_file(filename)
 
 
-def trim_logs(logs: list[str]) -> list[str]:
-    joined = "\n\n".join(logs)
-    if len(joined) <= MAX_SESSION_LOG_CHARS:
-        return logs
-    keep_tail = joined[-MAX_SESSION_LOG_CHARS:]
-    marker = "[trimmed older logs]\n"
-    return [f"{marker}{keep_tail}"]
+def increment_stat(key: str) -> None:
+    session_store.incr_stat(key)
 
 
 def cleanup_expired_sessions(now: float | None = None) -> None:
     cutoff = (now or time.time()) - SESSION_TTL_SECONDS
-    expired: list[str] = []
-    with sessions_lock:
-        for sid, sess in sessions.items():
-            last_touch = float(sess.get("updated_at", sess.get("created_at", 0)))
-            if last_touch < cutoff:
-                expired.append(sid)
-
-        for sid in expired:
-            sess = sessions.pop(sid, None)
-            if sess:
-                try:
-                    shutil.rmtree(sess.get("session_dir", ""), ignore_errors=True)
-                except Exception:
-                    pass
-            try:
-                session_order.remove(sid)
-            except ValueError:
-                pass
-
-
-def enforce_session_limit() -> None:
-    while len(session_order) > MAX_SESSIONS:
-        oldest_id = session_order.popleft()
-        sess = sessions.pop(oldest_id, None)
-        if not sess:
-            continue
-        try:
-            shutil.rmtree(sess.get("session_dir", ""), ignore_errors=True)
-        except Exception:
-            pass
+    for sess in session_store.expire(cutoff):
+        shutil.rmtree(sess.get("session_dir", ""), ignore_errors=True)
+    for up in session_store.expire_uploads(cutoff):
+        close_upload_stream(up["upload_id"])
+        shutil.rmtree(up["session_dir"], ignore_errors=True)
 
 
 def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
@@ -865,45 +1218,796 @@ def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
     return digest.hexdigest()
 
 
-def run_repair(input_file: Path, output_file: Path) -> tuple[bool, str]:
-    """Run admesh in an aggressive repair configuration for 3D-printable meshes."""
-    cmd = [
-        "admesh",
-        "--write-binary-stl",
-        str(output_file),
-        "--exact",
-        "--normal-directions",
-        "--remove-unconnected",
-        "--fill-holes",
-        "--nearby",
-        "--tolerance=0.01",
-        "--iterations=2",
-        str(input_file),
-    ]
+@functools.lru_cache(maxsize=1)
+def libcrypto() -> ctypes.CDLL | None:
+    try:
+        lib = ctypes.CDLL(ctypes.util.find_library("crypto") or "libcrypto.so.3")
+        for name in ("SHA256_Init", "SHA256_Update", "SHA256_Final"):
+            getattr(lib, name).restype = ctypes.c_int
+        lib.SHA256_Update.argtypes = (ctypes.c_void_p, ctypes.c_char_p, ctypes.c_size_t)
+    except (OSError, AttributeError):
+        return None
+    return lib
+
+
+class ResumableSha256:
+    """sha256 whose running state is plain bytes, through OpenSSL's SHA256_* functions.
+
+    hashlib objects cannot be saved, so a chunked upload keeps this state in
+    the session store and whichever worker takes the next chunk carries on
+    hashing from it. Build with ``ResumableSha256.available()`` checked first.
+    """
+
+    # sizeof(SHA256_CTX) is 112; the spare bytes only guard against a larger layout.
+    CTX_BYTES = 128
+
+    def __init__(self, state: bytes | None = None) -> None:
+        self.lib = libcrypto()
+        self.ctx = ctypes.create_string_buffer(self.CTX_BYTES)
+        if state is None:
+            self.lib.SHA256_Init(self.ctx)
+        else:
+            ctypes.memmove(self.ctx, state, min(len(state), self.CTX_BYTES))
+
+    @staticmethod
+    def available() -> bool:
+        return libcrypto() is not None
+
+    def update(self, data: bytes) -> None:
+        self.lib.SHA256_Update(self.ctx, bytes(data), len(data))
+
+    def state(self) -> bytes:
+        return self.ctx.raw
+
+    def hexdigest(self) -> str:
+        ctx = ctypes.create_string_buffer(self.ctx.raw, self.CTX_BYTES)
+        out = ctypes.create_string_buffer(32)
+        self.lib.SHA256_Final(out, ctx)
+        return out.raw.hex()
+
+
+class InvalidUpload(BadRequest):
+    """Raised while the body is still streaming in; aborts the rest of the upload."""
+
+
+class StlIngestStream:
+    """Upload sink that writes, hashes and sanity-checks an STL file in one pass.
+
+    Werkzeug's multipart parser writes each chunk here as it arrives, so the
+    file is never spooled twice and a broken binary header is rejected after
+    the first few hundred bytes instead of after the whole body.
+
+    Chunked uploads pass a ResumableSha256 ``digest`` that covers the first
+    ``digest_offset`` bytes already on disk; on ``resume`` only the header and
+    the bytes after that offset are read back.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        total_content_length: int | None,
+        validate: bool = True,
+        resume: bool = False,
+        digest=None,
+        digest_offset: int = 0,
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.total_content_length = total_content_length
+        self.fh = path.open("r+b" if resume and path.exists() else "w+b")
+        self.digest = digest if digest is not None else sha256()
+        self.size = 0
+        self.head = bytearray()
+        # Non-STL uploads (chunked converter inputs) skip the header checks.
+        self.ascii: bool | None = None if validate else True
+        self.expected_size: int | None = None
+        if resume:
+            # Another worker process may have written the bytes so far: re-check the header,
+            # then hash whatever the saved digest does not cover yet.
+            self.absorb(self.fh.read(STL_SNIFF_BYTES), hashed=False)
+            self.fh.seek(digest_offset)
+            while data := self.fh.read(UPLOAD_CHUNK_READ_BYTES):
+                self.digest.update(data)
+            self.size = self.fh.tell()
+
+    def write(self, data: bytes) -> int:
+        self.fh.write(data)
+        return self.absorb(data)
+
+    def absorb(self, data: bytes, hashed: bool = True) -> int:
+        if hashed:
+            self.digest.update(data)
+        self.size += len(data)
+        if self.ascii is None and len(self.head) < STL_SNIFF_BYTES:
+            self.head += data[: STL_SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= STL_SNIFF_BYTES:
+                self.sniff()
+        if self.expected_size is not None and self.size > self.expected_size:
+            self.reject("Binary STL is longer than its facet count.")
+        return len(data)
+
+    def sniff(self) -> None:
+        head = bytes(self.head)
+        self.ascii = head.lstrip().startswith(b"solid") and b"\0" not in head
+        if self.ascii:
+            return
+        if len(head) < STL_HEADER_BYTES:
+            self.reject("File is too small to be an STL.")
+        (facets,) = struct.unpack_from("<I", head, 80)
+        if facets == 0:
+            self.reject("Binary STL declares no facets.")
+        self.expected_size = STL_HEADER_BYTES + STL_FACET_BYTES * facets
+        if self.total_content_length is not None and self.total_content_length < self.expected_size:
+            self.reject("Upload is shorter than its binary STL facet count.")
+
+    def reject(self, message: str) -> None:
+        self.discard()
+        raise InvalidUpload(message)
+
+    def finish(self) -> str:
+        """Validate the complete upload, close it and return its sha256."""
+        if self.ascii is None:
+            self.sniff()
+        if self.expected_size is not None and self.size != self.expected_size:
+            self.reject("Binary STL is truncated.")
+        self.fh.close()
+        return self.digest.hexdigest()
+
+    def discard(self) -> None:
+        self.fh.close()
+        self.path.unlink(missing_ok=True)
+
+    def __getattr__(self, name: str):
+        return getattr(self.fh, name)
+
+
+def open_ingest_stream(total_content_length: int | None) -> StlIngestStream:
+    """A fresh ingest file under SESSION_ROOT/.incoming for one uploaded STL."""
+    return StlIngestStream(SESSION_ROOT / ".incoming" / uuid.uuid4().hex, total_content_length)
+
+
+class StreamingIngestRequest(Request):
+    def _load_form_data(self) -> None:
+        loaded = "form" in self.__dict__
+        started = time.perf_counter()
+        super()._load_form_data()
+        elapsed = time.perf_counter() - started
+        if not loaded and self.files and self.content_length and elapsed > 0:
+            upload_bytes_per_second.observe(self.content_length / elapsed, endpoint=self.endpoint or "")
+
+    def _get_file_stream(
+        self,
+        total_content_length: int | None,
+        content_type: str | None,
+        filename: str | None = None,
+        content_length: int | None = None,
+    ):
+        if self.endpoint in STREAMING_INGEST_ENDPOINTS and filename and allowed_repair_file(filename):
+            return open_ingest_stream(total_content_length)
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+
+app.request_class = StreamingIngestRequest
+
+
+def ingest_upload(upload, destination: Path) -> str:
+    """Move an uploaded STL to ``destination`` and return its sha256 without re-reading it."""
+    stream = upload.stream
+    if isinstance(stream, StlIngestStream):
+        digest = stream.finish()
+        shutil.move(stream.path, destination)
+        return digest
+    upload.save(destination)
+    return file_sha256(destination)
+
+
+def discard_upload(upload) -> None:
+    if isinstance(upload.stream, StlIngestStream):
+        upload.stream.discard()
+
+
+@app.errorhandler(InvalidUpload)
+def invalid_upload(exc: InvalidUpload):
+    return jsonify({"error": exc.description}), 400
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(_exc: RequestEntityTooLarge):
+    return jsonify({"error": f"Upload exceeds the {MAX_CONTENT_LENGTH} byte limit."}), 413
+
+
+def output_variant(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + OUTPUT_ENCODING_SUFFIXES[encoding])
+
+
+def output_variants(path: Path) -> dict[str, Path]:
+    """Precompressed copies of ``path`` that are at least as new as the original, by encoding."""
+    try:
+        original_mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        original_mtime = None
+    variants = {}
+    for encoding in OUTPUT_ENCODINGS:
+        variant = output_variant(path, encoding)
+        try:
+            variant_mtime = variant.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+        if original_mtime is None or variant_mtime >= original_mtime:
+            variants[encoding] = variant
+    return variants
+
+
+def output_exists(path: Path) -> bool:
+    """True when ``path`` exists as-is or only as a compressed-at-rest copy."""
+    return path.exists() or bool(output_variants(path))
+
+
+def compress_file(source: Path, destination: Path, encoding: str) -> None:
+    temp = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with source.open("rb") as src, temp.open("wb") as raw:
+            if encoding == "zstd":
+                with zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            else:
+                with gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=6, mtime=0) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(temp, destination)
+    finally:
+        temp.unlink(missing_ok=True)
+
+
+def precompress_output(path: Path, at_rest: bool = False) -> None:
+    """Write a compressed copy of ``path`` per OUTPUT_ENCODINGS; with ``at_rest`` drop the original."""
+    if not OUTPUT_PRECOMPRESS or not OUTPUT_ENCODINGS or file_extension(path.name) not in PRECOMPRESS_EXTENSIONS:
+        return
+    try:
+        if path.stat().st_size < PRECOMPRESS_MIN_BYTES:
+            return
+        for encoding in OUTPUT_ENCODINGS:
+            compress_file(path, output_variant(path, encoding), encoding)
+    except Exception as exc:
+        print(f"[COMPRESS ERROR] {path.name}: {exc}", flush=True)
+        return
+    if at_rest:
+        path.unlink(missing_ok=True)
+
+
+def stream_decompressed(variant: Path, encoding: str, chunk_size: int = 1024 * 1024):
+    with variant.open("rb") as raw:
+        reader = zstandard.ZstdDecompressor().stream_reader(raw) if encoding == "zstd" else gzip.GzipFile(fileobj=raw)
+        with reader:
+            while True:
+                chunk = reader.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+@functools.lru_cache(maxsize=512)
+def cached_file_sha256(path: str, size: int, mtime_ns: int) -> str:
+    """sha256 of an output file, memoized per (path, size, mtime) so repeat downloads skip rehashing."""
+    return file_sha256(Path(path))
+
+
+def send_output(path: Path):
+    """Send a finished output with a strong content-hash ETag.
+
+    A precompressed copy is chosen by Accept-Encoding when one exists; each
+    representation has its own ETag. Werkzeug answers If-None-Match with 304
+    and Range/If-Range with 206 for GET/HEAD. The body goes through
+    ``wsgi.file_wrapper`` (kernel sendfile under gunicorn) or an X-Sendfile
+    header when USE_X_SENDFILE is set.
+    """
+    variants = output_variants(path)
+    encoding = request.accept_encodings.best_match(list(variants)) if variants else None
+    body = variants[encoding] if encoding else path
+    if not body.exists():
+        # Compressed at rest and the client takes none of our encodings: inflate on the fly.
+        encoding, variant = next(iter(variants.items()))
+        response = Response(stream_decompressed(variant, encoding), mimetype="application/octet-stream")
+        response.headers["Content-Disposition"] = f'attachment; filename="{path.name}"'
+    else:
+        stat = body.stat()
+        response = send_file(
+            body,
+            as_attachment=True,
+            download_name=path.name,
+            conditional=True,
+            etag=cached_file_sha256(str(body), stat.st_size, stat.st_mtime_ns),
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    if variants:
+        response.vary.add("Accept-Encoding")
+    response.headers["X-Output-Name"] = path.name
+    return response
+
+
+@functools.lru_cache(maxsize=1)
+def admesh_version() -> str:
+    try:
+        proc = subprocess.run(["admesh", "--version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return "admesh-unknown"
+    text = ((proc.stdout or "") + "\n" + (proc.stderr or "")).strip()
+    return text.splitlines()[0].strip() if text else "admesh-unknown"
+
+
+def cache_key(file_digest: str, pipeline: str, flags: list[str], engine: str | None = None) -> str:
+    """Key a cached result by input content, pipeline + flag set and engine version."""
+    material = json.dumps([file_digest, pipeline, list(flags), engine or admesh_version()])
+    return sha256(material.encode("utf-8")).hexdigest()
+
+
+def cache_entry_dir(key: str) -> Path:
+    return CACHE_DIR / key[:2] / key
+
+
+def cache_get(key: str) -> dict | None:
+    if not CACHE_ENABLED:
+        return None
+    entry_dir = cache_entry_dir(key)
+    meta_path = entry_dir / "meta.json"
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        artifact_name = meta.get("artifact")
+        if artifact_name and not (entry_dir / artifact_name).exists():
+            raise FileNotFoundError(artifact_name)
+        # meta.json mtime doubles as the LRU timestamp.
+        os.utime(meta_path)
+    except (OSError, ValueError):
+        increment_stat("cache_misses")
+        return None
+    increment_stat("cache_hits")
+    return meta
+
+
+def cache_put(key: str, payload: dict, artifact: Path | None = None) -> None:
+    if not CACHE_ENABLED:
+        return
+    entry_dir = cache_entry_dir(key)
+    staging = entry_dir.parent / f".{key}.{uuid.uuid4().hex}.tmp"
+    try:
+        staging.mkdir(parents=True, exist_ok=True)
+        meta = dict(payload)
+        meta["artifact"] = None
+        if artifact is not None:
+            artifact_name = f"artifact{''.join(artifact.suffixes[-1:])}"
+            shutil.copyfile(artifact, staging / artifact_name)
+            meta["artifact"] = artifact_name
+        meta["cached_at"] = time.time()
+        (staging / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        with cache_lock:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            staging.rename(entry_dir)
+    except OSError as exc:
+        print(f"[CACHE ERROR] could not store {key}: {exc}", flush=True)
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    evict_cache()
+
+
+def cache_restore_artifact(key: str, meta: dict, destination: Path) -> bool:
+    artifact_name = meta.get("artifact")
+    if not artifact_name:
+        return False
+    try:
+        shutil.copyfile(cache_entry_dir(key) / artifact_name, destination)
+    except OSError:
+        return False
+    return True
+
+
+def evict_cache() -> None:
+    """Drop least recently used cache entries until the cache fits CACHE_MAX_BYTES."""
+    with cache_lock:
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        for meta_path in CACHE_DIR.glob("*/*/meta.json"):
+            entry_dir = meta_path.parent
+            try:
+                size = sum(p.stat().st_size for p in entry_dir.iterdir() if p.is_file())
+                last_used = meta_path.stat().st_mtime
+            except OSError:
+                continue
+            entries.append((last_used, size, entry_dir))
+            total += size
+
+        entries.sort()
+        for _last_used, size, entry_dir in entries:
+            if total <= CACHE_MAX_BYTES:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+
+
+@contextmanager
+def timed_step(timings: list[dict] | None, step: str):
+    """Append the block's wall time, CPU time and peak RSS to ``timings`` (a no-op for None).
+
+    ``cpu_seconds`` is this thread's CPU time (Python, numpy and trimesh work).
+    admesh processes started inside the block report their own CPU time and
+    peak RSS, read from ``wait4`` by run_admesh_command. ``max_rss_bytes`` is
+    the server process's peak so far.
+    """
+    if timings is None:
+        yield
+        return
+    parent = getattr(step_usage, "current", None)
+    usage = {"child_cpu_seconds": 0.0, "child_max_rss_bytes": 0}
+    step_usage.current = usage
+    wall_started, cpu_started = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        step_usage.current = parent
+        if parent is not None:
+            parent["child_cpu_seconds"] += usage["child_cpu_seconds"]
+            parent["child_max_rss_bytes"] = max(parent["child_max_rss_bytes"], usage["child_max_rss_bytes"])
+        timings.append(
+            {
+                "step": step,
+                "wall_seconds": round(time.perf_counter() - wall_started, 4),
+                "cpu_seconds": round(time.thread_time() - cpu_started, 4),
+                "child_cpu_seconds": round(usage["child_cpu_seconds"], 4),
+                "child_max_rss_bytes": usage["child_max_rss_bytes"],
+                "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            }
+        )
+
+
+def record_child_usage(usage: resource.struct_rusage) -> None:
+    current = getattr(step_usage, "current", None)
+    if current is not None:
+        current["child_cpu_seconds"] += usage.ru_utime + usage.ru_stime
+        current["child_max_rss_bytes"] = max(current["child_max_rss_bytes"], usage.ru_maxrss * 1024)
 
+
+def format_timings(timings: list[dict]) -> str:
+    return ", ".join(
+        f"{item['step']} {item['wall_seconds']:.2f}s (cpu {item['cpu_seconds']:.2f}s"
+        + (f", admesh cpu {item['child_cpu_seconds']:.2f}s" if item["child_cpu_seconds"] else "")
+        + f", rss {item['max_rss_bytes'] // (1024 * 1024)} MiB)"
+        for item in timings
+    )
+
+
+@contextmanager
+def profiled(dump_path: Path | None):
+    """cProfile the Python side of the block (this thread only) into ``dump_path``; None disables it.
+
+    Yields the path when a profile is being written, or None when profiling is
+    off or another job holds the profiler.
+    """
+    if dump_path is None or not profile_lock.acquire(blocking=False):
+        if dump_path is not None:
+            print(f"[PROFILE] profiler busy; not profiling {dump_path.name}", flush=True)
+        yield None
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield dump_path
+        finally:
+            profiler.disable()
+            dump_path.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(dump_path))
+    finally:
+        profile_lock.release()
+
+
+def profile_summary(dump_path: Path, limit: int = PROFILE_TOP_FUNCTIONS) -> list[str]:
+    """The ``limit`` functions with the highest cumulative time, as pstats prints them."""
+    out = io.StringIO()
+    pstats.Stats(str(dump_path), stream=out).sort_stats("cumulative").print_stats(limit)
+    return [line.rstrip() for line in out.getvalue().splitlines() if line.strip()]
+
+
+def profile_fields(session_id: str, dump_path: Path | None) -> dict:
+    """Session fields pointing at a job's profile dump (none when it was not profiled)."""
+    if dump_path is None or not dump_path.exists():
+        return {}
+    return {"profile_url": f"/status/{session_id}/profile", "profile_top": profile_summary(dump_path)}
+
+
+def run_admesh_command(cmd: list[str], on_line: Callable[[str], None] | None = None) -> tuple[int | None, str]:
+    """Run one admesh process with merged stdout/stderr.
+
+    Output lines are passed to ``on_line`` as they arrive. The return code is
+    None when admesh could not be started or was killed by the timeout.
+    """
+    if on_line is not None and shutil.which("stdbuf"):
+        # admesh block-buffers stdout when piped; line buffering keeps progress live.
+        cmd = ["stdbuf", "-oL", *cmd]
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=ADMESH_TIMEOUT_SECONDS)
-        logs = (proc.stdout or "") + "\n" + (proc.stderr or "")
-        return proc.returncode == 0 and output_file.exists(), logs.strip()
-    except subprocess.TimeoutExpired:
-        return False, f"admesh timed out after {ADMESH_TIMEOUT_SECONDS}s"
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except OSError as exc:
+        return None, f"could not start admesh: {exc}"
+
+    timed_out = threading.Event()
+
+    def kill_on_timeout() -> None:
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(ADMESH_TIMEOUT_SECONDS, kill_on_timeout)
+    timer.start()
+    lines: list[str] = []
+    try:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            lines.append(line)
+            if on_line is not None:
+                on_line(line.rstrip())
+        # wait4 instead of wait(): it also returns this child's own CPU time and peak RSS.
+        _pid, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        record_child_usage(usage)
+    finally:
+        timer.cancel()
+
+    output = "".join(lines).strip()
+    if timed_out.is_set():
+        return None, f"{output}\nadmesh timed out after {ADMESH_TIMEOUT_SECONDS}s".strip()
+    return proc.returncode, output
+
+
+async def run_admesh_command_async(cmd: list[str]) -> tuple[int | None, str]:
+    """``run_admesh_command`` for the ASGI server: the event loop waits on admesh, not a thread."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+    except OSError as exc:
+        return None, f"could not start admesh: {exc}"
+    try:
+        stdout, _stderr = await asyncio.wait_for(proc.communicate(), timeout=ADMESH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        proc.kill()
+        stdout, _stderr = await proc.communicate()
+        output = stdout.decode("utf-8", errors="replace").strip()
+        return None, f"{output}\nadmesh timed out after {ADMESH_TIMEOUT_SECONDS}s".strip()
+    return proc.returncode, stdout.decode("utf-8", errors="replace").strip()
+
+
+def run_repair(input_file: Path, output_file: Path, backend: str | None = None) -> tuple[bool, str]:
+    """Run the aggressive repair configuration for 3D-printable meshes on one backend."""
+    engine = repair_backend(backend)
+    try:
+        mesh = engine.load(input_file)
+    except Exception as exc:
+        return False, f"could not load mesh: {exc}"
+    ok, logs, mesh = engine.run_stage(mesh, REPAIR_FLAGS, output_file)
+    if ok:
+        engine.save(mesh, output_file)
+    return ok and output_file.exists(), logs
 
 
 def run_admesh_inspect(mesh_file: Path) -> str:
-    cmd = ["admesh", "--exact", str(mesh_file)]
+    cmd = ["admesh", *INSPECT_FLAGS, str(mesh_file)]
+    _returncode, logs = run_admesh_command(cmd)
+    return logs
+
+
+def run_native_inspect(mesh_file: Path) -> tuple[str, dict[str, int], dict[str, int | None]]:
+    """Inspect a mesh in-process from its edge table instead of spawning admesh."""
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=ADMESH_TIMEOUT_SECONDS)
-        return ((proc.stdout or "") + "\n" + (proc.stderr or "")).strip()
-    except subprocess.TimeoutExpired:
-        return f"admesh inspect timed out after {ADMESH_TIMEOUT_SECONDS}s"
+        result = native_mesh_module().inspect_file(mesh_file)
+    except Exception as exc:
+        text = f"native inspect failed: {exc}"
+        return text, parse_issue_counts(text), parse_mesh_metrics(text)
+    return native_inspect_report(result)
 
 
-def convert_mesh(input_file: Path, output_file: Path, target_format: str) -> None:
-    fmt = target_format.lower()
-    export_type = CONVERTER_EXPORT_TYPES.get(fmt)
-    if not export_type:
-        raise ValueError(f"Unsupported target format: {target_format}")
+def native_inspect_report(result: dict[str, int]) -> tuple[str, dict[str, int], dict[str, int | None]]:
+    issues = {
+        "non_manifold_edges": result["non_manifold_edges"],
+        "holes_open_boundaries": result["open_edges"],
+        "flipped_normals": result["inconsistent_edges"],
+        "disconnected_shells": max(0, result["shells"] - 1),
+    }
+    metrics = {"triangle_count": result["facets"], "part_count": result["shells"]}
+    # Same "label : value" layout as admesh so parse_issue_counts reads it back identically.
+    text = "\n".join(
+        [
+            f"Native inspector ({native_mesh_module().ENGINE_VERSION})",
+            f"Number of facets     : {result['facets']}",
+            f"Degenerate facets    : {result['degenerate_facets']}",
+            f"Number of parts      : {result['shells']}",
+            f"Disconnected shells  : {issues['disconnected_shells']}",
+            f"Non-manifold edges   : {result['non_manifold_edges']}",
+            f"Open edges           : {result['open_edges']}",
+            f"Inconsistent normals : {result['inconsistent_edges']}",
+        ]
+    )
+    return text, issues, metrics
+
+
+def inspect_mesh(mesh_file: Path, inspector: str | None = None) -> tuple[str, dict[str, int], dict[str, int | None]]:
+    """Return (report text, issues, metrics) from the selected inspector."""
+    inspector = inspector or INSPECT_BACKEND
+    with mesh_operation_seconds.time(backend=inspector, operation="inspect"):
+        if inspector == "native":
+            return run_native_inspect(mesh_file)
+        text = run_admesh_inspect(mesh_file)
+    return text, parse_issue_counts(text), parse_mesh_metrics(text)
+
+
+async def inspect_mesh_async(
+    mesh_file: Path, inspector: str | None = None
+) -> tuple[str, dict[str, int], dict[str, int | None]]:
+    inspector = inspector or INSPECT_BACKEND
+    with mesh_operation_seconds.time(backend=inspector, operation="inspect"):
+        if inspector == "native":
+            return await asyncio.to_thread(run_native_inspect, mesh_file)
+        _returncode, text = await run_admesh_command_async(["admesh", *INSPECT_FLAGS, str(mesh_file)])
+    return text, parse_issue_counts(text), parse_mesh_metrics(text)
+
+
+def inspector_engine(inspector: str | None = None) -> str:
+    if (inspector or INSPECT_BACKEND) == "native":
+        return native_mesh_module().ENGINE_VERSION
+    return admesh_version()
+
+
+class AdmeshRepairBackend:
+    """Repair with the admesh CLI; the mesh between steps is an STL path on disk."""
+
+    name = "admesh"
+
+    def engine(self) -> str:
+        return admesh_version()
+
+    def load(self, mesh_file: Path) -> Path:
+        return mesh_file
+
+    def run_stage(
+        self,
+        mesh: Path,
+        flags: list[str],
+        output_file: Path,
+        on_line: Callable[[str], None] | None = None,
+        stage: str | None = None,
+    ) -> tuple[bool, str, Path]:
+        """One admesh run with ``flags``; ``stage`` names a diagnostic-mode stage."""
+        with mesh_operation_seconds.time(
+            backend=self.name, operation="stage" if stage else "repair", stage=stage or ""
+        ):
+            returncode, logs = run_admesh_command(build_stage_cmd(mesh, output_file, flags), on_line=on_line)
+        return returncode == 0 and output_file.exists(), logs, output_file
+
+    def inspect(
+        self, mesh: Path, inspector: str | None = None
+    ) -> tuple[str, dict[str, int], dict[str, int | None]]:
+        return inspect_mesh(mesh, inspector)
+
+    def repair_results(
+        self, mesh: Path, logs: str
+    ) -> tuple[dict[str, int], dict[str, int | None], dict[str, int | None]]:
+        return parse_admesh_results(logs)
+
+    def save(self, mesh: Path, output_file: Path) -> None:
+        if mesh != output_file:
+            shutil.copyfile(mesh, output_file)
+
+
+class NativeRepairBackend:
+    """Repair in-process with numpy; the mesh between steps stays as (vertices, faces) arrays.
+
+    Stage output paths are ignored until save(), and inspection always runs on
+    the in-memory arrays whatever inspector was requested.
+    """
+
+    name = "native"
+
+    def engine(self) -> str:
+        return native_mesh_module().ENGINE_VERSION
+
+    def load(self, mesh_file: Path) -> tuple:
+        return native_mesh_module().load_mesh_arrays(mesh_file)
+
+    def run_stage(
+        self,
+        mesh: tuple,
+        flags: list[str],
+        output_file: Path,
+        on_line: Callable[[str], None] | None = None,
+        stage: str | None = None,
+    ) -> tuple[bool, str, tuple]:
+        try:
+            with mesh_operation_seconds.time(
+                backend=self.name, operation="stage" if stage else "repair", stage=stage or ""
+            ):
+                vertices, faces, lines = native_mesh_module().repair_arrays(
+                    *mesh, flags, min_shell_faces=NATIVE_MIN_SHELL_FACES, on_line=on_line
+                )
+        except Exception as exc:
+            return False, f"native repair failed: {exc}", mesh
+        return True, "\n".join(lines), (vertices, faces)
+
+    def inspect(
+        self, mesh: tuple, inspector: str | None = None
+    ) -> tuple[str, dict[str, int], dict[str, int | None]]:
+        with mesh_operation_seconds.time(backend=self.name, operation="inspect"):
+            return native_inspect_report(native_mesh_module().inspect_arrays(*mesh))
+
+    def repair_results(
+        self, mesh: tuple, logs: str
+    ) -> tuple[dict[str, int], dict[str, int | None], dict[str, int | None]]:
+        _text, issues, metrics = self.inspect(mesh)
+        return issues, metrics, {"triangle_count": None, "part_count": None}
+
+    def save(self, mesh: tuple, output_file: Path) -> None:
+        native_mesh_module().write_binary_stl(output_file, *mesh)
+
+
+REPAIR_BACKEND_ENGINES = {
+    "admesh": AdmeshRepairBackend(),
+    "native": NativeRepairBackend(),
+}
 
+
+def repair_backend(name: str | None = None) -> AdmeshRepairBackend | NativeRepairBackend:
+    return REPAIR_BACKEND_ENGINES[name or REPAIR_BACKEND]
+
+
+@functools.lru_cache(maxsize=1)
+def converter_engine() -> str:
+    """Cache-key engine for conversions; reads trimesh's version without importing it."""
+    return f"trimesh-{importlib.metadata.version('trimesh')}+{native_mesh_module().CONVERTER_VERSION}"
+
+
+def convert_mesh(input_file: Path, output_file: Path, target_format: str) -> None:
+    with conversion_seconds.time(source=file_extension(input_file.name), target=target_format.lower()):
+        errors = convert_mesh_targets(input_file, {target_format.lower(): output_file})
+    if errors:
+        raise ValueError(next(iter(errors.values())))
+
+
+def convert_mesh_targets(input_file: Path, outputs: dict[str, Path]) -> dict[str, str]:
+    """Parse ``input_file`` once and export it to every ``{format: path}`` target in parallel.
+
+    Returns an error message per format that failed; raises ValueError when
+    the input itself cannot be read.
+    """
+    for fmt in outputs:
+        if fmt not in CONVERTER_EXPORT_TYPES:
+            raise ValueError(f"Unsupported target format: {fmt}")
+    source = load_conversion_source(input_file, set(outputs))
+    if len(outputs) == 1:
+        results = [export_conversion(source, fmt, path) for fmt, path in outputs.items()]
+    else:
+        with ThreadPoolExecutor(max_workers=len(outputs), thread_name_prefix="convert") as pool:
+            results = list(pool.map(lambda item: export_conversion(source, *item), outputs.items()))
+    return {fmt: error for fmt, error in zip(outputs, results) if error}
+
+
+def load_conversion_source(input_file: Path, formats: set[str]) -> dict:
+    """Load what the requested targets need, once.
+
+    Binary STL is memory-mapped; vertices are merged only when a non-STL target
+    needs them, and a trimesh scene is built from those arrays only for 3MF/GLB.
+    Anything else is read by trimesh.
+    """
+    native_mesh = native_mesh_module()
+    facets = native_mesh.open_binary_stl(input_file) if file_extension(input_file.name) == "stl" else None
+    if facets is not None:
+        if len(facets) == 0:
+            raise ValueError("Input model does not contain triangle faces.")
+        source: dict = {"facets": facets, "arrays": None, "mesh": None, "scene": None}
+        if formats - {"stl"}:
+            source["arrays"] = native_mesh.weld_stl_facets(facets)
+        if formats & CONVERTER_SCENE_TARGETS:
+            import trimesh
+            vertices, faces = source["arrays"]
+            source["mesh"] = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+            source["scene"] = trimesh.Scene(source["mesh"])
+        return source
+
+    import trimesh
     try:
         loaded = trimesh.load(str(input_file), force="scene")
     except Exception as exc:
@@ -922,15 +2026,25 @@ def convert_mesh(input_file: Path, output_file: Path, target_format: str) -> Non
 
     if mesh is None or len(mesh.faces) == 0:
         raise ValueError("Input model does not contain triangle faces.")
+    return {"facets": None, "arrays": None, "mesh": mesh, "scene": scene}
+
 
-    target = scene if fmt in CONVERTER_SCENE_TARGETS else mesh
+def export_conversion(source: dict, fmt: str, output_file: Path) -> str | None:
+    """Write one target from a loaded source; returns an error message or None."""
     try:
-        target.export(file_obj=str(output_file), file_type=export_type)
+        if fmt in CONVERTER_SCENE_TARGETS:
+            source["scene"].export(file_obj=str(output_file), file_type=CONVERTER_EXPORT_TYPES[fmt])
+        elif source["facets"] is not None and fmt == "stl":
+            native_mesh_module().write_stl_facets(output_file, source["facets"])
+        elif source["arrays"] is not None:
+            native_mesh_module().MESH_WRITERS[fmt](output_file, *source["arrays"])
+        else:
+            source["mesh"].export(file_obj=str(output_file), file_type=CONVERTER_EXPORT_TYPES[fmt])
     except Exception as exc:
-        raise ValueError(f"Could not export to {target_format}: {exc}") from exc
-
+        return f"Could not export to {fmt}: {exc}"
     if not output_file.exists() or output_file.stat().st_size == 0:
-        raise ValueError("Conversion produced an empty output file.")
+        return "Conversion produced an empty output file."
+    return None
 
 
 def parse_issue_counts(admesh_text: str) -> dict[str, int]:
@@ -975,6 +2089,11 @@ def parse_issue_counts(admesh_text: str) -> dict[str, int]:
     return issues
 
 
+def observe_input_triangles(metrics: dict[str, int | None], pipeline: str) -> None:
+    if metrics.get("triangle_count") is not None:
+        input_triangles.observe(metrics["triangle_count"], pipeline=pipeline)
+
+
 def total_errors(issues: dict[str, int]) -> int:
     return sum(max(0, int(v)) for v in issues.values())
 
@@ -997,6 +2116,41 @@ def parse_mesh_metrics(admesh_text: str) -> dict[str, int | None]:
     }
 
 
+def parse_admesh_results(admesh_text: str) -> tuple[dict[str, int], dict[str, int | None], dict[str, int | None]]:
+    """Read the after-repair state from the statistics admesh prints for its own run.
+
+    Returns (after_issues, after_metrics, before_metrics). Issue keys admesh does
+    not report on are left out so callers can keep their previous value.
+    """
+    text = admesh_text or ""
+    columns: dict[str, tuple[int, int]] = {}
+    for match in ADMESH_STATUS_ROW_PATTERN.finditer(text):
+        columns[" ".join(match.group(1).lower().split())] = (int(match.group(2)), int(match.group(3)))
+
+    def pick(pattern: str) -> int | None:
+        match = re.search(pattern, text, flags=re.IGNORECASE)
+        return int(match.group(1)) if match else None
+
+    facets = columns.get("number of facets")
+    disconnected = columns.get("total disconnected facets")
+    parts = pick(r"number of parts\s*:\s*(\d+)")
+    backwards = pick(r"backwards edges\s*:\s*(\d+)")
+
+    after_issues: dict[str, int] = {}
+    if backwards is not None:
+        # admesh sees each wrongly wound edge from both of its faces. It has no
+        # non-manifold count at all; that key is left for the caller to measure.
+        after_issues["flipped_normals"] = backwards // 2
+    if disconnected is not None:
+        after_issues["holes_open_boundaries"] = disconnected[1]
+    if parts is not None:
+        after_issues["disconnected_shells"] = max(0, parts - 1)
+
+    before_metrics = {"triangle_count": facets[0] if facets else None, "part_count": None}
+    after_metrics = {"triangle_count": facets[1] if facets else None, "part_count": parts}
+    return after_issues, after_metrics, before_metrics
+
+
 def build_quality_report(
     before_issues: dict[str, int],
     after_issues: dict[str, int],
@@ -1045,12 +2199,12 @@ def build_quality_report(
 def unique_output_path(base_dir: Path, stem: str, suffix: str) -> Path:
     safe_stem = secure_filename(stem) or "model"
     candidate = base_dir / f"{safe_stem}{suffix}"
-    if not candidate.exists():
+    if not output_exists(candidate):
         return candidate
 
-    if suffix.lower().endswith(".stl"):
-        numbered_suffix_prefix = suffix[:-4]
-        numbered_suffix_ext = ".stl"
+    numbered_suffix_prefix, dot, ext = suffix.rpartition(".")
+    if dot and file_extension(suffix) in CONVERTER_EXPORT_TYPES:
+        numbered_suffix_ext = f".{ext}"
     else:
         numbered_suffix_prefix = suffix
         numbered_suffix_ext = ""
@@ -1058,126 +2212,652 @@ def unique_output_path(base_dir: Path, stem: str, suffix: str) -> Path:
     index = 1
     while True:
         candidate = base_dir / f"{safe_stem}{numbered_suffix_prefix}.{index}{numbered_suffix_ext}"
-        if not candidate.exists():
+        if not output_exists(candidate):
             return candidate
         index += 1
 
 
-def process_one_file(source: Path) -> tuple[bool, str, Path, dict]:
+def process_one_file(
+    source: Path,
+    inspector: str | None = None,
+    backend: str | None = None,
+    file_digest: str | None = None,
+    output_dir: Path | None = None,
+    timings: list[dict] | None = None,
+    pipeline: str = "repair",
+) -> tuple[bool, str, Path, dict]:
+    """Inspect, repair and re-inspect one STL; each step is appended to ``timings`` when given.
+
+    Watch mode and /batch both go through here, so they share cache entries.
+    """
     safe_stem = secure_filename(source.stem) or "model"
-    destination = unique_output_path(OUTPUT_DIR, safe_stem, PROCESSED_SUFFIX)
-    before_inspect_logs = run_admesh_inspect(source)
-    before_issues = parse_issue_counts(before_inspect_logs)
-    before_metrics = parse_mesh_metrics(before_inspect_logs)
-    success, logs = run_repair(source, destination)
+    destination = unique_output_path(output_dir or OUTPUT_DIR, safe_stem, PROCESSED_SUFFIX)
+    with timed_step(timings, "cache_lookup"):
+        key = cache_key(
+            file_digest or file_sha256(source),
+            "repair",
+            [*REPAIR_FLAGS, f"inspector={inspector_engine(inspector)}"],
+            engine=repair_backend(backend).engine(),
+        )
+        cached = cache_get(key)
+        restored = bool(cached) and cache_restore_artifact(key, cached, destination)
+    if restored:
+        return True, f"[cache hit {key[:12]}]\n{cached.get('logs', '')}", destination, cached["quality_report"]
+
+    with timed_step(timings, "inspect"):
+        before_inspect_logs, before_issues, before_metrics = inspect_mesh(source, inspector)
+    observe_input_triangles(before_metrics, pipeline)
+    with timed_step(timings, "repair"):
+        success, logs = run_repair(source, destination, backend)
     after_issues = dict(before_issues)
     after_metrics = dict(before_metrics)
     if success:
-        after_inspect_logs = run_admesh_inspect(destination)
-        after_issues = parse_issue_counts(after_inspect_logs)
-        after_metrics = parse_mesh_metrics(after_inspect_logs)
+        with timed_step(timings, "inspect_after"):
+            after_inspect_logs, after_issues, after_metrics = inspect_mesh(destination, inspector)
 
     report = build_quality_report(before_issues, after_issues, before_metrics, after_metrics)
+    if success:
+        with timed_step(timings, "cache_store"):
+            cache_put(
+                key,
+                {
+                    "inspect_before": before_inspect_logs,
+                    "inspect_after": after_inspect_logs,
+                    "issues": after_issues,
+                    "metrics": after_metrics,
+                    "quality_report": report,
+                    "logs": logs,
+                },
+                artifact=destination,
+            )
     return success, logs, destination, report
 
 
-def is_file_stable(path: Path, stable_seconds: int, max_wait_seconds: int) -> bool:
-    started = time.time()
-    previous_size = -1
-    previous_mtime = -1.0
-    stable_for = 0.0
+def process_watch_file(
+    source: Path, file_digest: str, timings: list[dict] | None = None
+) -> tuple[bool, str, Path, dict]:
+    """Convert a watched file to STL if needed, repair it and optionally convert it back.
+
+    Runs as a single scheduler job; the output lands in the mirror of the
+    source's subdirectory under OUTPUT_DIR and is precompressed there. With
+    PROFILE_WATCH_JOBS the job's Python side is profiled into PROFILE_DIR.
+    """
+    dump_path = PROFILE_DIR / f"{secure_filename(source.name) or 'model'}.{uuid.uuid4().hex[:8]}.pstats"
+    with profiled(dump_path if PROFILE_WATCH_JOBS else None) as profile_path:
+        ok, logs, output, report = run_watch_pipeline(source, file_digest, timings)
+        if ok:
+            with timed_step(timings, "precompress"):
+                precompress_output(output, at_rest=OUTPUT_COMPRESS_AT_REST)
+    if profile_path is not None:
+        logs = f"{logs}\n[profile] {profile_path}"
+    return ok, logs, output, report
+
+
+def run_watch_pipeline(
+    source: Path, file_digest: str, timings: list[dict] | None = None
+) -> tuple[bool, str, Path, dict]:
+    output_dir = OUTPUT_DIR / source.parent.relative_to(INPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    ext = file_extension(source.name)
+    if ext == "stl":
+        return process_one_file(source, file_digest=file_digest, output_dir=output_dir, timings=timings)
+
+    with tempfile.TemporaryDirectory(prefix="manifixer-watch-") as td:
+        stl_source = Path(td) / f"{source.stem}.stl"
+        try:
+            with timed_step(timings, f"convert_{ext}_to_stl"):
+                convert_mesh(source, stl_source, "stl")
+        except ValueError as exc:
+            return False, f"[convert {ext} -> stl] {exc}", output_dir / source.name, {}
+        ok, logs, destination, report = process_one_file(stl_source, output_dir=output_dir, timings=timings)
+    logs = f"[convert {ext} -> stl]\n{logs}"
+    if not ok or not WATCH_CONVERT_BACK:
+        return ok, logs, destination, report
 
-    while time.time() - started <= max_wait_seconds:
-        if not path.exists():
-            return False
-        stat = path.stat()
-        size_now = stat.st_size
-        mtime_now = stat.st_mtime
+    safe_stem = secure_filename(source.stem) or "model"
+    converted = unique_output_path(output_dir, safe_stem, f".fixed.{ext}")
+    try:
+        with timed_step(timings, f"convert_stl_to_{ext}"):
+            convert_mesh(destination, converted, ext)
+    except ValueError as exc:
+        return False, f"{logs}\n[convert stl -> {ext}] {exc}", destination, report
+    destination.unlink(missing_ok=True)
+    return ok, f"{logs}\n[convert stl -> {ext}]", converted, report
 
-        if size_now == previous_size and mtime_now == previous_mtime:
-            stable_for += 1.0
-            if stable_for >= stable_seconds:
-                return True
+
+def ensure_scheduler_started() -> None:
+    with scheduler_cond:
+        if scheduler_state["started"]:
+            return
+        scheduler_state["started"] = True
+    for i in range(SCHEDULER_WORKERS):
+        threading.Thread(target=scheduler_worker_loop, args=(i + 1,), daemon=True).start()
+
+
+def submit_job(
+    job_id: str, fn: Callable, args: tuple = (), priority: int = PRIORITY_INTERACTIVE, block: bool = False
+) -> dict | None:
+    """Queue ``fn(*args)`` on the shared worker pool.
+
+    Lower priority values run first; jobs of equal priority run in submission
+    order. Each priority has its own SCHEDULER_MAX_PENDING waiting slots, so a
+    batch filling its share never turns interactive work away. When the
+    job's priority is full it is rejected (returns None) unless ``block`` is
+    set, in which case the caller waits for room.
+
+    The job runs in this process, but admission goes through the session
+    store: with SESSION_STORE=sqlite the caps, the SCHEDULER_WORKERS limit and
+    queue positions count the jobs of every worker process.
+    """
+    ensure_scheduler_started()
+    job = {
+        "job_id": job_id,
+        "fn": fn,
+        "args": args,
+        "priority": priority,
+        "state": "queued",
+        "enqueued_at": time.time(),
+        "done": threading.Event(),
+        "result": None,
+        "error": None,
+    }
+    with scheduler_cond:
+        while not session_store.enqueue_job(job_id, priority, SCHEDULER_MAX_PENDING):
+            if not block:
+                return None
+            scheduler_cond.wait(SCHEDULER_POLL_SECONDS)
+        scheduler_jobs[job_id] = job
+        heapq.heappush(scheduler_heap, (priority, next(scheduler_seq), job_id))
+        scheduler_cond.notify_all()
+    return job
+
+
+def run_scheduled(job_id: str, fn: Callable, args: tuple = (), priority: int = PRIORITY_BATCH):
+    """Run ``fn(*args)`` through the scheduler and wait for its result."""
+    job = submit_job(job_id, fn, args, priority, block=True)
+    assert job is not None
+    job["done"].wait()
+    if job["error"] is not None:
+        raise job["error"]
+    return job["result"]
+
+
+def job_queue_position(job_id: str) -> int | None:
+    """1-based position of a waiting job in run order across all workers, or None if it is not waiting."""
+    return session_store.job_position(job_id)
+
+
+def scheduler_snapshot() -> dict:
+    """Shared job counts; only ``running_here`` is local to this process."""
+    running, waiting = session_store.job_counts()
+    with scheduler_cond:
+        running_here = scheduler_state["running"]
+    return {
+        "workers": SCHEDULER_WORKERS,
+        "running": running,
+        "running_here": running_here,
+        "pending": sum(waiting.values()),
+        "pending_interactive": waiting.get(PRIORITY_INTERACTIVE, 0),
+        "pending_batch": waiting.get(PRIORITY_BATCH, 0),
+        "max_pending": SCHEDULER_MAX_PENDING,
+    }
+
+
+def scheduler_worker_loop(worker_id: int) -> None:
+    while True:
+        with scheduler_cond:
+            # The store decides whether this process's next job may take one of the shared slots.
+            while not scheduler_heap or not session_store.claim_job(scheduler_heap[0][2], SCHEDULER_WORKERS):
+                scheduler_cond.wait(SCHEDULER_POLL_SECONDS if scheduler_heap else None)
+            _priority, _seq, job_id = heapq.heappop(scheduler_heap)
+            job = scheduler_jobs[job_id]
+            job["state"] = "running"
+            scheduler_state["running"] += 1
+            scheduler_cond.notify_all()
+        priority = "interactive" if job["priority"] == PRIORITY_INTERACTIVE else "batch"
+        scheduler_wait_seconds.observe(time.time() - job["enqueued_at"], priority=priority)
+        busy, _waiting = session_store.job_counts()
+        worker_utilization_ratio.observe(min(1.0, busy / SCHEDULER_WORKERS), pool="scheduler")
+        try:
+            job["result"] = job["fn"](*job["args"])
+        except Exception as exc:
+            job["error"] = exc
+            print(f"[SCHEDULER #{worker_id} ERROR] {job_id}: {exc}", flush=True)
+        finally:
+            session_store.finish_job(job_id)
+            with scheduler_cond:
+                job["state"] = "done"
+                scheduler_state["running"] -= 1
+                scheduler_jobs.pop(job_id, None)
+                scheduler_cond.notify_all()
+            job["done"].set()
+
+
+def track_pending_file(path: Path, settled: bool = False) -> None:
+    """Hand ``path`` to the stability tracker; ``settled`` files skip the quiet period."""
+    now = time.time()
+    with pending_lock:
+        entry = pending_files.get(path)
+        if entry is None:
+            pending_files[path] = {
+                "size": -1,
+                "mtime": -1.0,
+                "first_seen": now,
+                "stable_since": now,
+                "settled": settled,
+            }
         else:
-            stable_for = 0.0
+            entry["settled"] = entry["settled"] or settled
+    if settled:
+        pending_wakeup.set()
 
-        previous_size = size_now
-        previous_mtime = mtime_now
-        time.sleep(1)
 
-    return False
+def check_pending_files(now: float) -> None:
+    """One tracker pass: update size/mtime history and release settled files to the workers."""
+    with pending_lock:
+        items = list(pending_files.items())
+
+    for path, entry in items:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            with pending_lock:
+                pending_files.pop(path, None)
+            continue
+
+        with pending_lock:
+            if pending_files.get(path) is not entry:
+                continue
+            if (stat.st_size, stat.st_mtime) != (entry["size"], entry["mtime"]):
+                entry["size"] = stat.st_size
+                entry["mtime"] = stat.st_mtime
+                entry["stable_since"] = now
+            quiet = now - entry["stable_since"] >= STABILITY_CHECK_SECONDS
+            ready = entry["settled"] or quiet
+            # A file that never stops changing must still age out, so check before waiting.
+            expired = not ready and now - entry["first_seen"] > STABILITY_MAX_WAIT_SECONDS
+            if expired:
+                pending_files.pop(path, None)
+        if expired:
+            print(f"[WATCHER] SKIP (unstable): {path.name}", flush=True)
+        if not ready:
+            continue
+
+        try:
+            enqueue_watch_file(path, stat.st_mtime)
+        except queue.Full:
+            # Workers are saturated; leave the rest pending until the queue drains.
+            return
+        with pending_lock:
+            pending_files.pop(path, None)
+
+
+def stability_loop() -> None:
+    while True:
+        pending_wakeup.wait(timeout=1.0)
+        pending_wakeup.clear()
+        try:
+            check_pending_files(time.time())
+        except Exception as exc:
+            print(f"[WATCHER ERROR] stability tracker: {exc}", flush=True)
+
+
+def ledger_conn() -> sqlite3.Connection:
+    """Shared ledger connection; callers must hold ledger_lock."""
+    conn = ledger_state["conn"]
+    if conn is None:
+        LEDGER_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(LEDGER_PATH), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS processed_files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                sha256 TEXT NOT NULL,
+                ok INTEGER NOT NULL,
+                output_path TEXT,
+                report TEXT,
+                processed_at REAL NOT NULL
+            )
+            """
+        )
+        conn.commit()
+        ledger_state["conn"] = conn
+    return conn
+
+
+def ledger_lookup(path: Path) -> dict | None:
+    with ledger_lock:
+        row = ledger_conn().execute(
+            "SELECT size, mtime, sha256, ok, output_path, report FROM processed_files WHERE path = ?",
+            (str(path),),
+        ).fetchone()
+    if row is None:
+        return None
+    size, mtime, digest, ok, output_path, report = row
+    return {
+        "size": size,
+        "mtime": mtime,
+        "sha256": digest,
+        "ok": bool(ok),
+        "output_path": output_path,
+        "report": json.loads(report) if report else None,
+    }
+
+
+def ledger_is_current(path: Path, stat: os.stat_result) -> bool:
+    """True when ``path`` was already processed at this exact size and mtime."""
+    record = ledger_lookup(path)
+    return record is not None and record["size"] == stat.st_size and record["mtime"] == stat.st_mtime
+
+
+def ledger_record(
+    path: Path,
+    stat: os.stat_result,
+    digest: str,
+    ok: bool,
+    output_path: Path | None,
+    report: dict | None,
+) -> None:
+    with ledger_lock:
+        conn = ledger_conn()
+        conn.execute(
+            """
+            INSERT INTO processed_files (path, size, mtime, sha256, ok, output_path, report, processed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                size = excluded.size,
+                mtime = excluded.mtime,
+                sha256 = excluded.sha256,
+                ok = excluded.ok,
+                output_path = excluded.output_path,
+                report = excluded.report,
+                processed_at = excluded.processed_at
+            """,
+            (
+                str(path),
+                stat.st_size,
+                stat.st_mtime,
+                digest,
+                int(ok),
+                str(output_path) if output_path else None,
+                json.dumps(report) if report is not None else None,
+                time.time(),
+            ),
+        )
+        conn.commit()
 
 
 def enqueue_watch_file(path: Path, mtime: float) -> None:
+    """Put a settled file on the bounded worker queue; raises queue.Full when it has no room."""
     with queued_versions_lock:
         existing = queued_versions.get(path)
         if existing == mtime:
             return
+        watch_queue.put_nowait((path, mtime, time.time()))
         queued_versions[path] = mtime
-    watch_queue.put((path, mtime))
 
 
 def watch_worker_loop(worker_id: int) -> None:
     while True:
-        stl, enqueued_mtime = watch_queue.get()
+        source, enqueued_mtime, enqueued_at = watch_queue.get()
+        watch_queue_wait_seconds.observe(time.time() - enqueued_at)
         try:
             with queued_versions_lock:
-                current = queued_versions.get(stl)
+                current = queued_versions.get(source)
                 if current == enqueued_mtime:
-                    queued_versions.pop(stl, None)
+                    queued_versions.pop(source, None)
 
-            if not stl.exists():
+            if not source.exists():
                 continue
 
-            if not is_file_stable(stl, STABILITY_CHECK_SECONDS, STABILITY_MAX_WAIT_SECONDS):
-                print(f"[WATCHER #{worker_id}] SKIP (unstable): {stl.name}", flush=True)
+            name = source.relative_to(INPUT_DIR)
+            stat = source.stat()
+            digest = file_sha256(source)
+            record = ledger_lookup(source)
+            if (
+                record
+                and record["sha256"] == digest
+                and (not record["ok"] or output_exists(Path(str(record["output_path"]))))
+            ):
+                # Same content under a new mtime (touched or re-copied): remember the new stat only.
+                ledger_record(source, stat, digest, record["ok"], record["output_path"], record["report"])
+                print(f"[WATCHER #{worker_id}] SKIP (unchanged content): {name}", flush=True)
                 continue
 
-            ok, logs, output, report = process_one_file(stl)
+            timings: list[dict] = []
+            ok, logs, output, report = run_scheduled(
+                f"watch-{uuid.uuid4().hex}",
+                process_watch_file,
+                (source, digest, timings),
+                PRIORITY_BATCH,
+            )
+            ledger_record(source, stat, digest, ok, output if ok else None, report)
+            increment_stat("watch_processed" if ok else "watch_failed")
             status = "OK" if ok else "FAIL"
             print(
-                f"[WATCHER #{worker_id}] [{status}] {stl.name} -> {output.name}\n"
-                f"Report: {report}\n{logs}\n",
+                f"[WATCHER #{worker_id}] [{status}] {name} -> {output.relative_to(OUTPUT_DIR)}\n"
+                f"Report: {report}\nTimings: {format_timings(timings)}\n{logs}\n",
                 flush=True,
             )
         except Exception as exc:
+            increment_stat("watch_failed")
             print(f"[WATCHER #{worker_id} ERROR] {exc}", flush=True)
         finally:
             watch_queue.task_done()
 
 
-def watcher_loop() -> None:
-    seen: dict[Path, float] = {}
-    while True:
-        try:
-            cleanup_expired_sessions()
-            for stl in INPUT_DIR.glob("*.stl"):
-                mtime = stl.stat().st_mtime
-                if seen.get(stl) == mtime:
-                    continue
-                seen[stl] = mtime
-                enqueue_watch_file(stl, mtime)
-        except Exception as exc:
-            print(f"[WATCHER ERROR] {exc}", flush=True)
-        time.sleep(POLL_SECONDS)
+def consider_watch_file(path: Path, seen: dict[Path, float], settled: bool = False) -> None:
+    """Queue ``path`` unless this mtime was already seen or the ledger has it processed."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return
+    if seen.get(path) == stat.st_mtime:
+        return
+    seen[path] = stat.st_mtime
+    if ledger_is_current(path, stat):
+        return
+    track_pending_file(path, settled=settled)
 
 
-def update_session(session_id: str, **updates) -> None:
-    with sessions_lock:
-        if session_id in sessions:
-            updates["updated_at"] = time.time()
-            sessions[session_id].update(updates)
-            sessions[session_id]["updated_at"] = time.time()
+def watch_excluded(path: Path) -> bool:
+    """Hidden entries and an OUTPUT_DIR nested inside INPUT_DIR are never watched."""
+    return path.name.startswith(".") or path == OUTPUT_DIR
 
 
-def get_session(session_id: str, touch: bool = True) -> dict | None:
-    with sessions_lock:
-        sess = sessions.get(session_id)
-        if sess and touch:
-            now = time.time()
-            sess["updated_at"] = now
-            sess["last_accessed_at"] = now
-        return sess
+def watch_directories(root: Path) -> list[Path]:
+    """``root`` plus, in recursive mode, every non-excluded subdirectory below it."""
+    if not WATCH_RECURSIVE:
+        return [root]
+    found = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        found.append(directory)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    path = Path(entry.path)
+                    if entry.is_dir(follow_symlinks=False) and not watch_excluded(path):
+                        stack.append(path)
+        except OSError:
+            continue
+    return found
+
+
+def scan_input_dir(seen: dict[Path, float], root: Path = INPUT_DIR) -> None:
+    for directory in watch_directories(root):
+        try:
+            with os.scandir(directory) as entries:
+                names = [entry.name for entry in entries if entry.is_file()]
+        except OSError:
+            continue
+        for name in names:
+            if allowed_watch_file(name):
+                consider_watch_file(directory / name, seen)
+
+
+def filesystem_type(path: Path) -> str | None:
+    """fstype of the mount containing ``path``, from /proc/self/mounts."""
+    try:
+        target = str(path.resolve())
+        best, best_type = "", None
+        with open("/proc/self/mounts", encoding="utf-8") as fh:
+            for line in fh:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace("\\040", " ")
+                inside = target == mount_point or target.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(best):
+                    best, best_type = mount_point, fields[2]
+        return best_type
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def inotify_libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch  # resolve both symbols up front
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def open_inotify(path: Path, mask: int) -> int | None:
+    """Return an inotify fd watching ``path``, or None when inotify is unavailable."""
+    libc = inotify_libc()
+    if libc is None:
+        return None
+    fd = libc.inotify_init1(IN_CLOEXEC)
+    if fd < 0:
+        return None
+    if add_inotify_watch(fd, path, mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def add_inotify_watch(fd: int, path: Path, mask: int) -> int:
+    """Add ``path`` to an open inotify fd; returns the watch descriptor or -1."""
+    libc = inotify_libc()
+    if libc is None:
+        return -1
+    return libc.inotify_add_watch(fd, os.fsencode(str(path)), mask)
+
+
+def read_inotify_events(fd: int) -> list[tuple[int, int, str]]:
+    data = os.read(fd, 64 * 1024)
+    events: list[tuple[int, int, str]] = []
+    offset = 0
+    while offset + INOTIFY_EVENT_HEADER.size <= len(data):
+        wd, mask, _cookie, name_len = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+        offset += INOTIFY_EVENT_HEADER.size
+        name = data[offset : offset + name_len].rstrip(b"\0").decode("utf-8", errors="surrogateescape")
+        offset += name_len
+        events.append((wd, mask, name))
+    return events
+
+
+def poll_watcher_loop() -> None:
+    seen: dict[Path, float] = {}
+    while True:
+        try:
+            cleanup_expired_sessions()
+            scan_input_dir(seen)
+        except Exception as exc:
+            print(f"[WATCHER ERROR] {exc}", flush=True)
+        time.sleep(POLL_SECONDS)
+
+
+def watch_subtree(fd: int, root: Path, watch_dirs: dict[int, Path]) -> None:
+    """Add inotify watches for ``root`` and every subdirectory below it."""
+    for directory in watch_directories(root):
+        wd = add_inotify_watch(fd, directory, WATCH_EVENT_MASK)
+        if wd >= 0:
+            watch_dirs[wd] = directory
+
+
+def inotify_watcher_loop(fd: int) -> None:
+    """Queue files as soon as their writer closes them or they are moved into a watched directory."""
+    seen: dict[Path, float] = {}
+    watch_dirs: dict[int, Path] = {}
+    try:
+        watch_subtree(fd, INPUT_DIR, watch_dirs)
+        scan_input_dir(seen)
+    except Exception as exc:
+        print(f"[WATCHER ERROR] {exc}", flush=True)
+    last_cleanup = time.time()
+    while True:
+        try:
+            ready, _w, _x = select.select([fd], [], [], 1.0)
+            if ready:
+                for wd, mask, name in read_inotify_events(fd):
+                    if mask & IN_Q_OVERFLOW:
+                        scan_input_dir(seen)
+                        continue
+                    if mask & IN_IGNORED:
+                        watch_dirs.pop(wd, None)
+                        continue
+                    directory = watch_dirs.get(wd)
+                    if directory is None or not name:
+                        continue
+                    path = directory / name
+                    if mask & IN_ISDIR:
+                        if WATCH_RECURSIVE and not watch_excluded(path):
+                            # Watch the new folder first, then pick up anything copied in before the watch existed.
+                            watch_subtree(fd, path, watch_dirs)
+                            scan_input_dir(seen, path)
+                        continue
+                    if mask & IN_CREATE or not allowed_watch_file(name):
+                        continue
+                    seen.pop(path, None)
+                    consider_watch_file(path, seen, settled=True)
+            if time.time() - last_cleanup >= POLL_SECONDS:
+                cleanup_expired_sessions()
+                last_cleanup = time.time()
+        except Exception as exc:
+            print(f"[WATCHER ERROR] {exc}", flush=True)
+            time.sleep(1)
+
+
+def watcher_loop() -> None:
+    fd = None
+    fs_type = filesystem_type(INPUT_DIR)
+    if WATCH_BACKEND == "inotify" or (WATCH_BACKEND == "auto" and fs_type not in NETWORK_FILESYSTEMS):
+        fd = open_inotify(INPUT_DIR, WATCH_EVENT_MASK)
+    watch_state["backend"] = "inotify" if fd is not None else "poll"
+    print(f"[WATCHER] watching {INPUT_DIR} ({fs_type or 'unknown fs'}) with {watch_state['backend']}", flush=True)
+    if fd is None:
+        poll_watcher_loop()
+    else:
+        inotify_watcher_loop(fd)
+
+
+def update_session(
+    session_id: str,
+    reset_logs: bool = False,
+    append_logs: list[str] | None = None,
+    expected_status: set[str] | None = None,
+    **updates,
+) -> bool:
+    """Apply field updates; ``reset_logs=True`` / ``append_logs=[...]`` edit the session log.
+
+    With ``expected_status`` the update only applies while the session is in one
+    of those statuses, which makes it a compare-and-set across worker processes.
+    """
+    return session_store.update(session_id, updates, reset_logs, append_logs or (), expected_status)
+
+
+def get_session(session_id: str, touch: bool = True) -> dict | None:
+    return session_store.get(session_id, touch)
 
 
 def remove_session_files(session_dir: str | None) -> None:
@@ -1189,34 +2869,30 @@ def remove_session_files(session_dir: str | None) -> None:
         print(f"[CLEANUP ERROR] could not remove {session_dir}: {exc}", flush=True)
 
 
+def remove_orphan_session_dirs(now: float) -> None:
+    """Delete SESSION_ROOT directories untouched for the TTL that no live session or upload owns.
+
+    A directory's mtime does not move while files inside it grow, so ownership,
+    not age alone, decides.
+    """
+    cutoff = now - SESSION_TTL_SECONDS
+    live = {sess.get("session_dir") for sess in session_store.list()}
+    for p in SESSION_ROOT.iterdir():
+        if not p.is_dir() or str(p) in live or session_store.get_upload(p.name):
+            continue
+        try:
+            if p.stat().st_mtime < cutoff:
+                shutil.rmtree(p, ignore_errors=True)
+        except FileNotFoundError:
+            continue
+
+
 def cleanup_loop() -> None:
     while True:
         try:
             now = time.time()
-            expired_dirs: list[str] = []
-            with sessions_lock:
-                expired_ids = [
-                    sid
-                    for sid, sess in sessions.items()
-                    if now - float(sess.get("updated_at", now)) > SESSION_TTL_SECONDS
-                ]
-                for sid in expired_ids:
-                    sess = sessions.pop(sid, None)
-                    if sess:
-                        expired_dirs.append(str(sess.get("session_dir", "")))
-
-            for d in expired_dirs:
-                remove_session_files(d)
-
-            cutoff = now - SESSION_TTL_SECONDS
-            for p in SESSION_ROOT.iterdir():
-                if not p.is_dir():
-                    continue
-                try:
-                    if p.stat().st_mtime < cutoff:
-                        shutil.rmtree(p, ignore_errors=True)
-                except FileNotFoundError:
-                    continue
+            cleanup_expired_sessions(now)
+            remove_orphan_session_dirs(now)
         except Exception as exc:
             print(f"[CLEANUP ERROR] {exc}", flush=True)
         time.sleep(CLEANUP_SECONDS)
@@ -1226,34 +2902,269 @@ def build_stage_cmd(input_file: Path, output_file: Path, flags: list[str]) -> li
     return ["admesh", "--write-binary-stl", str(output_file), *flags, str(input_file)]
 
 
-def run_repair_session(session_id: str) -> None:
-    stage_plan = [
-        {
-            "name": "Fix normal directions",
-            "flags": ["--exact", "--normal-directions"],
-            "resolves": ["flipped_normals"],
-        },
-        {
-            "name": "Remove disconnected shells",
-            "flags": ["--remove-unconnected"],
-            "resolves": ["disconnected_shells"],
-        },
-        {
-            "name": "Fill holes/open boundaries",
-            "flags": ["--fill-holes"],
-            "resolves": ["holes_open_boundaries"],
-        },
-        {
-            "name": "Repair nearby/non-manifold edges",
-            "flags": ["--nearby", "--tolerance=0.01", "--iterations=2"],
-            "resolves": ["non_manifold_edges"],
-        },
-    ]
+def merge_stage_issues(
+    previous_issues: dict[str, int], parsed: dict[str, int], resolves: list[str]
+) -> dict[str, int]:
+    next_issues = {}
+    for key, prev_value in previous_issues.items():
+        parsed_value = parsed.get(key, prev_value)
+        next_issues[key] = min(prev_value, parsed_value)
+
+    for key in resolves:
+        next_issues[key] = 0
+    return next_issues
+
+
+def complete_repair_session(
+    session_id: str,
+    result_key: str,
+    final_output: Path,
+    final_issues: dict[str, int],
+    final_metrics: dict[str, int | None],
+    quality_report: dict,
+    logs: list[str],
+    append_logs: list[str],
+    timings: list[dict] | None = None,
+) -> None:
+    """Cache the full repair ``logs`` and finish the session, adding ``append_logs`` to its log."""
+    with timed_step(timings, "finalize"):
+        cache_put(
+            result_key,
+            {
+                "issues": final_issues,
+                "metrics": final_metrics,
+                "quality_report": quality_report,
+                "logs": logs,
+            },
+            artifact=final_output,
+        )
+        precompress_output(final_output)
+    increment_stat("repair_success")
+    update_session(
+        session_id,
+        status="completed",
+        stage="done",
+        issues_current=final_issues,
+        remaining_errors=total_errors(final_issues),
+        metrics_current=final_metrics,
+        quality_report=quality_report,
+        output_path=str(final_output),
+        output_name=final_output.name,
+        timings=list(timings or []),
+        append_logs=append_logs,
+    )
+
 
+def run_repair_session(session_id: str, mode: str | None = None, backend: str | None = None) -> None:
     sess = get_session(session_id)
     if not sess:
         return
 
+    mode = mode or sess.get("repair_mode") or REPAIR_SESSION_MODE
+    engine = repair_backend(backend or sess.get("repair_backend"))
+    timings: list[dict] = []
+    dump_path = Path(sess["session_dir"]) / "profile.pstats" if sess.get("profile") else None
+    started = time.perf_counter()
+    try:
+        with profiled(dump_path) as profile_path:
+            execute_repair_session(session_id, sess, mode, engine, timings)
+    finally:
+        status = (get_session(session_id, touch=False) or {}).get("status")
+        repair_session_seconds.observe(
+            time.perf_counter() - started,
+            mode=mode,
+            backend=engine.name,
+            status=status if status in ("completed", "failed") else "failed",
+        )
+    if profile_path is not None:
+        update_session(session_id, **profile_fields(session_id, profile_path))
+
+
+def execute_repair_session(
+    session_id: str,
+    sess: dict,
+    mode: str,
+    engine: AdmeshRepairBackend | NativeRepairBackend,
+    timings: list[dict],
+) -> None:
+    """Restore a cached result or run the repair in ``mode``, appending each step to ``timings``."""
+    if mode == "fast":
+        result_key = cache_key(
+            str(sess.get("file_sha256", "")),
+            "session:fast",
+            [
+                *REPAIR_FLAGS,
+                f"inspector={inspector_engine(sess.get('inspector'))}",
+                f"recheck={native_mesh_module().ENGINE_VERSION}",
+            ],
+            engine=engine.engine(),
+        )
+    else:
+        result_key = cache_key(
+            str(sess.get("file_sha256", "")),
+            "session",
+            [
+                *[flag for stage in REPAIR_STAGE_PLAN for flag in [stage["name"], *stage["flags"]]],
+                f"inspector={inspector_engine(sess.get('inspector'))}",
+            ],
+            engine=engine.engine(),
+        )
+
+    cached = cache_get(result_key) if sess.get("file_sha256") else None
+    if cached:
+        session_dir = Path(sess["session_dir"])
+        safe_stem = secure_filename(Path(sess["input_path"]).stem) or "model"
+        final_output = unique_output_path(session_dir, safe_stem, PROCESSED_SUFFIX)
+        with timed_step(timings, "cache_restore"):
+            restored = cache_restore_artifact(result_key, cached, final_output)
+            if restored:
+                precompress_output(final_output)
+        if restored:
+            increment_stat("repair_success")
+            update_session(
+                session_id,
+                status="completed",
+                stage="done",
+                issues_current=cached["issues"],
+                remaining_errors=total_errors(cached["issues"]),
+                metrics_current=cached["metrics"],
+                quality_report=cached["quality_report"],
+                output_path=str(final_output),
+                output_name=final_output.name,
+                timings=list(timings),
+                reset_logs=True,
+                append_logs=[f"[Cache] reused repair result {result_key[:12]}", *cached.get("logs", [])],
+            )
+            return
+
+    if mode == "fast":
+        run_fast_repair_session(session_id, sess, result_key, engine, timings)
+    else:
+        run_staged_repair_session(session_id, sess, result_key, engine, timings)
+
+
+def run_fast_repair_session(
+    session_id: str,
+    sess: dict,
+    result_key: str,
+    engine: AdmeshRepairBackend | NativeRepairBackend,
+    timings: list[dict] | None = None,
+) -> None:
+    """Repair with one combined backend run, tracking stages from its progress output."""
+    input_file = Path(sess["input_path"])
+    session_dir = Path(sess["session_dir"])
+    initial_issues = dict(sess.get("issues_initial", {}))
+    initial_metrics = dict(sess.get("metrics_initial", {}))
+    safe_stem = secure_filename(input_file.stem) or "model"
+    final_output = unique_output_path(session_dir, safe_stem, PROCESSED_SUFFIX)
+    stage_resolves = {stage["name"]: stage["resolves"] for stage in REPAIR_STAGE_PLAN}
+    progress = {"issues": dict(sess.get("issues_current", {})), "stage": None}
+
+    update_session(session_id, status="repairing", stage="starting", reset_logs=True)
+
+    def on_line(line: str) -> None:
+        lower = line.lower()
+        for prefix, stage_name in ADMESH_PROGRESS_STAGES:
+            if not lower.startswith(prefix) or progress["stage"] == stage_name:
+                continue
+            finished = progress["stage"]
+            if finished:
+                progress["issues"] = merge_stage_issues(progress["issues"], {}, stage_resolves[finished])
+            progress["stage"] = stage_name
+            update_session(
+                session_id,
+                stage=stage_name,
+                issues_current=progress["issues"],
+                remaining_errors=total_errors(progress["issues"]),
+            )
+            break
+
+    with timed_step(timings, "repair"):
+        ok, repair_logs, final_issues, final_metrics, quality_report = fast_repair(
+            input_file,
+            final_output,
+            engine,
+            initial_issues,
+            initial_metrics,
+            on_line=on_line,
+        )
+    logs = [f"[Single-pass repair ({engine.name})]\n{repair_logs}"]
+
+    if not ok:
+        increment_stat("repair_failed")
+        update_session(
+            session_id,
+            status="failed",
+            stage=progress["stage"] or "starting",
+            timings=list(timings or []),
+            append_logs=logs,
+        )
+        return
+
+    complete_repair_session(
+        session_id, result_key, final_output, final_issues, final_metrics, quality_report, logs, logs, timings
+    )
+
+
+def fast_repair(
+    input_file: Path,
+    final_output: Path,
+    engine: AdmeshRepairBackend | NativeRepairBackend,
+    initial_issues: dict[str, int],
+    initial_metrics: dict[str, int | None],
+    on_line: Callable[[str], None] | None = None,
+) -> tuple[bool, str, dict[str, int], dict[str, int | None], dict]:
+    """One combined repair run, read back from the backend's own statistics.
+
+    Issue categories those statistics do not cover are measured on the output with
+    the native inspector; anything still unmeasured keeps its initial count.
+
+    Returns (ok, repair logs, final issues, final metrics, quality report).
+    """
+    try:
+        mesh = engine.load(input_file)
+        ok, repair_logs, mesh = engine.run_stage(mesh, REPAIR_FLAGS, final_output, on_line=on_line)
+        if ok:
+            engine.save(mesh, final_output)
+    except Exception as exc:
+        ok, repair_logs = False, f"{engine.name} repair failed: {exc}"
+    if not ok or not final_output.exists():
+        return False, repair_logs, initial_issues, initial_metrics, {}
+
+    parsed, final_metrics, before_metrics = engine.repair_results(mesh, repair_logs)
+    unmeasured = [key for key in initial_issues if key not in parsed]
+    if unmeasured:
+        # admesh's statistics have no non-manifold count, so measure what they
+        # leave out on the output instead of assuming the repair cleared it.
+        try:
+            with mesh_operation_seconds.time(backend="native", operation="inspect"):
+                inspect_text, measured, _metrics = native_inspect_report(
+                    native_mesh_module().inspect_file(final_output)
+                )
+        except Exception as exc:
+            inspect_text, measured = f"native inspect failed: {exc}", {}
+        parsed = {**parsed, **{key: measured[key] for key in unmeasured if key in measured}}
+        repair_logs = f"{repair_logs}\n[Post-repair inspection]\n{inspect_text}"
+    final_issues = {**initial_issues, **parsed}
+    initial_metrics = dict(initial_metrics)
+    for key in ("triangle_count", "part_count"):
+        if initial_metrics.get(key) is None:
+            initial_metrics[key] = before_metrics.get(key)
+
+    quality_report = build_quality_report(initial_issues, final_issues, initial_metrics, final_metrics)
+    return True, repair_logs, final_issues, final_metrics, quality_report
+
+
+def run_staged_repair_session(
+    session_id: str,
+    sess: dict,
+    result_key: str,
+    engine: AdmeshRepairBackend | NativeRepairBackend,
+    timings: list[dict] | None = None,
+) -> None:
+    """Diagnostic mode: one backend run plus an inspection per stage."""
+    stage_plan = REPAIR_STAGE_PLAN
+    inspector = sess.get("inspector")
     current_file = Path(sess["input_path"])
     session_dir = Path(sess["session_dir"])
     previous_issues = dict(sess.get("issues_current", {}))
@@ -1261,41 +3172,42 @@ def run_repair_session(session_id: str) -> None:
     initial_metrics = dict(sess.get("metrics_initial", {}))
     logs: list[str] = []
 
-    update_session(session_id, status="repairing", stage="starting", logs=[])
+    update_session(session_id, status="repairing", stage="starting", reset_logs=True)
+    try:
+        with timed_step(timings, "load"):
+            mesh = engine.load(current_file)
+    except Exception as exc:
+        increment_stat("repair_failed")
+        update_session(session_id, status="failed", stage="starting", append_logs=[f"could not load mesh: {exc}"])
+        return
 
     for idx, stage in enumerate(stage_plan, start=1):
         stage_name = stage["name"]
         stage_output = session_dir / f"stage_{idx}.stl"
-        cmd = build_stage_cmd(current_file, stage_output, stage["flags"])
 
         update_session(session_id, stage=stage_name)
-        try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=ADMESH_TIMEOUT_SECONDS)
-            stage_logs = ((proc.stdout or "") + "\n" + (proc.stderr or "")).strip()
-        except subprocess.TimeoutExpired:
-            stage_logs = f"admesh stage timed out after {ADMESH_TIMEOUT_SECONDS}s"
-            proc = None
+        with timed_step(timings, stage_name):
+            ok, stage_logs, mesh = engine.run_stage(mesh, stage["flags"], stage_output, stage=stage_name)
 
-        logs.append(f"[{stage_name}]\n{stage_logs}")
-        logs = trim_logs(logs)
+        stage_entry = f"[{stage_name}]\n{stage_logs}"
+        logs.append(stage_entry)
 
-        if proc is None or proc.returncode != 0 or not stage_output.exists():
+        if not ok:
             increment_stat("repair_failed")
-            update_session(session_id, status="failed", stage=stage_name, logs=logs)
+            update_session(
+                session_id,
+                status="failed",
+                stage=stage_name,
+                timings=list(timings or []),
+                append_logs=[stage_entry],
+            )
             return
 
         current_file = stage_output
 
-        inspect_logs = run_admesh_inspect(current_file)
-        parsed = parse_issue_counts(inspect_logs)
-        parsed_metrics = parse_mesh_metrics(inspect_logs)
-        next_issues = {}
-        for key, prev_value in previous_issues.items():
-            parsed_value = parsed.get(key, prev_value)
-            next_issues[key] = min(prev_value, parsed_value)
-
-        for key in stage["resolves"]:
-            next_issues[key] = 0
+        with timed_step(timings, f"{stage_name}: inspect"):
+            _inspect_logs, parsed, parsed_metrics = engine.inspect(mesh, inspector)
+        next_issues = merge_stage_issues(previous_issues, parsed, stage["resolves"])
 
         previous_issues = next_issues
         update_session(
@@ -1309,43 +3221,44 @@ def run_repair_session(session_id: str) -> None:
                 initial_metrics,
                 parsed_metrics,
             ),
-            logs=trim_logs(logs),
+            timings=list(timings or []),
+            append_logs=[stage_entry],
         )
 
     final_output = unique_output_path(session_dir, secure_filename(current_file.stem) or "model", PROCESSED_SUFFIX)
-    shutil.copyfile(current_file, final_output)
+    with timed_step(timings, "save"):
+        engine.save(mesh, final_output)
 
-    final_inspect_logs = run_admesh_inspect(final_output)
-    final_issues = parse_issue_counts(final_inspect_logs)
-    final_metrics = parse_mesh_metrics(final_inspect_logs)
+    with timed_step(timings, "final_inspect"):
+        final_inspect_logs, final_issues, final_metrics = engine.inspect(mesh, inspector)
     quality_report = build_quality_report(
         initial_issues,
         final_issues,
         initial_metrics,
         final_metrics,
     )
-    increment_stat("repair_success")
-    update_session(
+    final_entry = f"[Final Analyze]\n{final_inspect_logs}"
+    complete_repair_session(
         session_id,
-        status="completed",
-        stage="done",
-        issues_current=final_issues,
-        remaining_errors=total_errors(final_issues),
-        metrics_current=final_metrics,
-        quality_report=quality_report,
-        output_path=str(final_output),
-        output_name=final_output.name,
-        logs=trim_logs([*logs, f"[Final Analyze]\n{final_inspect_logs}"]),
+        result_key,
+        final_output,
+        final_issues,
+        final_metrics,
+        quality_report,
+        [*logs, final_entry],
+        [final_entry],
+        timings,
     )
 
 
 @app.get("/")
 def index():
-    return render_template_string(
-        HTML,
+    return render_template(
+        "index.html",
         title=APP_TITLE,
         input_dir=str(INPUT_DIR),
         output_dir=str(OUTPUT_DIR),
+        repair_mode=REPAIR_SESSION_MODE,
     )
 
 
@@ -1357,6 +3270,10 @@ def health():
             "watch_mode": WATCH_MODE,
             "watch_workers": WATCH_WORKERS,
             "queue_depth": watch_queue.qsize(),
+            "pending_unstable": len(pending_files),
+            "scheduler": scheduler_snapshot(),
+            "watch_backend": watch_state["backend"],
+            "watch_recursive": WATCH_RECURSIVE,
             "poll_seconds": POLL_SECONDS,
             "session_ttl_seconds": SESSION_TTL_SECONDS,
         }
@@ -1370,12 +3287,30 @@ def favicon():
 
 @app.post("/analyze")
 def analyze_upload():
+    staged, error = receive_analyze_upload()
+    if error:
+        return error
+    return jsonify(create_analyze_session(*staged))
+
+
+def receive_analyze_upload() -> tuple[tuple | None, tuple | None]:
+    """Validate an /analyze request and store its STL in a new session directory.
+
+    Returns ((session_id, session_dir, input_path, sha256, inspector), None)
+    or (None, error response).
+    """
     if "file" not in request.files:
-        return jsonify({"error": "No file uploaded"}), 400
+        return None, (jsonify({"error": "No file uploaded"}), 400)
 
     upload = request.files["file"]
     if not upload.filename or not allowed_repair_file(upload.filename):
-        return jsonify({"error": "Only .stl files are supported"}), 400
+        return None, (jsonify({"error": "Only .stl files are supported"}), 400)
+
+    inspector = (request.form.get("inspector") or INSPECT_BACKEND).strip().lower()
+    if inspector not in INSPECT_BACKENDS:
+        discard_upload(upload)
+        supported = ", ".join(sorted(INSPECT_BACKENDS))
+        return None, (jsonify({"error": f"Unsupported inspector. Supported: {supported}"}), 400)
 
     increment_stat("analyze_requests")
     cleanup_expired_sessions()
@@ -1387,12 +3322,44 @@ def analyze_upload():
     session_dir.mkdir(parents=True, exist_ok=True)
 
     input_path = session_dir / safe_name
-    upload.save(input_path)
-    file_digest = file_sha256(input_path)
+    try:
+        file_digest = ingest_upload(upload, input_path)
+    except InvalidUpload:
+        shutil.rmtree(session_dir, ignore_errors=True)
+        raise
+
+    return (session_id, session_dir, input_path, file_digest, inspector), None
+
 
-    inspect_logs = run_admesh_inspect(input_path)
-    issues = parse_issue_counts(inspect_logs)
-    metrics = parse_mesh_metrics(inspect_logs)
+def cached_inspection(file_digest: str, inspector: str) -> tuple[str, dict | None]:
+    """(cache key, cached inspect result or None) for an uploaded file."""
+    key = cache_key(file_digest, f"inspect:{inspector}", INSPECT_FLAGS, engine=inspector_engine(inspector))
+    return key, cache_get(key)
+
+
+def create_analyze_session(
+    session_id: str,
+    session_dir: Path,
+    input_path: Path,
+    file_digest: str,
+    inspector: str,
+    inspection: tuple[str, dict[str, int], dict[str, int | None]] | None = None,
+) -> dict:
+    """Inspect an STL already sitting in ``session_dir`` and register it as an analyzed session.
+
+    ``inspection`` is a (report, issues, metrics) result the caller already
+    produced, e.g. with ``inspect_mesh_async``.
+    """
+    safe_name = input_path.name
+    key, cached = cached_inspection(file_digest, inspector)
+    if cached:
+        inspect_logs = cached["inspect"]
+        issues = cached["issues"]
+        metrics = cached["metrics"]
+    else:
+        inspect_logs, issues, metrics = inspection or inspect_mesh(input_path, inspector)
+        cache_put(key, {"inspect": inspect_logs, "issues": issues, "metrics": metrics})
+        observe_input_triangles(metrics, "analyze")
     now = time.time()
 
     session = {
@@ -1403,6 +3370,7 @@ def analyze_upload():
         "session_dir": str(session_dir),
         "input_path": str(input_path),
         "file_sha256": file_digest,
+        "inspector": inspector,
         "issues_initial": issues,
         "issues_current": dict(issues),
         "metrics_initial": metrics,
@@ -1411,26 +3379,243 @@ def analyze_upload():
         "output_path": None,
         "output_name": None,
         "quality_report": build_quality_report(issues, issues, metrics, metrics),
-        "logs": trim_logs([f"[Analyze]\n{inspect_logs}"]),
         "created_at": now,
         "updated_at": now,
         "last_accessed_at": now,
     }
 
-    with sessions_lock:
-        sessions[session_id] = session
-        session_order.append(session_id)
-        enforce_session_limit()
+    for evicted in session_store.create(session, [f"[Analyze]\n{inspect_logs}"]):
+        remove_session_files(evicted.get("session_dir"))
+
+    return {
+        "session_id": session_id,
+        "issues": issues,
+        "metrics": metrics,
+        "quality_report": session["quality_report"],
+        "total_errors": total_errors(issues),
+        "file_sha256": file_digest,
+        "inspector": inspector,
+        "cached": cached is not None,
+    }
+
+
+def open_upload_stream(upload: dict) -> StlIngestStream:
+    """This worker's stream for ``upload``, reopened from disk if another worker appended to it."""
+    path = Path(upload["path"])
+    with upload_streams_lock:
+        stream = upload_streams.get(upload["upload_id"])
+        on_disk = path.stat().st_size if path.exists() else 0
+        if stream is None or stream.size != on_disk:
+            if stream is not None:
+                stream.fh.close()
+            # Carry on from the digest state the last chunk saved; hash from the start only without one.
+            state, offset = upload.get("sha256_state"), upload.get("sha256_offset", 0)
+            if state and ResumableSha256.available() and offset <= on_disk:
+                digest = ResumableSha256(bytes.fromhex(state))
+            else:
+                digest, offset = new_upload_digest(), 0
+            stream = StlIngestStream(
+                path, upload["size"], validate=upload["validate"], resume=True, digest=digest, digest_offset=offset
+            )
+            upload_streams[upload["upload_id"]] = stream
+        return stream
+
+
+def new_upload_digest():
+    """A running sha256 for a chunked upload: resumable by other workers when OpenSSL is loadable."""
+    return ResumableSha256() if ResumableSha256.available() else sha256()
+
+
+def close_upload_stream(upload_id: str) -> None:
+    with upload_streams_lock:
+        stream = upload_streams.pop(upload_id, None)
+    if stream is not None:
+        stream.fh.close()
 
+
+def upload_offset(upload: dict) -> int:
+    try:
+        return Path(upload["path"]).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def upload_summary(upload: dict, offset: int | None = None) -> dict:
+    offset = upload_offset(upload) if offset is None else offset
+    return {
+        "upload_id": upload["upload_id"],
+        "filename": upload["filename"],
+        "size": upload["size"],
+        "offset": offset,
+        "complete": offset == upload["size"],
+    }
+
+
+def lock_upload(upload: dict):
+    """Open and flock the upload's lock file; None while another request in any worker holds it."""
+    lock_fh = (Path(upload["session_dir"]) / ".upload.lock").open("a")
+    try:
+        fcntl.flock(lock_fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_fh.close()
+        return None
+    return lock_fh
+
+
+def take_complete_upload(upload_id: str) -> tuple[dict | None, tuple | None]:
+    """Detach a fully received chunked upload; returns (upload, None) or (None, error response)."""
+    upload = session_store.get_upload(upload_id)
+    if upload is None:
+        return None, (jsonify({"error": "Upload not found"}), 404)
+    lock_fh = lock_upload(upload)
+    if lock_fh is None or upload_offset(upload) != upload["size"]:
+        if lock_fh is not None:
+            lock_fh.close()
+        return None, (jsonify({"error": "Upload is incomplete", **upload_summary(upload)}), 409)
+    try:
+        # Only one request may win the upload; a concurrent finalize sees it as already gone.
+        if session_store.delete_upload(upload_id) is None:
+            return None, (jsonify({"error": "Upload not found"}), 404)
+        stream = open_upload_stream(upload)
+        upload["sha256"] = stream.finish()
+    except InvalidUpload:
+        shutil.rmtree(upload["session_dir"], ignore_errors=True)
+        raise
+    finally:
+        lock_fh.close()
+        with upload_streams_lock:
+            upload_streams.pop(upload_id, None)
+    upload["path"] = stream.path
+    upload["session_dir"] = Path(upload["session_dir"])
+    return upload, None
+
+
+@app.post("/uploads")
+def create_upload():
+    """Start a resumable upload: send the bytes with PUT /uploads/<id>, then finalize."""
+    payload = request.get_json(silent=True) or request.form
+    filename = secure_filename(str(payload.get("filename") or ""))
+    if not filename or not allowed_converter_file(filename):
+        supported = ", ".join(sorted(CONVERTER_ALLOWED_EXTENSIONS))
+        return jsonify({"error": f"Unsupported input format. Supported: {supported}"}), 400
+    try:
+        size = int(payload.get("size"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "size (total bytes) is required"}), 400
+    if size <= 0:
+        return jsonify({"error": "size must be positive"}), 400
+    if size > MAX_UPLOAD_BYTES:
+        return jsonify({"error": f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit."}), 413
+
+    cleanup_expired_sessions()
+    ensure_dirs()
+    upload_id = uuid.uuid4().hex
+    session_dir = SESSION_ROOT / upload_id
+    now = time.time()
+    upload = {
+        "upload_id": upload_id,
+        "filename": filename,
+        "size": size,
+        "session_dir": str(session_dir),
+        "path": str(session_dir / filename),
+        "validate": allowed_repair_file(filename),
+        "created_at": now,
+        "updated_at": now,
+    }
+    with upload_streams_lock:
+        upload_streams[upload_id] = StlIngestStream(
+            Path(upload["path"]), size, validate=upload["validate"], digest=new_upload_digest()
+        )
+    session_store.create_upload(upload)
+    return jsonify(upload_summary(upload, 0)), 201
+
+
+@app.get("/uploads/<upload_id>")
+def upload_status(upload_id: str):
+    upload = session_store.get_upload(upload_id)
+    if not upload:
+        return jsonify({"error": "Upload not found"}), 404
+    return jsonify(upload_summary(upload))
+
+
+@app.put("/uploads/<upload_id>")
+def upload_chunk(upload_id: str):
+    """Append one ``Content-Range: bytes start-end/total`` chunk at the current offset."""
+    upload = session_store.get_upload(upload_id)
+    if not upload:
+        return jsonify({"error": "Upload not found"}), 404
+
+    content_range = parse_content_range_header(request.headers.get("Content-Range"))
+    if content_range is None or content_range.units != "bytes" or content_range.length != upload["size"]:
+        return jsonify({"error": "Content-Range: bytes <start>-<end>/<size> is required"}), 400
+
+    lock_fh = lock_upload(upload)
+    if lock_fh is None:
+        return jsonify({"error": "Another chunk for this upload is in progress", **upload_summary(upload)}), 409
+    try:
+        stream = open_upload_stream(upload)
+        if content_range.start > stream.size:
+            return jsonify({"error": "Chunk starts past the current offset", **upload_summary(upload)}), 409
+
+        # A retried chunk may overlap bytes we already have; skip them so each byte is written once.
+        skip = stream.size - content_range.start
+        remaining = content_range.stop - content_range.start
+        started = time.perf_counter()
+        while remaining > 0:
+            data = request.stream.read(min(UPLOAD_CHUNK_READ_BYTES, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            if skip >= len(data):
+                skip -= len(data)
+                continue
+            try:
+                stream.write(data[skip:])
+            except InvalidUpload:
+                session_store.delete_upload(upload_id)
+                close_upload_stream(upload_id)
+                shutil.rmtree(upload["session_dir"], ignore_errors=True)
+                raise
+            skip = 0
+        stream.fh.flush()
+        elapsed = time.perf_counter() - started
+        received = content_range.stop - content_range.start - remaining
+        if received and elapsed > 0:
+            upload_bytes_per_second.observe(received / elapsed, endpoint="upload_chunk")
+        if isinstance(stream.digest, ResumableSha256):
+            # Whichever worker takes the next chunk continues the hash from here.
+            session_store.touch_upload(upload_id, sha256_state=stream.digest.state().hex(), sha256_offset=stream.size)
+        else:
+            session_store.touch_upload(upload_id)
+        os.utime(upload["session_dir"])
+    finally:
+        lock_fh.close()
+    return jsonify(upload_summary(upload, stream.size))
+
+
+@app.post("/uploads/<upload_id>/finalize")
+def finalize_upload(upload_id: str):
+    """Close a complete STL upload and create an analyzed session from it in place."""
+    inspector = (request.form.get("inspector") or INSPECT_BACKEND).strip().lower()
+    if inspector not in INSPECT_BACKENDS:
+        supported = ", ".join(sorted(INSPECT_BACKENDS))
+        return jsonify({"error": f"Unsupported inspector. Supported: {supported}"}), 400
+    pending = session_store.get_upload(upload_id)
+    if pending and not allowed_repair_file(pending["filename"]):
+        return jsonify({"error": "Only .stl uploads can be analyzed; pass upload_id to /convert instead"}), 400
+
+    upload, error = take_complete_upload(upload_id)
+    if error:
+        return error
+    increment_stat("analyze_requests")
     return jsonify(
-        {
-            "session_id": session_id,
-            "issues": issues,
-            "metrics": metrics,
-            "quality_report": session["quality_report"],
-            "total_errors": total_errors(issues),
-            "file_sha256": file_digest,
-        }
+        create_analyze_session(
+            upload_id,
+            upload["session_dir"],
+            upload["path"],
+            upload["sha256"],
+            inspector,
+        )
     )
 
 
@@ -1438,18 +3623,86 @@ def analyze_upload():
 def repair_session(session_id: str):
     increment_stat("repair_requests")
     sess = get_session(session_id)
-    if not sess:
+    if not sess or sess.get("kind") in ("batch", "convert"):
         return jsonify({"error": "Session not found. Upload and analyze again."}), 404
 
     if sess.get("status") == "repairing":
         return jsonify({"status": "already repairing"})
 
+    if sess.get("status") == "queued":
+        return jsonify({"status": "already queued", "queue_position": job_queue_position(session_id)})
+
     if sess.get("status") == "completed":
         return jsonify({"status": "already completed"})
 
-    thread = threading.Thread(target=run_repair_session, args=(session_id,), daemon=True)
-    thread.start()
-    return jsonify({"status": "started"})
+    mode = (request.values.get("mode") or REPAIR_SESSION_MODE).strip().lower()
+    if mode not in REPAIR_SESSION_MODES:
+        supported = ", ".join(sorted(REPAIR_SESSION_MODES))
+        return jsonify({"error": f"Unsupported repair mode. Supported: {supported}"}), 400
+
+    backend = (request.values.get("backend") or sess.get("repair_backend") or REPAIR_BACKEND).strip().lower()
+    if backend not in REPAIR_BACKENDS:
+        supported = ", ".join(sorted(REPAIR_BACKENDS))
+        return jsonify({"error": f"Unsupported repair backend. Supported: {supported}"}), 400
+
+    previous_status = sess.get("status")
+    queued = update_session(
+        session_id,
+        expected_status={previous_status},
+        status="queued",
+        stage="queued",
+        repair_mode=mode,
+        repair_backend=backend,
+        profile=(request.values.get("profile") or "").strip().lower() in {"1", "true", "yes", "on"},
+    )
+    if not queued:
+        # Another request (possibly in another worker process) got here first.
+        return jsonify({"status": "already queued"})
+    job = submit_job(session_id, run_repair_session, (session_id, mode, backend), PRIORITY_INTERACTIVE)
+    if job is None:
+        update_session(session_id, status=previous_status, stage=previous_status)
+        return jsonify({"error": "Repair queue is full. Try again shortly."}), 503
+    return jsonify(
+        {
+            "status": "queued",
+            "mode": mode,
+            "backend": backend,
+            "queue_position": job_queue_position(session_id),
+        }
+    )
+
+
+def session_status_payload(session_id: str, sess: dict, since: int | None = None) -> dict:
+    logs, log_seq, logs_reset = session_store.log_since(session_id, since)
+    return {
+        "session_id": session_id,
+        "status": sess.get("status"),
+        "stage": sess.get("stage"),
+        "repair_mode": sess.get("repair_mode"),
+        "repair_backend": sess.get("repair_backend"),
+        "queue_position": job_queue_position(session_id),
+        "issues_current": sess.get("issues_current"),
+        "metrics_current": sess.get("metrics_current"),
+        "remaining_errors": sess.get("remaining_errors", 0),
+        "quality_report": sess.get("quality_report"),
+        "logs": logs,
+        "log_seq": log_seq,
+        "logs_reset": logs_reset,
+        "output_name": sess.get("output_name"),
+        "artifacts": sess.get("artifacts"),
+        "conversion_errors": sess.get("conversion_errors"),
+        "timings": sess.get("timings"),
+        "profile_url": sess.get("profile_url"),
+        "profile_top": sess.get("profile_top"),
+    }
+
+
+def sse_message(event: str, data: dict, event_id: int | None = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
 
 
 @app.get("/status/<session_id>")
@@ -1458,21 +3711,111 @@ def session_status(session_id: str):
     if not sess:
         return jsonify({"error": "Session not found"}), 404
 
-    return jsonify(
-        {
-            "session_id": session_id,
-            "status": sess.get("status"),
-            "stage": sess.get("stage"),
-            "issues_current": sess.get("issues_current"),
-            "metrics_current": sess.get("metrics_current"),
-            "remaining_errors": sess.get("remaining_errors", 0),
-            "quality_report": sess.get("quality_report"),
-            "logs": sess.get("logs", []),
-            "output_name": sess.get("output_name"),
-        }
+    since = request.args.get("since", type=int)
+    return jsonify(session_status_payload(session_id, sess, since))
+
+
+@app.get("/status/<session_id>/profile")
+def session_profile(session_id: str):
+    """The pstats dump of a job started with ``profile=1`` (load it with ``python -m pstats``)."""
+    sess = get_session(session_id)
+    if not sess or not sess.get("profile_url"):
+        return jsonify({"error": "Profile not found"}), 404
+    dump_path = Path(sess["session_dir"]) / "profile.pstats"
+    if not dump_path.exists():
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(
+        dump_path, mimetype="application/octet-stream", as_attachment=True, download_name=f"{session_id}.pstats"
     )
 
 
+@app.get("/status/<session_id>/events")
+def session_status_events(session_id: str):
+    """Server-Sent Events: one ``snapshot``, then an ``update`` per change recorded by update_session."""
+    sess = get_session(session_id)
+    if not sess:
+        return jsonify({"error": "Session not found"}), 404
+    try:
+        resume_from = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        resume_from = None
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if not sse_streams.acquire(blocking=False):
+        # Every stream slot is taken: send the current state and have EventSource reconnect later.
+        current = get_session(session_id, touch=False) or sess
+        _oldest, last_id = session_store.event_window(session_id)
+        body = f"retry: {SSE_BUSY_RETRY_MS}\n\n" + sse_message(
+            "snapshot", session_status_payload(session_id, current), last_id
+        )
+        return Response(body, mimetype="text/event-stream", headers=headers)
+
+    def stream():
+        messages = session_event_stream(session_id, sess, resume_from, max_seconds=SSE_MAX_STREAM_SECONDS)
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            yield from (message for message in messages if message)
+        finally:
+            messages.close()
+            sse_streams.release()
+
+    return Response(stream(), mimetype="text/event-stream", headers=headers)
+
+
+def session_event_stream(
+    session_id: str,
+    sess: dict,
+    resume_from: int | None,
+    wait_seconds: float = 1.0,
+    max_seconds: float | None = None,
+):
+    """SSE messages for one session until it finishes or disappears.
+
+    Each idle round waits up to ``wait_seconds`` for new events and then
+    yields None; the ASGI server passes 0 and sleeps on the event loop instead.
+    With ``max_seconds`` the stream also ends after that long, and EventSource
+    reconnects with Last-Event-ID to pick up where it left off.
+    """
+    started = time.time()
+    oldest, last_id = session_store.event_window(session_id)
+    current = sess
+    if resume_from is not None and oldest <= resume_from + 1 <= last_id + 1:
+        # Reconnect inside the backlog window: replay only what the client missed.
+        last_id = resume_from
+    else:
+        current = get_session(session_id, touch=False) or sess
+        yield sse_message("snapshot", session_status_payload(session_id, current), last_id)
+    status = current.get("status")
+    sent_position = job_queue_position(session_id)
+    last_write = time.time()
+
+    while True:
+        fresh = session_store.wait_events(session_id, last_id, timeout=wait_seconds)
+        if fresh is None:
+            return
+        for event_id, payload in fresh:
+            yield sse_message("update", payload, event_id)
+            status = payload.get("status", status)
+            last_id = event_id
+            last_write = time.time()
+
+        position = job_queue_position(session_id) if status == "queued" else None
+        if position != sent_position:
+            yield sse_message("update", {"queue_position": position})
+            sent_position = position
+            last_write = time.time()
+
+        if status in ("completed", "failed") and not fresh:
+            return
+        if max_seconds is not None and time.time() - started >= max_seconds:
+            return
+        if time.time() - last_write >= SSE_HEARTBEAT_SECONDS:
+            yield ": keepalive\n\n"
+            last_write = time.time()
+        else:
+            yield None
+
+
 @app.get("/download/<session_id>")
 def download_repaired(session_id: str):
     sess = get_session(session_id)
@@ -1483,98 +3826,408 @@ def download_repaired(session_id: str):
         return jsonify({"error": "Repair not completed yet"}), 400
 
     output_path = Path(str(sess["output_path"]))
-    if not output_path.exists():
+    if not output_exists(output_path):
         return jsonify({"error": "Output file missing"}), 404
 
-    return send_file(output_path, as_attachment=True, download_name=output_path.name)
+    return send_output(output_path)
 
 
 @app.post("/convert")
 def convert_upload():
-    if "file" not in request.files:
+    """Convert to one ``target_format`` (file response) or several (JSON links, or a zip with ``archive=1``).
+
+    Several targets may be given as repeated fields or one comma-separated
+    value; the input is parsed once for all of them. Inputs of at least
+    CONVERT_ASYNC_MIN_BYTES (or any input with ``async=1``) become a
+    conversion job instead: the answer is ``202`` with a job to poll.
+    """
+    upload_id = request.form.get("upload_id")
+    if "file" not in request.files and not upload_id:
         return jsonify({"error": "No file uploaded"}), 400
 
-    upload = request.files["file"]
-    target_format = (request.form.get("target_format") or DEFAULT_CONVERTER_TARGET).strip().lower()
+    target_formats: list[str] = []
+    for value in request.form.getlist("target_format") or [DEFAULT_CONVERTER_TARGET]:
+        for fmt in value.split(","):
+            fmt = fmt.strip().lower()
+            if fmt and fmt not in target_formats:
+                target_formats.append(fmt)
+    if not target_formats or any(fmt not in CONVERTER_ALLOWED_EXTENSIONS for fmt in target_formats):
+        supported = ", ".join(sorted(CONVERTER_ALLOWED_EXTENSIONS))
+        return jsonify({"error": f"Unsupported target format. Supported: {supported}"}), 400
+    archive = (request.form.get("archive") or "").strip().lower() in {"1", "true", "yes", "on"}
+    run_async = (request.form.get("async") or "").strip().lower() in {"1", "true", "yes", "on"}
+    profile = (request.form.get("profile") or "").strip().lower() in {"1", "true", "yes", "on"}
+
+    if upload_id:
+        chunked, error = take_complete_upload(upload_id)
+        if error:
+            return error
+        job_dir, input_path, file_digest = chunked["session_dir"], chunked["path"], chunked["sha256"]
+    else:
+        upload = request.files["file"]
+        if not upload.filename:
+            return jsonify({"error": "No file selected"}), 400
+
+        if not allowed_converter_file(upload.filename):
+            supported = ", ".join(sorted(CONVERTER_ALLOWED_EXTENSIONS))
+            return jsonify({"error": f"Unsupported input format. Supported: {supported}"}), 400
+
+        ensure_dirs()
+        job_dir = SESSION_ROOT / uuid.uuid4().hex
+        job_dir.mkdir(parents=True)
+        input_path = job_dir / (secure_filename(upload.filename) or "model.stl")
+        upload.save(input_path)
+        file_digest = file_sha256(input_path)
+
+    if run_async or profile or input_path.stat().st_size >= CONVERT_ASYNC_MIN_BYTES:
+        return start_convert_job(job_dir, input_path, file_digest, target_formats, profile)
+    try:
+        return convert_file(input_path, file_digest, target_formats, archive)
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def produce_conversions(
+    input_path: Path,
+    file_digest: str,
+    target_formats: list[str],
+    convert: Callable[[Path, dict[str, Path]], dict[str, str]] = convert_mesh_targets,
+) -> tuple[dict[str, Path], dict[str, str], list[dict]]:
+    """Convert ``input_path`` into OUTPUT_DIR for every target, restoring cached ones.
+
+    ``convert`` runs the uncached targets (in this process by default).
+    Returns the output paths, per-format errors and an artifact entry for
+    each target that succeeded.
+    """
+    ensure_dirs()
+    safe_stem = secure_filename(input_path.stem) or "model"
+    engine = converter_engine()
+    outputs: dict[str, Path] = {}
+    keys: dict[str, str] = {}
+    cached_formats: set[str] = set()
+    for fmt in target_formats:
+        outputs[fmt] = unique_output_path(OUTPUT_DIR, safe_stem, f".converted.{fmt}")
+        keys[fmt] = cache_key(file_digest, f"convert:{fmt}", [], engine=engine)
+        cached = cache_get(keys[fmt])
+        if cached and cache_restore_artifact(keys[fmt], cached, outputs[fmt]):
+            cached_formats.add(fmt)
+
+    missing = {fmt: path for fmt, path in outputs.items() if fmt not in cached_formats}
+    errors: dict[str, str] = {}
+    if missing:
+        started = time.perf_counter()
+        try:
+            errors = convert(input_path, missing)
+        finally:
+            elapsed = time.perf_counter() - started
+            for fmt in missing:
+                conversion_seconds.observe(elapsed, source=file_extension(input_path.name), target=fmt)
+    artifacts = []
+    for fmt, path in outputs.items():
+        if fmt in errors:
+            path.unlink(missing_ok=True)
+            continue
+        if fmt in missing:
+            cache_put(keys[fmt], {"target_format": fmt}, artifact=path)
+        size = path.stat().st_size
+        precompress_output(path, at_rest=OUTPUT_COMPRESS_AT_REST)
+        artifacts.append(
+            {
+                "target_format": fmt,
+                "output_name": path.name,
+                "download_url": f"/convert/{path.name}",
+                "size": size,
+                "cached": fmt in cached_formats,
+            }
+        )
+    return outputs, errors, artifacts
 
-    if not upload.filename:
-        return jsonify({"error": "No file selected"}), 400
 
-    if not allowed_converter_file(upload.filename):
-        supported = ", ".join(sorted(CONVERTER_ALLOWED_EXTENSIONS))
-        return jsonify({"error": f"Unsupported input format. Supported: {supported}"}), 400
+def convert_file(input_path: Path, file_digest: str, target_formats: list[str], archive: bool = False):
+    """Convert in the request and answer with the file, the artifact list or a zip of them."""
+    try:
+        outputs, errors, artifacts = produce_conversions(input_path, file_digest, target_formats)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as exc:
+        return jsonify({"error": f"Conversion failed: {exc}"}), 500
+
+    if len(target_formats) == 1:
+        fmt = target_formats[0]
+        if fmt in errors:
+            return jsonify({"error": errors[fmt]}), 400
+        response = send_output(outputs[fmt])
+        response.headers["X-Download-Url"] = f"/convert/{outputs[fmt].name}"
+        return response
+
+    if not artifacts:
+        return jsonify({"error": "Conversion failed for every target format.", "errors": errors}), 400
+    if archive:
+        return stream_conversion_zip(artifacts, errors, secure_filename(input_path.stem) or "model")
+    return jsonify({"artifacts": artifacts, "errors": errors})
+
+
+def stream_conversion_zip(artifacts: list[dict], errors: dict[str, str], stem: str) -> Response:
+    members = [(item["output_name"], OUTPUT_DIR / item["output_name"]) for item in artifacts]
+    extras = [("errors.json", json.dumps(errors, indent=2))] if errors else []
+    return Response(
+        (chunk for chunk in stream_zip(members, extras) if chunk),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{stem}-converted.zip"'},
+    )
 
-    if target_format not in CONVERTER_ALLOWED_EXTENSIONS:
-        supported = ", ".join(sorted(CONVERTER_ALLOWED_EXTENSIONS))
-        return jsonify({"error": f"Unsupported target format. Supported: {supported}"}), 400
 
-    ensure_dirs()
-    safe_name = secure_filename(upload.filename) or "model.stl"
-    safe_stem = secure_filename(Path(safe_name).stem) or "model"
+def conversion_pool() -> ProcessPoolExecutor:
+    with convert_pool_lock:
+        if convert_pool_state["pool"] is None:
+            # spawn, not fork: the server process has live threads and locks.
+            convert_pool_state["pool"] = ProcessPoolExecutor(
+                max_workers=CONVERT_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+            )
+        return convert_pool_state["pool"]
 
-    with tempfile.TemporaryDirectory(prefix="manifixer-convert-") as td:
-        temp_in = Path(td) / safe_name
-        upload.save(temp_in)
 
-        output_path = unique_output_path(OUTPUT_DIR, safe_stem, f".converted.{target_format}")
-        try:
-            convert_mesh(temp_in, output_path, target_format)
-        except ValueError as exc:
-            return jsonify({"error": str(exc)}), 400
-        except Exception as exc:
-            return jsonify({"error": f"Conversion failed: {exc}"}), 500
+def convert_in_process_pool(input_path: Path, outputs: dict[str, Path]) -> dict[str, str]:
+    """convert_mesh_targets in a worker process, so parsing neither holds the GIL nor a request thread."""
+    pool = conversion_pool()
+    with convert_pool_lock:
+        convert_pool_state["busy"] += 1
+        worker_utilization_ratio.observe(min(1.0, convert_pool_state["busy"] / CONVERT_PROCESSES), pool="convert")
+    try:
+        return pool.submit(convert_mesh_targets, input_path, outputs).result()
+    except BrokenProcessPool as exc:
+        with convert_pool_lock:
+            if convert_pool_state["pool"] is pool:
+                convert_pool_state["pool"] = None
+        pool.shutdown(wait=False)
+        raise RuntimeError("Conversion worker process exited unexpectedly.") from exc
+    finally:
+        with convert_pool_lock:
+            convert_pool_state["busy"] -= 1
+
+
+def start_convert_job(
+    job_dir: Path, input_path: Path, file_digest: str, target_formats: list[str], profile: bool = False
+):
+    cleanup_expired_sessions()
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    job = {
+        "session_id": job_id,
+        "kind": "convert",
+        "filename": input_path.name,
+        "status": "queued",
+        "stage": "queued",
+        "session_dir": str(job_dir),
+        "input_path": str(input_path),
+        "file_sha256": file_digest,
+        "target_formats": target_formats,
+        "output_path": None,
+        "output_name": None,
+        "artifacts": None,
+        "conversion_errors": None,
+        "profile": profile,
+        "created_at": now,
+        "updated_at": now,
+        "last_accessed_at": now,
+    }
+    logs = [f"[Convert] {input_path.name} -> {', '.join(target_formats)} queued"]
+    for evicted in session_store.create(job, logs):
+        remove_session_files(evicted.get("session_dir"))
+    if submit_job(job_id, run_convert_job, (job_id,), PRIORITY_INTERACTIVE) is None:
+        session_store.delete(job_id)
+        shutil.rmtree(job_dir, ignore_errors=True)
+        return jsonify({"error": "Conversion queue is full. Try again shortly."}), 503
+    return jsonify(convert_job_summary(job)), 202
+
+
+def run_convert_job(job_id: str) -> None:
+    job = get_session(job_id, touch=False)
+    if not job:
+        return
+    input_path = Path(job["input_path"])
+    # A profiled job parses in this process: cProfile cannot follow it into the pool.
+    dump_path = Path(job["session_dir"]) / "profile.pstats" if job.get("profile") else None
+    timings: list[dict] = []
+    update_session(
+        job_id,
+        status="converting",
+        stage="converting",
+        append_logs=[f"[Convert] parsing {input_path.name} {'in-process (profiled)' if dump_path else 'in a worker process'}"],
+    )
+    try:
+        with profiled(dump_path) as profile_path, timed_step(timings, "convert"):
+            _outputs, errors, artifacts = produce_conversions(
+                input_path,
+                job["file_sha256"],
+                job["target_formats"],
+                convert=convert_mesh_targets if profile_path else convert_in_process_pool,
+            )
+    except Exception as exc:
+        print(f"[CONVERT ERROR] {job_id}: {exc}", flush=True)
+        update_session(
+            job_id,
+            status="failed",
+            stage="failed",
+            conversion_errors={"input": str(exc)},
+            timings=timings,
+            **profile_fields(job_id, dump_path),
+            append_logs=[f"[Convert ERROR] {exc}"],
+        )
+        return
+    finally:
+        input_path.unlink(missing_ok=True)
+
+    logs = [f"[Convert] {item['target_format']}: {item['output_name']} ({item['size']} bytes)" for item in artifacts]
+    logs += [f"[Convert ERROR] {fmt}: {error}" for fmt, error in errors.items()]
+    status = "completed" if artifacts else "failed"
+    update_session(
+        job_id,
+        status=status,
+        stage=status,
+        artifacts=artifacts,
+        conversion_errors=errors,
+        output_name=artifacts[0]["output_name"] if len(artifacts) == 1 else None,
+        timings=timings,
+        **profile_fields(job_id, profile_path),
+        append_logs=logs,
+    )
 
-    response = send_file(output_path, as_attachment=True, download_name=output_path.name)
-    response.headers["X-Output-Name"] = output_path.name
-    return response
+
+def convert_job_summary(job: dict) -> dict:
+    job_id = job["session_id"]
+    artifacts = job.get("artifacts") or []
+    return {
+        "job_id": job_id,
+        "status": job.get("status"),
+        "stage": job.get("stage"),
+        "filename": job.get("filename"),
+        "target_formats": job.get("target_formats"),
+        "queue_position": job_queue_position(job_id),
+        "artifacts": artifacts,
+        "errors": job.get("conversion_errors") or {},
+        "job_url": f"/convert/jobs/{job_id}",
+        "status_url": f"/status/{job_id}",
+        "events_url": f"/status/{job_id}/events",
+        "download_url": f"/convert/jobs/{job_id}/download" if artifacts else None,
+        "timings": job.get("timings"),
+        "profile_url": job.get("profile_url"),
+    }
+
+
+@app.get("/convert/jobs/<job_id>")
+def convert_job_status(job_id: str):
+    job = get_session(job_id)
+    if not job or job.get("kind") != "convert":
+        return jsonify({"error": "Conversion job not found"}), 404
+    return jsonify(convert_job_summary(job))
+
+
+@app.get("/convert/jobs/<job_id>/download")
+def download_convert_job(job_id: str):
+    """The converted file, or a zip of every target when the job had several."""
+    job = get_session(job_id)
+    if not job or job.get("kind") != "convert":
+        return jsonify({"error": "Conversion job not found"}), 404
+    artifacts = job.get("artifacts") or []
+    if job.get("status") != "completed" or not artifacts:
+        return jsonify({"error": "Conversion not completed", **convert_job_summary(job)}), 409
+    if len(artifacts) == 1:
+        output_path = OUTPUT_DIR / artifacts[0]["output_name"]
+        if not output_exists(output_path):
+            return jsonify({"error": "Converted file not found"}), 404
+        return send_output(output_path)
+    stem = Path(secure_filename(job.get("filename") or "") or "model").stem
+    return stream_conversion_zip(artifacts, job.get("conversion_errors") or {}, stem)
+
+
+@app.get("/convert/<output_name>")
+def download_converted(output_name: str):
+    """Re-fetch a converted file; supports conditional and Range requests for resuming."""
+    safe_name = secure_filename(output_name)
+    if safe_name != output_name or ".converted." not in safe_name:
+        return jsonify({"error": "Converted file not found"}), 404
+    output_path = OUTPUT_DIR / safe_name
+    if not output_exists(output_path):
+        return jsonify({"error": "Converted file not found"}), 404
+    return send_output(output_path)
 
 
 @app.get("/metrics")
 def metrics():
-    with stats_lock:
-        current_stats = dict(stats)
-    with sessions_lock:
-        active = len(sessions)
     return jsonify(
         {
             "status": "ok",
-            "active_sessions": active,
+            "active_sessions": session_store.count(),
             "max_sessions": MAX_SESSIONS,
             "session_ttl_seconds": SESSION_TTL_SECONDS,
             "admesh_timeout_seconds": ADMESH_TIMEOUT_SECONDS,
-            "stats": current_stats,
+            "scheduler": scheduler_snapshot(),
+            "session_store": session_store.name,
+            "stats": session_store.stats_snapshot(),
         }
     )
 
 
+@app.get("/metrics/prometheus")
+def prometheus_metrics():
+    """Prometheus text format: shared histograms and counters, plus gauges of the answering process."""
+    snapshot = session_store.metrics_snapshot()
+    lines: list[str] = []
+    for histogram in METRIC_HISTOGRAMS:
+        lines += histogram.render(snapshot)
+    stats = session_store.stats_snapshot()
+    for key in STAT_KEYS:
+        documentation = f"Total {key.replace('_', ' ')}."
+        lines += render_sample(f"manifixer_{key}_total", "counter", documentation, [({}, stats[key])])
+    scheduler = scheduler_snapshot()
+    with convert_pool_lock:
+        convert_busy = convert_pool_state["busy"]
+    gauges = [
+        ("manifixer_active_sessions", "Sessions currently held by the session store.", session_store.count()),
+        ("manifixer_scheduler_workers", "Scheduler jobs allowed to run at once, all workers.", scheduler["workers"]),
+        ("manifixer_scheduler_running", "Scheduler jobs running across all workers.", scheduler["running"]),
+        ("manifixer_watch_queue_depth", "Settled files waiting in this process's watch queue.", watch_queue.qsize()),
+        ("manifixer_convert_processes", "Conversion worker processes available to this process.", CONVERT_PROCESSES),
+        ("manifixer_convert_processes_busy", "Conversions this process has running in the pool.", convert_busy),
+    ]
+    for name, documentation, value in gauges:
+        lines += render_sample(name, "gauge", documentation, [({}, value)])
+    lines += render_sample(
+        "manifixer_scheduler_pending",
+        "gauge",
+        "Scheduler jobs waiting across all workers by priority.",
+        [
+            ({"priority": "interactive"}, scheduler["pending_interactive"]),
+            ({"priority": "batch"}, scheduler["pending_batch"]),
+        ],
+    )
+    return Response("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/sessions")
 def list_sessions():
     cleanup_expired_sessions()
-    with sessions_lock:
-        items = [
-            {
-                "session_id": sid,
-                "filename": s.get("filename"),
-                "status": s.get("status"),
-                "remaining_errors": s.get("remaining_errors", 0),
-                "created_at": s.get("created_at"),
-                "updated_at": s.get("updated_at"),
-                "output_name": s.get("output_name"),
-            }
-            for sid, s in sessions.items()
-        ]
+    items = [
+        {
+            "session_id": s["session_id"],
+            "kind": s.get("kind", "repair"),
+            "filename": s.get("filename"),
+            "status": s.get("status"),
+            "remaining_errors": s.get("remaining_errors", 0),
+            "created_at": s.get("created_at"),
+            "updated_at": s.get("updated_at"),
+            "output_name": s.get("output_name"),
+        }
+        for s in session_store.list()
+    ]
     items.sort(key=lambda item: item.get("updated_at") or 0, reverse=True)
     return jsonify({"sessions": items})
 
 
 @app.delete("/sessions/<session_id>")
 def delete_session(session_id: str):
-    with sessions_lock:
-        sess = sessions.pop(session_id, None)
-        try:
-            session_order.remove(session_id)
-        except ValueError:
-            pass
+    sess = session_store.delete(session_id)
     if not sess:
         return jsonify({"error": "Session not found"}), 404
 
@@ -1592,28 +4245,432 @@ def repair_upload():
     if not upload.filename or not allowed_repair_file(upload.filename):
         return jsonify({"error": "Only .stl files are supported"}), 400
 
+    inspector = (request.form.get("inspector") or INSPECT_BACKEND).strip().lower()
+    if inspector not in INSPECT_BACKENDS:
+        discard_upload(upload)
+        supported = ", ".join(sorted(INSPECT_BACKENDS))
+        return jsonify({"error": f"Unsupported inspector. Supported: {supported}"}), 400
+
+    backend = (request.form.get("backend") or REPAIR_BACKEND).strip().lower()
+    if backend not in REPAIR_BACKENDS:
+        discard_upload(upload)
+        supported = ", ".join(sorted(REPAIR_BACKENDS))
+        return jsonify({"error": f"Unsupported repair backend. Supported: {supported}"}), 400
+
     ensure_dirs()
     safe_name = secure_filename(upload.filename)
 
     with tempfile.TemporaryDirectory(prefix="manifixer-") as td:
         temp_in = Path(td) / safe_name
-        upload.save(temp_in)
+        file_digest = ingest_upload(upload, temp_in)
 
-        ok, logs, output, _report = process_one_file(temp_in)
+        ok, logs, output, _report = process_one_file(temp_in, inspector, backend, file_digest)
         if not ok:
             return jsonify({"error": "Repair failed", "logs": logs}), 500
 
-    return send_file(output, as_attachment=True, download_name=output.name)
+    precompress_output(output, at_rest=OUTPUT_COMPRESS_AT_REST)
+    return send_output(output)
 
 
-if __name__ == "__main__":
+class BatchInputError(ValueError):
+    pass
+
+
+class ZipStreamBuffer:
+    """Write-only sink for ``zipfile`` that hands back whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def batch_member_name(name: str) -> str | None:
+    """Safe relative path for a zip member, or None for folders, hidden files and unsupported formats."""
+    raw_parts = [part for part in PurePosixPath(name.replace("\\", "/")).parts if part not in ("", ".", "..", "/")]
+    if not raw_parts or any(part.startswith(".") or part == "__MACOSX" for part in raw_parts):
+        return None
+    parts = [secure_filename(part) for part in raw_parts]
+    if not all(parts) or not allowed_converter_file(parts[-1]):
+        return None
+    return "/".join(parts)
+
+
+def add_batch_file(input_dir: Path, relative: str, files: list[str]) -> Path:
+    """Reserve a unique destination under ``input_dir`` for ``relative`` and record it in ``files``."""
+    if len(files) >= MAX_BATCH_FILES:
+        raise BatchInputError(f"A batch holds at most {MAX_BATCH_FILES} files.")
+    stem, dot, ext = relative.rpartition(".")
+    candidate, index = relative, 1
+    while candidate in files:
+        candidate = f"{stem}.{index}{dot}{ext}"
+        index += 1
+    files.append(candidate)
+    destination = input_dir / candidate
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    return destination
+
+
+def extract_batch_zip(archive: Path, input_dir: Path, files: list[str]) -> None:
+    """Unpack the supported meshes of ``archive``, refusing archives that inflate past MAX_UPLOAD_BYTES."""
+    remaining = MAX_UPLOAD_BYTES
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                relative = None if info.is_dir() else batch_member_name(info.filename)
+                if relative is None:
+                    continue
+                destination = add_batch_file(input_dir, relative, files)
+                # Count real bytes: the sizes in the central directory are the archive's own claim.
+                with zf.open(info) as src, destination.open("wb") as dst:
+                    while chunk := src.read(UPLOAD_CHUNK_READ_BYTES):
+                        remaining -= len(chunk)
+                        if remaining < 0:
+                            raise BatchInputError(f"Archive expands past the {MAX_UPLOAD_BYTES} byte limit.")
+                        dst.write(chunk)
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError) as exc:
+        raise BatchInputError(f"Could not read zip archive: {exc}") from exc
+
+
+def repair_batch_file(
+    source: Path, output_dir: Path, inspector: str, backend: str
+) -> tuple[bool, str, Path | None, dict]:
+    """Convert one batch file to STL if needed and repair it with process_one_file (sharing its cache)."""
+    ext = file_extension(source.name)
+    with tempfile.TemporaryDirectory(prefix="manifixer-batch-") as td:
+        stl_source = source
+        if ext != "stl":
+            stl_source = Path(td) / f"{source.stem}.stl"
+            try:
+                convert_mesh(source, stl_source, "stl")
+            except ValueError as exc:
+                return False, f"[convert {ext} -> stl] {exc}", None, {}
+        ok, logs, destination, report = process_one_file(
+            stl_source, inspector, backend, output_dir=output_dir, pipeline="batch"
+        )
+    if not ok:
+        destination.unlink(missing_ok=True)
+        return False, logs, None, report
+    return True, logs, destination, report
+
+
+def run_batch_item(batch_id: str, index: int, relative: str, inspector: str, backend: str) -> None:
+    sess = get_session(batch_id, touch=False)
+    if not sess:
+        return
+    batch_dir = Path(sess["session_dir"])
+    output_dir = (batch_dir / "output" / relative).parent
+    output_dir.mkdir(parents=True, exist_ok=True)
+    session_store.set_item(batch_id, index, {"status": "repairing"})
+    try:
+        ok, logs, output, report = repair_batch_file(batch_dir / "input" / relative, output_dir, inspector, backend)
+    except Exception as exc:
+        ok, logs, output, report = False, f"batch repair failed: {exc}", None, {}
+    increment_stat("repair_success" if ok else "repair_failed")
+    result = {
+        "status": "completed" if ok else "failed",
+        "output": output.relative_to(batch_dir / "output").as_posix() if output else None,
+        "remaining_errors": report.get("errors", {}).get("after"),
+        "quality_report": report,
+    }
+    if not ok:
+        result["error"] = logs[-2000:]
+    if session_store.set_item(batch_id, index, result, done=True) == len(sess["files"]):
+        summary = batch_summary(sess)
+        # Several workers can finish the last files together; the status check lets only one close the batch.
+        update_session(
+            batch_id,
+            expected_status={"running"},
+            status="completed",
+            stage="done",
+            append_logs=[f"[Batch] {summary['completed']} repaired, {summary['failed']} failed"],
+        )
+
+
+def dispatch_batch(batch_id: str, files: list[str], inspector: str, backend: str) -> None:
+    """Feed the batch to the scheduler behind interactive work, waiting whenever its queue is full."""
+    update_session(batch_id, status="running", stage="running")
+    index = 0
+    try:
+        for index, relative in enumerate(files):
+            submit_job(
+                f"{batch_id}:{index}",
+                run_batch_item,
+                (batch_id, index, relative, inspector, backend),
+                PRIORITY_BATCH,
+                block=True,
+            )
+    except Exception as exc:
+        print(f"[BATCH ERROR] {batch_id}: dispatch stopped at file {index}: {exc}", flush=True)
+        error = f"batch dispatch failed: {exc}"
+        for skipped in range(index, len(files)):
+            session_store.set_item(batch_id, skipped, {"status": "failed", "error": error}, done=True)
+        # Files already submitted still finish, but nothing closes the batch as completed now.
+        update_session(
+            batch_id,
+            expected_status={"running"},
+            status="failed",
+            stage="failed",
+            append_logs=[f"[Batch] {error}"],
+        )
+
+
+def batch_summary(sess: dict) -> dict:
+    items = session_store.get_items(sess["session_id"])
+    files = [{"name": name, "status": "queued", **items.get(i, {})} for i, name in enumerate(sess["files"])]
+    statuses = [item["status"] for item in files]
+    return {
+        "batch_id": sess["session_id"],
+        "status": sess.get("status"),
+        "total": len(files),
+        "completed": statuses.count("completed"),
+        "failed": statuses.count("failed"),
+        "pending": len(files) - statuses.count("completed") - statuses.count("failed"),
+        "files": files,
+        "download_url": f"/batch/{sess['session_id']}/download" if sess.get("status") == "completed" else None,
+    }
+
+
+def batch_report(summary: dict) -> dict:
+    """Combined quality report for the result archive."""
+    reports = [item.get("quality_report") or {} for item in summary["files"]]
+    return {
+        "batch_id": summary["batch_id"],
+        "total": summary["total"],
+        "completed": summary["completed"],
+        "failed": summary["failed"],
+        "errors_before": sum(report.get("errors", {}).get("before", 0) for report in reports),
+        "errors_after": sum(report.get("errors", {}).get("after", 0) for report in reports),
+        "files": [
+            {key: item.get(key) for key in ("name", "status", "output", "quality_report", "error") if key in item}
+            for item in summary["files"]
+        ],
+    }
+
+
+def output_chunks(path: Path, chunk_size: int = UPLOAD_CHUNK_READ_BYTES):
+    """Bytes of an output file, decompressing the at-rest copy when the original was dropped."""
+    if path.exists():
+        with path.open("rb") as src:
+            while chunk := src.read(chunk_size):
+                yield chunk
+        return
+    for encoding, variant in output_variants(path).items():
+        yield from stream_decompressed(variant, encoding, chunk_size)
+        return
+
+
+def stream_zip(members: list[tuple[str, Path]], extras: list[tuple[str, str]] = ()):
+    """Yield a zip of ``(name, path)`` outputs plus ``(name, text)`` extras as it is built; nothing is held in memory."""
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        for name, path in members:
+            with zf.open(name, "w", force_zip64=True) as dst:
+                for chunk in output_chunks(path):
+                    dst.write(chunk)
+                    if buffer.chunks:
+                        yield buffer.drain()
+        for name, text in extras:
+            zf.writestr(name, text)
+    yield buffer.drain()
+
+
+def stream_batch_zip(sess: dict):
+    """The repaired files plus report.json."""
+    summary = batch_summary(sess)
+    output_root = Path(sess["session_dir"]) / "output"
+    members = [
+        (item["output"], output_root / item["output"])
+        for item in summary["files"]
+        if item.get("output") and output_exists(output_root / item["output"])
+    ]
+    return stream_zip(members, [("report.json", json.dumps(batch_report(summary), indent=2))])
+
+
+@app.post("/batch")
+def create_batch():
+    """Repair every mesh in a zip (or in several uploaded files) in parallel on the scheduler."""
+    uploads_in = [upload for upload in request.files.getlist("file") + request.files.getlist("files") if upload.filename]
+    if not uploads_in:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    inspector = (request.form.get("inspector") or INSPECT_BACKEND).strip().lower()
+    if inspector not in INSPECT_BACKENDS:
+        supported = ", ".join(sorted(INSPECT_BACKENDS))
+        return jsonify({"error": f"Unsupported inspector. Supported: {supported}"}), 400
+
+    backend = (request.form.get("backend") or REPAIR_BACKEND).strip().lower()
+    if backend not in REPAIR_BACKENDS:
+        supported = ", ".join(sorted(REPAIR_BACKENDS))
+        return jsonify({"error": f"Unsupported repair backend. Supported: {supported}"}), 400
+
+    cleanup_expired_sessions()
+    ensure_dirs()
+    batch_id = uuid.uuid4().hex
+    batch_dir = SESSION_ROOT / batch_id
+    input_dir = batch_dir / "input"
+    input_dir.mkdir(parents=True, exist_ok=True)
+    files: list[str] = []
+    try:
+        for upload in uploads_in:
+            safe_name = secure_filename(upload.filename)
+            if file_extension(safe_name) == "zip":
+                archive = batch_dir / f"upload-{uuid.uuid4().hex}.zip"
+                upload.save(archive)
+                extract_batch_zip(archive, input_dir, files)
+                archive.unlink(missing_ok=True)
+            elif safe_name and allowed_converter_file(safe_name):
+                upload.save(add_batch_file(input_dir, safe_name, files))
+            else:
+                supported = ", ".join(sorted(CONVERTER_ALLOWED_EXTENSIONS | {"zip"}))
+                raise BatchInputError(f"Unsupported file {upload.filename!r}. Supported: {supported}")
+        if not files:
+            raise BatchInputError("No supported mesh files found in the upload.")
+    except BatchInputError as exc:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        return jsonify({"error": str(exc)}), 400
+
+    now = time.time()
+    batch = {
+        "session_id": batch_id,
+        "kind": "batch",
+        "filename": secure_filename(uploads_in[0].filename) if len(uploads_in) == 1 else f"{len(files)} files",
+        "status": "queued",
+        "stage": "queued",
+        "session_dir": str(batch_dir),
+        "files": files,
+        "inspector": inspector,
+        "repair_backend": backend,
+        "created_at": now,
+        "updated_at": now,
+        "last_accessed_at": now,
+    }
+    for evicted in session_store.create(batch, [f"[Batch] {len(files)} files queued"]):
+        remove_session_files(evicted.get("session_dir"))
+    threading.Thread(target=dispatch_batch, args=(batch_id, files, inspector, backend), daemon=True).start()
+    return jsonify(batch_summary(batch)), 202
+
+
+@app.get("/batch/<batch_id>")
+def batch_status(batch_id: str):
+    sess = get_session(batch_id)
+    if not sess or sess.get("kind") != "batch":
+        return jsonify({"error": "Batch not found"}), 404
+    return jsonify(batch_summary(sess))
+
+
+@app.get("/batch/<batch_id>/download")
+def download_batch(batch_id: str):
+    sess = get_session(batch_id)
+    if not sess or sess.get("kind") != "batch":
+        return jsonify({"error": "Batch not found"}), 404
+    if sess.get("status") != "completed":
+        error = "Batch failed" if sess.get("status") == "failed" else "Batch is still running"
+        return jsonify({"error": error, **batch_summary(sess)}), 409
+    stem = Path(secure_filename(sess.get("filename") or "") or "batch").stem
+    return Response(
+        (chunk for chunk in stream_batch_zip(sess) if chunk),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{stem}-fixed.zip"'},
+    )
+
+
+def run_watch_services() -> None:
+    """Run the folder watcher, holding a lock so only one worker process of a WSGI server does."""
+    lock_fh = (OUTPUT_DIR / ".manifixer-watch.lock").open("a")
+    try:
+        fcntl.flock(lock_fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print(f"[WATCHER] another worker process owns {INPUT_DIR}; waiting", flush=True)
+        fcntl.flock(lock_fh.fileno(), fcntl.LOCK_EX)
+    background_state["watch_lock"] = lock_fh
+    producer_thread = threading.Thread(target=watcher_loop, daemon=True)
+    producer_thread.start()
+    stability_thread = threading.Thread(target=stability_loop, daemon=True)
+    stability_thread.start()
+    for i in range(WATCH_WORKERS):
+        worker_thread = threading.Thread(target=watch_worker_loop, args=(i + 1,), daemon=True)
+        worker_thread.start()
+
+
+def warm_up() -> None:
+    """Compile the page template and load the converter stack (trimesh, numpy, exporters) ahead of first use."""
+    started = time.perf_counter()
+    try:
+        app.jinja_env.get_template("index.html")
+        import numpy as np
+        tetrahedron = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float64)
+        faces = np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]])
+        with tempfile.TemporaryDirectory(prefix="manifixer-warmup-") as td:
+            source = Path(td) / "warmup.stl"
+            native_mesh_module().write_binary_stl(source, tetrahedron, faces)
+            convert_mesh_targets(source, {fmt: Path(td) / f"warmup.{fmt}" for fmt in CONVERTER_EXPORT_TYPES})
+    except Exception as exc:
+        print(f"[WARMUP ERROR] {exc}", flush=True)
+        return
+    print(f"[WARMUP] converter ready in {time.perf_counter() - started:.2f}s", flush=True)
+
+
+def start_background_services() -> None:
+    """Start cleanup and (with WATCH_MODE) the folder watcher; safe to call once per process."""
+    with background_lock:
+        if background_state["started"]:
+            return
+        background_state["started"] = True
     ensure_dirs()
     cleanup_thread = threading.Thread(target=cleanup_loop, daemon=True)
     cleanup_thread.start()
     if WATCH_MODE:
-        producer_thread = threading.Thread(target=watcher_loop, daemon=True)
-        producer_thread.start()
-        for i in range(WATCH_WORKERS):
-            worker_thread = threading.Thread(target=watch_worker_loop, args=(i + 1,), daemon=True)
-            worker_thread.start()
+        watch_thread = threading.Thread(target=run_watch_services, daemon=True)
+        watch_thread.start()
+
+
+def wait_until_listening(port: int, timeout: float = 30.0) -> bool:
+    """Poll until something accepts connections on localhost:``port``."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def start_warm_up(port: int | None = None) -> None:
+    """Warm up in the background once the web server is serving (STARTUP_WARMUP).
+
+    Called only by the web entry points, never by start_background_services,
+    so watch-only processes skip it. With ``port``, waits until the server has
+    bound it; the gunicorn hook passes none because the master already has.
+    """
+    if not STARTUP_WARMUP:
+        return
+    with background_lock:
+        if background_state["warmed"]:
+            return
+        background_state["warmed"] = True
+
+    def run() -> None:
+        if port is not None and not wait_until_listening(port):
+            print(f"[WARMUP ERROR] nothing listening on port {port}; skipped", flush=True)
+            return
+        warm_up()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+if __name__ == "__main__":
+    start_background_services()
+    start_warm_up(PORT)
     app.run(host="0.0.0.0", port=PORT)
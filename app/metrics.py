@@ -0,0 +1,99 @@
+"""Prometheus text exposition (format 0.0.4) without a client library.
+
+Histogram observations are turned into counter increments and handed to a
+sink (the session store's ``add_metrics``), so with the SQLite store every
+worker process of a WSGI server adds to, and scrapes, the same series.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_PER_SECOND_BUCKETS = tuple(2.0**exp for exp in range(16, 34, 2))  # 64 KiB/s .. 4 GiB/s
+TRIANGLE_BUCKETS = (100, 1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000)
+RATIO_BUCKETS = (0.0, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+
+def escape_label(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Iterable[tuple[str, object]]) -> str:
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in labels)
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram stored as ``name|labels|suffix`` counters in ``sink``."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...],
+        sink: Callable[[dict[str, float]], None],
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self.sink = sink
+
+    def observe(self, value: float, **labels: object) -> None:
+        label_text = format_labels((name, labels.get(name, "")) for name in self.labelnames)
+        prefix = f"{self.name}|{label_text}|"
+        increments = {prefix + format_value(bound): 1.0 for bound in self.buckets if value <= bound}
+        increments[prefix + "+Inf"] = 1.0
+        increments[prefix + "sum"] = float(value)
+        increments[prefix + "count"] = 1.0
+        try:
+            self.sink(increments)
+        except Exception as exc:  # a metrics hiccup must never fail the request or job being measured
+            print(f"[METRICS ERROR] {self.name}: {exc}", flush=True)
+
+    @contextmanager
+    def time(self, **labels: object):
+        """Observe the wall time of the ``with`` block, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self, snapshot: dict[str, float]) -> list[str]:
+        series: dict[str, dict[str, float]] = {}
+        prefix = f"{self.name}|"
+        for key, value in snapshot.items():
+            if key.startswith(prefix):
+                label_text, suffix = key[len(prefix) :].rsplit("|", 1)
+                series.setdefault(label_text, {})[suffix] = value
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_text in sorted(series):
+            values = series[label_text]
+            sep = "," if label_text else ""
+            for bound in [*map(format_value, self.buckets), "+Inf"]:
+                count = format_value(values.get(bound, 0.0))
+                lines.append(f'{self.name}_bucket{{{label_text}{sep}le="{bound}"}} {count}')
+            braces = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{self.name}_sum{braces} {format_value(values.get('sum', 0.0))}")
+            lines.append(f"{self.name}_count{braces} {format_value(values.get('count', 0.0))}")
+        return lines
+
+
+def render_sample(name: str, kind: str, documentation: str, samples: list[tuple[dict, float]]) -> list[str]:
+    """HELP/TYPE header plus one line per ``(labels, value)`` for a counter or gauge family."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        label_text = format_labels(labels.items())
+        lines.append(f"{name}{{{label_text}}} {format_value(value)}" if label_text else f"{name} {format_value(value)}")
+    return lines
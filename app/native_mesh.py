@@ -0,0 +1,514 @@
+"""In-process mesh topology checks on plain numpy face/vertex arrays."""
+
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+
+import numpy as np
+
+# Bump when the numbers produced here change, so cached results are not reused.
+ENGINE_VERSION = "native-mesh/2"
+# Same for files written by the converters below.
+CONVERTER_VERSION = "native-convert/1"
+
+
+STL_HEADER_BYTES = 84
+STL_FACET_DTYPE = np.dtype(
+    [("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attributes", "<u2")]
+)
+TEXT_ROWS_PER_WRITE = 65536
+FACET_RECORDS_PER_WRITE = 1 << 20
+
+
+def open_binary_stl(path: Path) -> np.ndarray | None:
+    """Memory-map a binary STL as STL_FACET_DTYPE records; None when the file is not binary STL.
+
+    Pages are read on demand, so nothing is copied until a field is used.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    if size < STL_HEADER_BYTES:
+        return None
+    with path.open("rb") as fh:
+        head = fh.read(STL_HEADER_BYTES)
+    (count,) = struct.unpack_from("<I", head, 80)
+    # ASCII STL practically never has exactly the size a binary facet count implies.
+    if size != STL_HEADER_BYTES + STL_FACET_DTYPE.itemsize * count:
+        return None
+    if count == 0:
+        return np.zeros(0, dtype=STL_FACET_DTYPE)
+    return np.memmap(path, dtype=STL_FACET_DTYPE, mode="r", offset=STL_HEADER_BYTES, shape=(count,))
+
+
+def weld_stl_facets(facets: np.ndarray, dtype=np.float32) -> tuple[np.ndarray, np.ndarray]:
+    """(vertices, faces) from STL facet records, merging bit-identical corners like ``weld_exact``."""
+    corners = np.array(facets["vertices"], dtype=dtype).reshape(-1, 3)
+    if len(corners) == 0:
+        return corners, np.zeros((0, 3), dtype=np.int64)
+    corners += 0.0
+    rows = corners.view(np.dtype((np.void, corners.dtype.itemsize * 3))).ravel()
+    _unique, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return corners[first], inverse.reshape(-1, 3)
+
+
+def load_mesh_arrays(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Load a mesh file as (vertices, faces) with exactly coincident vertices merged."""
+    facets = open_binary_stl(path)
+    if facets is not None:
+        return weld_stl_facets(facets, np.float64)
+    import trimesh  # only non-STL (or ASCII STL) input needs it
+    loaded = trimesh.load(str(path), force="mesh", process=False)
+    if not isinstance(loaded, trimesh.Trimesh):
+        raise ValueError("Unsupported mesh data in input file.")
+    vertices = np.asarray(loaded.vertices, dtype=np.float64)
+    faces = np.asarray(loaded.faces, dtype=np.int64)
+    return weld_exact(vertices, faces)
+
+
+def weld_exact(vertices: np.ndarray, faces: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Merge vertices with bit-identical coordinates (admesh --exact)."""
+    if len(vertices) == 0:
+        return vertices.reshape(0, 3), faces.reshape(0, 3)
+    # +0.0 folds -0.0 into 0.0 so both hash to the same row.
+    coords = np.ascontiguousarray(vertices + 0.0)
+    rows = coords.view(np.dtype((np.void, coords.dtype.itemsize * 3))).ravel()
+    _unique, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return coords[first], inverse.reshape(-1)[faces]
+
+
+def degenerate_mask(faces: np.ndarray) -> np.ndarray:
+    return (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 2] == faces[:, 0])
+
+
+def directed_edges(faces: np.ndarray) -> np.ndarray:
+    """The three directed half-edges of every face, face-major: shape (3 * F, 2)."""
+    return faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+
+
+def edge_table(faces: np.ndarray, vertex_count: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sort half-edges into undirected edges.
+
+    Returns (edge_keys, inverse, counts, forward) where ``inverse`` maps each
+    half-edge to its undirected edge, ``counts`` is the number of faces using
+    each edge and ``forward`` how many of them traverse it low -> high.
+    """
+    half = directed_edges(faces)
+    low = np.minimum(half[:, 0], half[:, 1])
+    high = np.maximum(half[:, 0], half[:, 1])
+    keys = low * np.int64(max(vertex_count, 1)) + high
+    edge_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    forward = np.bincount(inverse, weights=(half[:, 0] < half[:, 1]), minlength=len(edge_keys))
+    return edge_keys, inverse, counts, forward.astype(np.int64)
+
+
+def connected_labels(edges: np.ndarray, count: int) -> np.ndarray:
+    """Label connected components of a graph given as an (E, 2) edge array.
+
+    Uses vectorized hooking plus pointer jumping, so the number of passes grows
+    with log(component diameter) instead of one Python step per node.
+    """
+    labels = np.arange(count, dtype=np.int64)
+    if len(edges) == 0:
+        return labels
+    a = edges[:, 0]
+    b = edges[:, 1]
+    while True:
+        la = labels[a]
+        lb = labels[b]
+        if np.array_equal(la, lb):
+            return labels
+        low = np.minimum(la, lb)
+        np.minimum.at(labels, la, low)
+        np.minimum.at(labels, lb, low)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+
+def manifold_pairs(inverse: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The two faces on every two-face edge, from edge_table's ``inverse``/``counts``: (face_a, face_b, edge)."""
+    order = np.argsort(inverse, kind="stable")
+    sorted_edges = inverse[order]
+    manifold = counts[sorted_edges] == 2
+    # Two-face edges occupy consecutive slots once half-edges are sorted by edge.
+    starts = np.flatnonzero(manifold & np.r_[True, sorted_edges[1:] != sorted_edges[:-1]])
+    return order[starts] // 3, order[starts + 1] // 3, sorted_edges[starts]
+
+
+def part_labels(face_count: int, inverse: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Component id per face, where faces joined by a two-face edge belong to one part.
+
+    This is how admesh counts parts: it links faces that pair up across an edge,
+    so solids touching at a vertex, or a face hanging off a non-manifold edge,
+    are parts of their own.
+    """
+    face_a, face_b, _edges = manifold_pairs(inverse, counts)
+    labels = connected_labels(np.stack([face_a, face_b], axis=1), face_count)
+    return np.unique(labels, return_inverse=True)[1].reshape(-1)
+
+
+def shell_labels(faces: np.ndarray, vertex_count: int) -> np.ndarray:
+    """Component id per face, where faces sharing a vertex belong to one shell."""
+    if len(faces) == 0:
+        return np.zeros(0, dtype=np.int64)
+    vertex_labels = connected_labels(directed_edges(faces), vertex_count)
+    return np.unique(vertex_labels[faces[:, 0]], return_inverse=True)[1].reshape(-1)
+
+
+def inspect_arrays(vertices: np.ndarray, faces: np.ndarray) -> dict[str, int]:
+    degenerate = degenerate_mask(faces)
+    valid = faces[~degenerate]
+    _keys, inverse, counts, forward = edge_table(valid, len(vertices))
+    shells = part_labels(len(valid), inverse, counts)
+    return {
+        "facets": int(len(faces)),
+        "degenerate_facets": int(degenerate.sum()),
+        "edges": int(len(counts)),
+        "open_edges": int((counts == 1).sum()),
+        "non_manifold_edges": int((counts > 2).sum()),
+        # A two-face edge is consistently wound when the faces traverse it in opposite directions.
+        "inconsistent_edges": int(((counts == 2) & (forward != 1)).sum()),
+        "shells": int(shells.max() + 1) if len(shells) else 0,
+    }
+
+
+def inspect_file(path: Path) -> dict[str, int]:
+    vertices, faces = load_mesh_arrays(path)
+    return inspect_arrays(vertices, faces)
+
+
+# The 13 neighbour cells that sort after a cell; with the cell itself they cover every pair once.
+FORWARD_NEIGHBOURS = [
+    (dx, dy, dz)
+    for dx in (-1, 0, 1)
+    for dy in (-1, 0, 1)
+    for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+
+def weld_nearby(
+    vertices: np.ndarray, faces: np.ndarray, tolerance: float, iterations: int = 1
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """Merge vertices closer than ``tolerance`` using a hashed grid (admesh --nearby).
+
+    Vertices are bucketed into cells of size ``tolerance`` and candidate pairs
+    come only from a cell and its neighbours, so the work stays proportional to
+    the vertex count. Pairs within tolerance are unioned and every cluster
+    collapses onto its lowest-index vertex. Returns the welded arrays and the
+    number of vertices merged away.
+    """
+    if tolerance <= 0 or len(vertices) == 0:
+        return vertices, faces, 0
+    original = len(vertices)
+    for _ in range(max(1, iterations)):
+        cells = np.floor(vertices / tolerance).astype(np.int64)
+        cells -= cells.min(axis=0) - 1
+        dims = cells.max(axis=0) + 2
+        keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+        order = np.argsort(keys, kind="stable")
+        occupied, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+        pairs: list[np.ndarray] = []
+        for dx, dy, dz in [(0, 0, 0), *FORWARD_NEIGHBOURS]:
+            if (dx, dy, dz) == (0, 0, 0):
+                cell_a = np.flatnonzero(counts > 1)
+                cell_b = cell_a
+            else:
+                # occupied + offset stays sorted, which keeps searchsorted cache friendly.
+                target = occupied + (dx * dims[1] + dy) * dims[2] + dz
+                found = np.searchsorted(occupied, target)
+                hit = found < len(occupied)
+                hit[hit] = occupied[found[hit]] == target[hit]
+                cell_a = np.flatnonzero(hit)
+                cell_b = found[hit]
+            sizes = counts[cell_a] * counts[cell_b]
+            total = int(sizes.sum())
+            if not total:
+                continue
+            owner = np.repeat(np.arange(len(cell_a)), sizes)
+            local = np.arange(total) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            width = counts[cell_b][owner]
+            index_a = local // width
+            index_b = local % width
+            if (dx, dy, dz) == (0, 0, 0):
+                keep = index_a < index_b
+                owner, index_a, index_b = owner[keep], index_a[keep], index_b[keep]
+            src = order[starts[cell_a][owner] + index_a]
+            dst = order[starts[cell_b][owner] + index_b]
+            delta = vertices[src] - vertices[dst]
+            close = np.einsum("ij,ij->i", delta, delta) <= tolerance * tolerance
+            pairs.append(np.stack([src[close], dst[close]], axis=1))
+
+        merge = np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+        if not len(merge):
+            break
+        labels = connected_labels(merge, len(vertices))
+        roots, inverse = np.unique(labels, return_inverse=True)
+        vertices = vertices[roots]
+        faces = inverse.reshape(-1)[faces]
+    return vertices, faces, original - len(vertices)
+
+
+def drop_degenerate(faces: np.ndarray) -> tuple[np.ndarray, int]:
+    mask = degenerate_mask(faces)
+    return faces[~mask], int(mask.sum())
+
+
+def compact_vertices(vertices: np.ndarray, faces: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Drop vertices no face refers to."""
+    used, inverse = np.unique(faces.reshape(-1), return_inverse=True)
+    return vertices[used], inverse.reshape(faces.shape)
+
+
+def remove_small_shells(
+    vertices: np.ndarray, faces: np.ndarray, min_faces: int
+) -> tuple[np.ndarray, int]:
+    """Drop shells with fewer than ``min_faces`` faces (admesh --remove-unconnected)."""
+    if len(faces) == 0:
+        return faces, 0
+    labels = shell_labels(faces, len(vertices))
+    sizes = np.bincount(labels)
+    keep = sizes[labels] >= min_faces
+    return faces[keep], int((~keep).sum())
+
+
+def unify_winding(vertices: np.ndarray, faces: np.ndarray) -> tuple[np.ndarray, int]:
+    """Give every face the winding of its neighbours, then orient each shell outward.
+
+    A level-synchronous BFS walks face adjacency across two-face edges; all faces
+    of one BFS level are resolved with a single vectorized gather, so the Python
+    loop runs once per level rather than once per face.
+    """
+    face_count = len(faces)
+    if face_count == 0:
+        return faces, 0
+    _keys, inverse, counts, forward = edge_table(faces, len(vertices))
+    face_a, face_b, shared = manifold_pairs(inverse, counts)
+    same_direction = (forward[shared] != 1).astype(np.int8)
+
+    src = np.concatenate([face_a, face_b])
+    dst = np.concatenate([face_b, face_a])
+    relation = np.concatenate([same_direction, same_direction])
+    by_src = np.argsort(src, kind="stable")
+    dst = dst[by_src]
+    relation = relation[by_src]
+    indptr = np.zeros(face_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=face_count), out=indptr[1:])
+
+    flip = np.full(face_count, -1, dtype=np.int8)
+    components = connected_labels(np.stack([face_a, face_b], axis=1), face_count)
+    seeds = np.flatnonzero(components == np.arange(face_count))
+    flip[seeds] = 0
+    frontier = seeds
+    while len(frontier):
+        lengths = indptr[frontier + 1] - indptr[frontier]
+        if not lengths.sum():
+            break
+        owners = np.repeat(frontier, lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        slots = indptr[owners] + offsets
+        neighbours = dst[slots]
+        fresh = flip[neighbours] < 0
+        neighbours = neighbours[fresh]
+        flip[neighbours] = flip[owners[fresh]] ^ relation[slots[fresh]]
+        frontier = np.unique(neighbours)
+
+    flipped = flip == 1
+    faces = faces.copy()
+    faces[flipped] = faces[flipped][:, ::-1]
+
+    # Orient each shell so its signed volume is positive (normals point outward).
+    labels = shell_labels(faces, len(vertices))
+    tri = vertices[faces]
+    signed = np.einsum("ij,ij->i", tri[:, 0], np.cross(tri[:, 1], tri[:, 2]))
+    inward = np.bincount(labels, weights=signed) < 0
+    reverse = inward[labels]
+    faces[reverse] = faces[reverse][:, ::-1]
+    return faces, int((flipped ^ reverse).sum())
+
+
+def boundary_loops(faces: np.ndarray, vertex_count: int) -> list[list[int]]:
+    """Trace closed loops of open edges, following the direction of their faces.
+
+    Edges are consumed as they are walked; when a walk comes back to a vertex it
+    already passed (a pinched boundary), that stretch is split off as its own loop.
+    """
+    _keys, inverse, counts, _forward = edge_table(faces, vertex_count)
+    half = directed_edges(faces)
+    outgoing: dict[int, list[int]] = {}
+    for a, b in half[counts[inverse] == 1].tolist():
+        outgoing.setdefault(a, []).append(b)
+
+    loops: list[list[int]] = []
+    for start in list(outgoing):
+        while outgoing.get(start):
+            path = [start]
+            position = {start: 0}
+            current = start
+            while outgoing.get(current):
+                current = outgoing[current].pop()
+                if current in position:
+                    cut = position[current]
+                    loop = path[cut:]
+                    if len(loop) >= 3:
+                        loops.append(loop)
+                    for vertex in path[cut + 1 :]:
+                        del position[vertex]
+                    del path[cut + 1 :]
+                    if current == start and cut == 0:
+                        break
+                else:
+                    position[current] = len(path)
+                    path.append(current)
+    return loops
+
+
+def fill_holes(vertices: np.ndarray, faces: np.ndarray) -> tuple[np.ndarray, int, int]:
+    """Close every boundary loop with a triangle fan (admesh --fill-holes).
+
+    Fan faces run against the loop direction, so they wind consistently with
+    the faces around the hole. Returns (faces, holes filled, faces added).
+    """
+    if len(faces) == 0:
+        return faces, 0, 0
+    patches: list[np.ndarray] = []
+    loops = boundary_loops(faces, len(vertices))
+    for loop in loops:
+        ring = np.asarray(loop, dtype=np.int64)
+        patch = np.empty((len(ring) - 2, 3), dtype=np.int64)
+        patch[:, 0] = ring[0]
+        patch[:, 1] = ring[2:]
+        patch[:, 2] = ring[1:-1]
+        patches.append(patch)
+    if not patches:
+        return faces, 0, 0
+    added = np.concatenate(patches)
+    return np.concatenate([faces, added]), len(loops), len(added)
+
+
+def parse_flags(flags: list[str]) -> dict[str, float | int | bool]:
+    options: dict[str, float | int | bool] = {"tolerance": 0.0, "iterations": 1}
+    for flag in flags:
+        name, _sep, value = flag.lstrip("-").partition("=")
+        if name == "tolerance":
+            options["tolerance"] = float(value)
+        elif name == "iterations":
+            options["iterations"] = int(value)
+        else:
+            options[name] = True
+    return options
+
+
+def repair_arrays(
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    flags: list[str],
+    min_shell_faces: int = 4,
+    on_line=None,
+) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """Apply admesh-style repair flags in memory, in admesh's own step order.
+
+    Progress lines use admesh's wording so callers can track stages the same way
+    for both backends. Returns the repaired arrays and the log lines.
+    """
+    options = parse_flags(flags)
+    lines: list[str] = []
+
+    def note(line: str) -> None:
+        lines.append(line)
+        if on_line is not None:
+            on_line(line)
+
+    faces, degenerate = drop_degenerate(faces)
+    note(f"Checking exact...  Removed {degenerate} degenerate facets.")
+    if options.get("nearby"):
+        tolerance = float(options["tolerance"]) or 1e-5
+        note(f"Checking nearby. Tolerance= {tolerance:f} Iteration={options['iterations']}...")
+        vertices, faces, merged = weld_nearby(vertices, faces, tolerance, int(options["iterations"]))
+        faces, degenerate = drop_degenerate(faces)
+        note(f"  Merged {merged} vertices, removed {degenerate} degenerate facets.")
+    if options.get("remove-unconnected"):
+        note("Removing unconnected facets...")
+        faces, removed = remove_small_shells(vertices, faces, min_shell_faces)
+        note(f"  Removed {removed} facets in shells smaller than {min_shell_faces} facets.")
+    if options.get("fill-holes"):
+        note("Filling holes...")
+        faces, holes, added = fill_holes(vertices, faces)
+        note(f"  Filled {holes} holes with {added} facets.")
+    if options.get("normal-directions"):
+        note("Checking normal directions...")
+        faces, reversed_count = unify_winding(vertices, faces)
+        note(f"  Reversed {reversed_count} facets.")
+    vertices, faces = compact_vertices(vertices, faces)
+    return vertices, faces, lines
+
+
+def write_binary_stl(path: Path, vertices: np.ndarray, faces: np.ndarray) -> None:
+    tri = vertices[faces]
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    np.divide(normals, lengths, out=normals, where=lengths > 0)
+    records = np.zeros(len(faces), dtype=STL_FACET_DTYPE)
+    records["normal"] = normals
+    records["vertices"] = tri
+    header = b"manifixer native repair".ljust(80, b" ")
+    with Path(path).open("wb") as fh:
+        fh.write(header)
+        fh.write(np.uint32(len(records)).tobytes())
+        records.tofile(fh)
+
+
+def write_stl_facets(path: Path, facets: np.ndarray) -> None:
+    """Copy facet records (normals and attribute bytes included) into a fresh binary STL."""
+    header = b"manifixer binary stl".ljust(80, b" ")
+    with Path(path).open("wb") as fh:
+        fh.write(header)
+        fh.write(np.uint32(len(facets)).tobytes())
+        for start in range(0, len(facets), FACET_RECORDS_PER_WRITE):
+            np.ascontiguousarray(facets[start : start + FACET_RECORDS_PER_WRITE]).tofile(fh)
+
+
+def write_text_rows(fh, rows: np.ndarray, row_format: str) -> None:
+    """Write ``rows`` through one %-format per row, a block of rows per call."""
+    for start in range(0, len(rows), TEXT_ROWS_PER_WRITE):
+        block = rows[start : start + TEXT_ROWS_PER_WRITE]
+        fh.write((row_format * len(block)) % tuple(block.ravel().tolist()))
+
+
+def write_ply(path: Path, vertices: np.ndarray, faces: np.ndarray) -> None:
+    header = (
+        "ply\nformat binary_little_endian 1.0\n"
+        f"element vertex {len(vertices)}\n"
+        "property float x\nproperty float y\nproperty float z\n"
+        f"element face {len(faces)}\n"
+        "property list uchar int vertex_indices\nend_header\n"
+    )
+    records = np.empty(len(faces), dtype=np.dtype([("count", "u1"), ("indices", "<i4", (3,))]))
+    records["count"] = 3
+    records["indices"] = faces
+    with Path(path).open("wb") as fh:
+        fh.write(header.encode("ascii"))
+        np.ascontiguousarray(vertices, dtype="<f4").tofile(fh)
+        records.tofile(fh)
+
+
+def write_off(path: Path, vertices: np.ndarray, faces: np.ndarray) -> None:
+    with Path(path).open("w", encoding="ascii") as fh:
+        fh.write(f"OFF\n{len(vertices)} {len(faces)} 0\n")
+        write_text_rows(fh, vertices, "%.9g %.9g %.9g\n")
+        write_text_rows(fh, faces, "3 %d %d %d\n")
+
+
+def write_obj(path: Path, vertices: np.ndarray, faces: np.ndarray) -> None:
+    with Path(path).open("w", encoding="ascii") as fh:
+        write_text_rows(fh, vertices, "v %.9g %.9g %.9g\n")
+        write_text_rows(fh, faces + 1, "f %d %d %d\n")
+
+
+MESH_WRITERS = {"ply": write_ply, "off": write_off, "obj": write_obj}
+
@@ -0,0 +1,864 @@
+"""Session, upload, counter and metrics storage shared by the web tier.
+
+``MemorySessionStore`` keeps everything inside one process and is what a
+plain ``python app/main.py`` run uses. ``SqliteSessionStore`` keeps the same
+data in a single SQLite database in WAL mode, so every worker process of a
+multi-process WSGI server on the host sees the same sessions, logs, progress
+events and stats.
+
+Both also hold the repair scheduler's admission table: every queued or running
+job with its priority, so the pending caps, the running-job limit and queue
+positions cover all worker processes rather than the one that queued a job.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+TRIM_MARKER = "[trimmed older logs]\n"
+
+
+def process_token(pid: int) -> str | None:
+    """``pid`` plus its start time, or None once the process is gone.
+
+    A pid the kernel hands to a new process gets a different token, so job
+    rows of a dead worker are never mistaken for a live one's.
+    """
+    if not os.path.exists("/proc/self/stat"):
+        # No procfs: the pid alone is the best we have.
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return None
+        except PermissionError:
+            pass  # alive, but owned by another user
+        return str(pid)
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as fh:
+            stat = fh.read()
+    except FileNotFoundError:
+        return None
+    # The command name may contain spaces; the fields after its ")" are fixed, start time is the 20th.
+    start_time = stat.rsplit(b")", 1)[1].split()[19].decode()
+    return f"{pid}:{start_time}"
+
+
+def clear_jobs(path: Path) -> None:
+    """Forget every scheduler job in the SQLite store at ``path``.
+
+    A server master calls this before forking its first workers: no worker of
+    an earlier run can still be alive to finish those jobs.
+    """
+    if not path.exists():
+        return
+    conn = sqlite3.connect(str(path), timeout=30)
+    try:
+        with conn:
+            conn.execute("DELETE FROM jobs")
+    except sqlite3.OperationalError:
+        pass  # no jobs table yet
+    finally:
+        conn.close()
+
+
+def clip_log_entry(text: str, max_bytes: int) -> tuple[str, int]:
+    """``text`` with only its tail kept when it alone exceeds ``max_bytes``, plus its UTF-8 size."""
+    data = text.encode("utf-8")
+    if len(data) > max_bytes:
+        tail = data[-(max_bytes - len(TRIM_MARKER)) :].decode("utf-8", errors="ignore")
+        text = f"{TRIM_MARKER}{tail}"
+        data = text.encode("utf-8")
+    return text, len(data)
+
+
+def event_payload(
+    current: dict,
+    fields: dict,
+    event_fields: tuple[str, ...],
+    reset_logs: bool,
+    append_logs: list[str] | tuple,
+) -> dict:
+    """What an update changes for progress listeners: changed fields plus log deltas."""
+    payload = {
+        field: fields[field] for field in event_fields if field in fields and fields[field] != current.get(field)
+    }
+    if reset_logs:
+        payload["logs_reset"] = []
+    if append_logs:
+        payload["logs_append"] = list(append_logs)
+    return payload
+
+
+def last_touched(session: dict) -> float:
+    return float(session.get("updated_at", session.get("created_at", 0)))
+
+
+class SessionLog:
+    """Byte-bounded ring buffer of log entries, each tagged with a sequence number.
+
+    The running byte size is tracked on append, so trimming never re-joins
+    strings; the oldest entries are dropped once ``max_bytes`` is exceeded.
+    Sequence numbers keep increasing across ``clear`` so cursors stay valid.
+    """
+
+    def __init__(self, entries: list[str] | tuple = (), max_bytes: int = 60000) -> None:
+        self.max_bytes = max_bytes
+        self.entries: deque[tuple[int, str, int]] = deque()
+        self.size = 0
+        self.seq = 0
+        self.cleared_at = 0
+        self.lock = threading.Lock()
+        for entry in entries:
+            self.append(entry)
+
+    def append(self, text: str) -> int:
+        text, size = clip_log_entry(text, self.max_bytes)
+        with self.lock:
+            self.seq += 1
+            self.entries.append((self.seq, text, size))
+            self.size += size
+            while self.size > self.max_bytes:
+                _seq, _text, dropped = self.entries.popleft()
+                self.size -= dropped
+            return self.seq
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.cleared_at = self.seq
+
+    def since(self, seq: int | None = None) -> tuple[list[str], int, bool]:
+        """Entries after ``seq`` (all when None), the latest seq, and whether the cursor fell off the buffer."""
+        with self.lock:
+            first = self.entries[0][0] if self.entries else self.seq + 1
+            if seq is None or seq < first - 1 or 0 < seq <= self.cleared_at:
+                return [text for _seq, text, _size in self.entries], self.seq, seq is not None
+            start = seq - first + 1
+            return [text for _seq, text, _size in itertools.islice(self.entries, start, None)], self.seq, False
+
+
+class MemorySessionStore:
+    """Single-process store: plain dicts guarded by one lock."""
+
+    name = "memory"
+
+    def __init__(
+        self,
+        max_sessions: int,
+        max_log_bytes: int,
+        event_fields: tuple[str, ...],
+        event_backlog: int,
+        stat_keys: list[str],
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.max_log_bytes = max_log_bytes
+        self.event_fields = event_fields
+        self.event_backlog = event_backlog
+        self.sessions: dict[str, dict] = {}
+        self.order: deque[str] = deque()
+        self.logs: dict[str, SessionLog] = {}
+        self.events: dict[str, deque[tuple[int, dict]]] = {}
+        self.event_seq: dict[str, int] = {}
+        self.items: dict[str, dict[int, dict]] = {}
+        self.items_done: dict[str, set[int]] = {}
+        self.uploads: dict[str, dict] = {}
+        self.stats = dict.fromkeys(stat_keys, 0)
+        self.metrics: dict[str, float] = {}
+        self.jobs: dict[str, dict] = {}
+        self.job_seq = itertools.count()
+        self.lock = threading.Lock()
+        self.events_cond = threading.Condition(self.lock)
+
+    def _drop(self, session_id: str) -> dict | None:
+        session = self.sessions.pop(session_id, None)
+        self.logs.pop(session_id, None)
+        self.events.pop(session_id, None)
+        self.event_seq.pop(session_id, None)
+        self.items.pop(session_id, None)
+        self.items_done.pop(session_id, None)
+        try:
+            self.order.remove(session_id)
+        except ValueError:
+            pass
+        return session
+
+    def create(self, session: dict, logs: list[str]) -> list[dict]:
+        """Add a session; returns the oldest sessions evicted to stay within ``max_sessions``."""
+        session_id = session["session_id"]
+        with self.lock:
+            self.sessions[session_id] = dict(session)
+            self.order.append(session_id)
+            self.logs[session_id] = SessionLog(logs, self.max_log_bytes)
+            self.events[session_id] = deque(maxlen=self.event_backlog)
+            self.event_seq[session_id] = 0
+            evicted = []
+            while len(self.order) > self.max_sessions:
+                dropped = self._drop(self.order[0])
+                if dropped:
+                    evicted.append(dropped)
+            return evicted
+
+    def get(self, session_id: str, touch: bool = True) -> dict | None:
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            if touch:
+                now = time.time()
+                session["updated_at"] = now
+                session["last_accessed_at"] = now
+            return dict(session)
+
+    def update(
+        self,
+        session_id: str,
+        fields: dict,
+        reset_logs: bool = False,
+        append_logs: list[str] | tuple = (),
+        expected_status: set[str] | None = None,
+    ) -> bool:
+        """Apply ``fields`` and log changes and record a progress event; False if skipped."""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return False
+            if expected_status is not None and session.get("status") not in expected_status:
+                return False
+            payload = event_payload(session, fields, self.event_fields, reset_logs, append_logs)
+            log = self.logs[session_id]
+            if reset_logs:
+                log.clear()
+            for entry in append_logs:
+                payload["log_seq"] = log.append(entry)
+            session.update(fields)
+            session["updated_at"] = time.time()
+            if payload:
+                self.event_seq[session_id] += 1
+                self.events[session_id].append((self.event_seq[session_id], payload))
+                self.events_cond.notify_all()
+            return True
+
+    def delete(self, session_id: str) -> dict | None:
+        with self.lock:
+            return self._drop(session_id)
+
+    def expire(self, cutoff: float) -> list[dict]:
+        with self.lock:
+            stale = [sid for sid, session in self.sessions.items() if last_touched(session) < cutoff]
+            return [session for sid in stale if (session := self._drop(sid))]
+
+    def list(self) -> list[dict]:
+        with self.lock:
+            return [dict(session) for session in self.sessions.values()]
+
+    def count(self) -> int:
+        with self.lock:
+            return len(self.sessions)
+
+    def log_since(self, session_id: str, seq: int | None = None) -> tuple[list[str], int, bool]:
+        with self.lock:
+            log = self.logs.get(session_id)
+        return log.since(seq) if log else ([], 0, False)
+
+    def event_window(self, session_id: str) -> tuple[int, int]:
+        """(oldest retained event id, latest event id) for resuming a stream."""
+        with self.lock:
+            latest = self.event_seq.get(session_id, 0)
+            backlog = self.events.get(session_id)
+            return (backlog[0][0] if backlog else latest + 1), latest
+
+    def wait_events(self, session_id: str, last_id: int, timeout: float) -> list[tuple[int, dict]] | None:
+        """Events after ``last_id``, waiting up to ``timeout``; None once the session is gone."""
+        with self.events_cond:
+            self.events_cond.wait_for(
+                lambda: self.event_seq.get(session_id, last_id + 1) > last_id, timeout=timeout
+            )
+            if session_id not in self.sessions:
+                return None
+            return [(event_id, payload) for event_id, payload in self.events[session_id] if event_id > last_id]
+
+    def set_item(self, session_id: str, index: int, item: dict, done: bool = False) -> int | None:
+        """Store entry ``index`` of a session (one file of a batch) apart from the session itself.
+
+        Returns how many of the session's entries are done, or None once the session is gone.
+        """
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            self.items.setdefault(session_id, {})[index] = dict(item)
+            finished = self.items_done.setdefault(session_id, set())
+            if done:
+                finished.add(index)
+            else:
+                finished.discard(index)
+            session["updated_at"] = time.time()
+            return len(finished)
+
+    def get_items(self, session_id: str) -> dict[int, dict]:
+        with self.lock:
+            return {index: dict(item) for index, item in self.items.get(session_id, {}).items()}
+
+    def create_upload(self, upload: dict) -> None:
+        with self.lock:
+            self.uploads[upload["upload_id"]] = dict(upload)
+
+    def get_upload(self, upload_id: str) -> dict | None:
+        with self.lock:
+            upload = self.uploads.get(upload_id)
+            return dict(upload) if upload else None
+
+    def touch_upload(self, upload_id: str, **fields) -> None:
+        """Mark an upload active, merging in ``fields`` (e.g. its saved digest state)."""
+        with self.lock:
+            if upload_id in self.uploads:
+                self.uploads[upload_id].update(fields, updated_at=time.time())
+
+    def delete_upload(self, upload_id: str) -> dict | None:
+        with self.lock:
+            return self.uploads.pop(upload_id, None)
+
+    def expire_uploads(self, cutoff: float) -> list[dict]:
+        with self.lock:
+            stale = [uid for uid, upload in self.uploads.items() if upload["updated_at"] < cutoff]
+            return [self.uploads.pop(uid) for uid in stale]
+
+    def incr_stat(self, key: str) -> None:
+        with self.lock:
+            self.stats[key] = int(self.stats.get(key, 0)) + 1
+
+    def stats_snapshot(self) -> dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def add_metrics(self, increments: dict[str, float]) -> None:
+        with self.lock:
+            for key, amount in increments.items():
+                self.metrics[key] = self.metrics.get(key, 0.0) + amount
+
+    def metrics_snapshot(self) -> dict[str, float]:
+        with self.lock:
+            return dict(self.metrics)
+
+    def _jobs_ahead(self, job: dict) -> int:
+        rank = (job["priority"], job["seq"])
+        return sum(
+            1 for other in self.jobs.values() if not other["running"] and (other["priority"], other["seq"]) < rank
+        )
+
+    def enqueue_job(self, job_id: str, priority: int, max_pending: int) -> bool:
+        """Admit a job unless ``max_pending`` jobs of its priority are already waiting."""
+        with self.lock:
+            waiting = sum(1 for job in self.jobs.values() if job["priority"] == priority and not job["running"])
+            if waiting >= max_pending:
+                return False
+            self.jobs[job_id] = {"priority": priority, "seq": next(self.job_seq), "running": False}
+            return True
+
+    def claim_job(self, job_id: str, capacity: int) -> bool:
+        """Mark a waiting job running if a slot is free for it and every job ahead of it."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["running"]:
+                return False
+            running = sum(1 for other in self.jobs.values() if other["running"])
+            if running + self._jobs_ahead(job) >= capacity:
+                return False
+            job["running"] = True
+            return True
+
+    def finish_job(self, job_id: str) -> None:
+        with self.lock:
+            self.jobs.pop(job_id, None)
+
+    def job_position(self, job_id: str) -> int | None:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["running"]:
+                return None
+            return 1 + self._jobs_ahead(job)
+
+    def job_counts(self) -> tuple[int, dict[int, int]]:
+        """(running jobs, waiting jobs by priority)."""
+        with self.lock:
+            waiting: dict[int, int] = {}
+            for job in self.jobs.values():
+                if not job["running"]:
+                    waiting[job["priority"]] = waiting.get(job["priority"], 0) + 1
+            return sum(1 for job in self.jobs.values() if job["running"]), waiting
+
+
+class SqliteSessionStore:
+    """Store shared by worker processes on one host through a WAL-mode SQLite file.
+
+    Each thread gets its own connection. Read-modify-write operations run
+    inside ``BEGIN IMMEDIATE`` so concurrent workers serialize on the
+    database write lock. Progress events from this process wake waiting
+    streams at once; events from other processes are picked up every
+    ``poll_seconds``, and only read when the database has changed.
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: Path,
+        max_sessions: int,
+        max_log_bytes: int,
+        event_fields: tuple[str, ...],
+        event_backlog: int,
+        stat_keys: list[str],
+        poll_seconds: float = 0.25,
+    ) -> None:
+        self.path = path
+        self.max_sessions = max_sessions
+        self.max_log_bytes = max_log_bytes
+        self.event_fields = event_fields
+        self.event_backlog = event_backlog
+        self.stat_keys = stat_keys
+        self.poll_seconds = poll_seconds
+        self.local = threading.local()
+        self.events_cond = threading.Condition()
+        self.events_generation = 0
+        self.owner: tuple[int, str | None] = (-1, None)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        job_columns = {row[1] for row in self.conn().execute("PRAGMA table_info(jobs)")}
+        if job_columns and "owner" not in job_columns:
+            # Job rows are transient; rebuild a table from before per-process owner tokens.
+            self.conn().execute("DROP TABLE jobs")
+        self.conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                log_seq INTEGER NOT NULL DEFAULT 0,
+                log_bytes INTEGER NOT NULL DEFAULT 0,
+                log_cleared_at INTEGER NOT NULL DEFAULT 0,
+                event_seq INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS sessions_created ON sessions (created_at);
+            CREATE TABLE IF NOT EXISTS session_logs (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS session_events (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS session_items (
+                session_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                done INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (session_id, idx)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS uploads (
+                upload_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stats (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS metrics (
+                key TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL UNIQUE,
+                priority INTEGER NOT NULL,
+                running INTEGER NOT NULL DEFAULT 0,
+                pid INTEGER NOT NULL,
+                owner TEXT NOT NULL
+            );
+            """
+        )
+
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _load(self, conn: sqlite3.Connection, session_id: str) -> dict | None:
+        row = conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, conn: sqlite3.Connection, session: dict) -> None:
+        conn.execute(
+            "UPDATE sessions SET data = ?, updated_at = ? WHERE session_id = ?",
+            (json.dumps(session), last_touched(session), session["session_id"]),
+        )
+
+    def _delete(self, conn: sqlite3.Connection, session_id: str) -> dict | None:
+        session = self._load(conn, session_id)
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM session_logs WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM session_events WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM session_items WHERE session_id = ?", (session_id,))
+        return session
+
+    def _append_logs(self, conn: sqlite3.Connection, session_id: str, entries: list[str] | tuple) -> int:
+        seq, size = conn.execute(
+            "SELECT log_seq, log_bytes FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        for entry in entries:
+            text, entry_size = clip_log_entry(entry, self.max_log_bytes)
+            seq += 1
+            size += entry_size
+            conn.execute(
+                "INSERT INTO session_logs (session_id, seq, text, size) VALUES (?, ?, ?, ?)",
+                (session_id, seq, text, entry_size),
+            )
+        while size > self.max_log_bytes:
+            oldest = conn.execute(
+                "SELECT seq, size FROM session_logs WHERE session_id = ? ORDER BY seq LIMIT 32", (session_id,)
+            ).fetchall()
+            for old_seq, old_size in oldest:
+                if size <= self.max_log_bytes:
+                    break
+                conn.execute("DELETE FROM session_logs WHERE session_id = ? AND seq = ?", (session_id, old_seq))
+                size -= old_size
+        conn.execute(
+            "UPDATE sessions SET log_seq = ?, log_bytes = ? WHERE session_id = ?", (seq, size, session_id)
+        )
+        return seq
+
+    def create(self, session: dict, logs: list[str]) -> list[dict]:
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, data, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (session["session_id"], json.dumps(session), session["created_at"], last_touched(session)),
+            )
+            self._append_logs(conn, session["session_id"], logs)
+            (total,) = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+            evicted = []
+            if total > self.max_sessions:
+                oldest = conn.execute(
+                    "SELECT session_id FROM sessions ORDER BY created_at LIMIT ?", (total - self.max_sessions,)
+                ).fetchall()
+                for (session_id,) in oldest:
+                    dropped = self._delete(conn, session_id)
+                    if dropped:
+                        evicted.append(dropped)
+            return evicted
+
+    def get(self, session_id: str, touch: bool = True) -> dict | None:
+        if not touch:
+            return self._load(self.conn(), session_id)
+        with self.transaction() as conn:
+            session = self._load(conn, session_id)
+            if session is None:
+                return None
+            now = time.time()
+            session["updated_at"] = now
+            session["last_accessed_at"] = now
+            self._save(conn, session)
+            return session
+
+    def update(
+        self,
+        session_id: str,
+        fields: dict,
+        reset_logs: bool = False,
+        append_logs: list[str] | tuple = (),
+        expected_status: set[str] | None = None,
+    ) -> bool:
+        with self.transaction() as conn:
+            session = self._load(conn, session_id)
+            if session is None:
+                return False
+            if expected_status is not None and session.get("status") not in expected_status:
+                return False
+            payload = event_payload(session, fields, self.event_fields, reset_logs, append_logs)
+            if reset_logs:
+                conn.execute("DELETE FROM session_logs WHERE session_id = ?", (session_id,))
+                conn.execute(
+                    "UPDATE sessions SET log_bytes = 0, log_cleared_at = log_seq WHERE session_id = ?",
+                    (session_id,),
+                )
+            if append_logs:
+                payload["log_seq"] = self._append_logs(conn, session_id, append_logs)
+            session.update(fields)
+            session["updated_at"] = time.time()
+            self._save(conn, session)
+            if payload:
+                (event_id,) = conn.execute(
+                    "UPDATE sessions SET event_seq = event_seq + 1 WHERE session_id = ? RETURNING event_seq",
+                    (session_id,),
+                ).fetchone()
+                conn.execute(
+                    "INSERT INTO session_events (session_id, seq, payload) VALUES (?, ?, ?)",
+                    (session_id, event_id, json.dumps(payload)),
+                )
+                conn.execute(
+                    "DELETE FROM session_events WHERE session_id = ? AND seq <= ?",
+                    (session_id, event_id - self.event_backlog),
+                )
+        if payload:
+            with self.events_cond:
+                self.events_generation += 1
+                self.events_cond.notify_all()
+        return True
+
+    def delete(self, session_id: str) -> dict | None:
+        with self.transaction() as conn:
+            return self._delete(conn, session_id)
+
+    def expire(self, cutoff: float) -> list[dict]:
+        with self.transaction() as conn:
+            # Entries are written without touching the session row, so recent ones keep it alive too.
+            stale = conn.execute(
+                """
+                SELECT session_id FROM sessions WHERE updated_at < ? AND NOT EXISTS (
+                    SELECT 1 FROM session_items
+                    WHERE session_items.session_id = sessions.session_id AND session_items.updated_at >= ?
+                )
+                """,
+                (cutoff, cutoff),
+            ).fetchall()
+            return [session for (session_id,) in stale if (session := self._delete(conn, session_id))]
+
+    def list(self) -> list[dict]:
+        return [json.loads(data) for (data,) in self.conn().execute("SELECT data FROM sessions")]
+
+    def count(self) -> int:
+        (total,) = self.conn().execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return total
+
+    def log_since(self, session_id: str, seq: int | None = None) -> tuple[list[str], int, bool]:
+        conn = self.conn()
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute(
+                "SELECT log_seq, log_cleared_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return [], 0, False
+            latest, cleared_at = row
+            (first,) = conn.execute(
+                "SELECT MIN(seq) FROM session_logs WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            first = first if first is not None else latest + 1
+            reset = seq is None or seq < first - 1 or 0 < seq <= cleared_at
+            rows = conn.execute(
+                "SELECT text FROM session_logs WHERE session_id = ? AND seq > ? ORDER BY seq",
+                (session_id, 0 if reset else seq),
+            ).fetchall()
+            return [text for (text,) in rows], latest, reset and seq is not None
+        finally:
+            conn.execute("COMMIT")
+
+    def event_window(self, session_id: str) -> tuple[int, int]:
+        conn = self.conn()
+        row = conn.execute("SELECT event_seq FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        latest = row[0] if row else 0
+        (oldest,) = conn.execute(
+            "SELECT MIN(seq) FROM session_events WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return (oldest if oldest is not None else latest + 1), latest
+
+    def wait_events(self, session_id: str, last_id: int, timeout: float) -> list[tuple[int, dict]] | None:
+        conn = self.conn()
+        deadline = time.time() + timeout
+        checked_version = None
+        while True:
+            generation = self.events_generation
+            # data_version changes whenever another connection commits; until then nothing is new.
+            (version,) = conn.execute("PRAGMA data_version").fetchone()
+            if version != checked_version:
+                checked_version = version
+                rows = conn.execute(
+                    "SELECT seq, payload FROM session_events WHERE session_id = ? AND seq > ? ORDER BY seq",
+                    (session_id, last_id),
+                ).fetchall()
+                if rows:
+                    return [(event_id, json.loads(payload)) for event_id, payload in rows]
+                if conn.execute("SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)).fetchone() is None:
+                    return None
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return []
+            with self.events_cond:
+                self.events_cond.wait_for(
+                    lambda: self.events_generation != generation, timeout=min(self.poll_seconds, remaining)
+                )
+
+    def set_item(self, session_id: str, index: int, item: dict, done: bool = False) -> int | None:
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)).fetchone() is None:
+                return None
+            conn.execute(
+                """
+                INSERT INTO session_items (session_id, idx, data, done, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(session_id, idx) DO UPDATE
+                SET data = excluded.data, done = excluded.done, updated_at = excluded.updated_at
+                """,
+                (session_id, index, json.dumps(item), int(done), time.time()),
+            )
+            (finished,) = conn.execute(
+                "SELECT COUNT(*) FROM session_items WHERE session_id = ? AND done", (session_id,)
+            ).fetchone()
+            return finished
+
+    def get_items(self, session_id: str) -> dict[int, dict]:
+        rows = self.conn().execute("SELECT idx, data FROM session_items WHERE session_id = ?", (session_id,))
+        return {index: json.loads(data) for index, data in rows}
+
+    def create_upload(self, upload: dict) -> None:
+        self.conn().execute(
+            "INSERT INTO uploads (upload_id, data, updated_at) VALUES (?, ?, ?)",
+            (upload["upload_id"], json.dumps(upload), upload["updated_at"]),
+        )
+
+    def get_upload(self, upload_id: str) -> dict | None:
+        row = self.conn().execute("SELECT data FROM uploads WHERE upload_id = ?", (upload_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def touch_upload(self, upload_id: str, **fields) -> None:
+        with self.transaction() as conn:
+            row = conn.execute("SELECT data FROM uploads WHERE upload_id = ?", (upload_id,)).fetchone()
+            if row is None:
+                return
+            upload = json.loads(row[0])
+            upload.update(fields, updated_at=time.time())
+            conn.execute(
+                "UPDATE uploads SET data = ?, updated_at = ? WHERE upload_id = ?",
+                (json.dumps(upload), upload["updated_at"], upload_id),
+            )
+
+    def delete_upload(self, upload_id: str) -> dict | None:
+        with self.transaction() as conn:
+            row = conn.execute("SELECT data FROM uploads WHERE upload_id = ?", (upload_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM uploads WHERE upload_id = ?", (upload_id,))
+            return json.loads(row[0])
+
+    def expire_uploads(self, cutoff: float) -> list[dict]:
+        with self.transaction() as conn:
+            rows = conn.execute("SELECT data FROM uploads WHERE updated_at < ?", (cutoff,)).fetchall()
+            conn.execute("DELETE FROM uploads WHERE updated_at < ?", (cutoff,))
+            return [json.loads(data) for (data,) in rows]
+
+    def incr_stat(self, key: str) -> None:
+        self.conn().execute(
+            "INSERT INTO stats (key, value) VALUES (?, 1) ON CONFLICT(key) DO UPDATE SET value = value + 1",
+            (key,),
+        )
+
+    def stats_snapshot(self) -> dict[str, int]:
+        stats = dict.fromkeys(self.stat_keys, 0)
+        stats.update(dict(self.conn().execute("SELECT key, value FROM stats").fetchall()))
+        return stats
+
+    def add_metrics(self, increments: dict[str, float]) -> None:
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO metrics (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+                increments.items(),
+            )
+
+    def metrics_snapshot(self) -> dict[str, float]:
+        return dict(self.conn().execute("SELECT key, value FROM metrics").fetchall())
+
+    def owner_token(self) -> str:
+        """This process's token for its job rows (recomputed after a fork)."""
+        pid = os.getpid()
+        if self.owner[0] != pid:
+            self.owner = (pid, process_token(pid) or str(pid))
+        return self.owner[1]
+
+    def _reap_jobs(self, conn: sqlite3.Connection) -> None:
+        """Drop jobs left behind by worker processes that have exited, even if their pid was reused."""
+        rows = conn.execute("SELECT DISTINCT pid, owner FROM jobs WHERE owner != ?", (self.owner_token(),))
+        for pid, owner in rows.fetchall():
+            if process_token(pid) != owner:
+                conn.execute("DELETE FROM jobs WHERE owner = ?", (owner,))
+
+    def _jobs_ahead(self, conn: sqlite3.Connection, priority: int, seq: int) -> int:
+        (ahead,) = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE NOT running AND (priority < ? OR (priority = ? AND seq < ?))",
+            (priority, priority, seq),
+        ).fetchone()
+        return ahead
+
+    def enqueue_job(self, job_id: str, priority: int, max_pending: int) -> bool:
+        with self.transaction() as conn:
+            self._reap_jobs(conn)
+            (waiting,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE priority = ? AND NOT running", (priority,)
+            ).fetchone()
+            if waiting >= max_pending:
+                return False
+            conn.execute(
+                "INSERT INTO jobs (job_id, priority, pid, owner) VALUES (?, ?, ?, ?)",
+                (job_id, priority, os.getpid(), self.owner_token()),
+            )
+            return True
+
+    def claim_job(self, job_id: str, capacity: int) -> bool:
+        with self.transaction() as conn:
+            self._reap_jobs(conn)
+            row = conn.execute("SELECT priority, seq FROM jobs WHERE job_id = ? AND NOT running", (job_id,)).fetchone()
+            if row is None:
+                return False
+            (running,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE running").fetchone()
+            if running + self._jobs_ahead(conn, *row) >= capacity:
+                return False
+            conn.execute("UPDATE jobs SET running = 1 WHERE job_id = ?", (job_id,))
+            return True
+
+    def finish_job(self, job_id: str) -> None:
+        self.conn().execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def job_position(self, job_id: str) -> int | None:
+        conn = self.conn()
+        row = conn.execute("SELECT priority, seq FROM jobs WHERE job_id = ? AND NOT running", (job_id,)).fetchone()
+        return None if row is None else 1 + self._jobs_ahead(conn, *row)
+
+    def job_counts(self) -> tuple[int, dict[int, int]]:
+        running = 0
+        waiting: dict[int, int] = {}
+        for priority, is_running, count in self.conn().execute(
+            "SELECT priority, running, COUNT(*) FROM jobs GROUP BY priority, running"
+        ).fetchall():
+            if is_running:
+                running += count
+            else:
+                waiting[priority] = count
+        return running, waiting
@@ -0,0 +1,14 @@
+"""Production entry point: ``gunicorn --config app/gunicorn.conf.py wsgi:app``.
+
+Worker processes share sessions through the SQLite store unless SESSION_STORE
+says otherwise; background services start once per worker and the folder
+watcher runs in whichever worker takes its lock first.
+"""
+
+import os
+
+os.environ.setdefault("SESSION_STORE", "sqlite")
+
+from main import app, start_background_services  # noqa: E402
+
+start_background_services()
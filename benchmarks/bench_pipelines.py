@@ -0,0 +1,453 @@
+"""Time analyze, repair, convert and watch-folder throughput on synthetic defective meshes.
+
+Usage:
+    python benchmarks/bench_pipelines.py [--triangles 1000 10000 100000] [--repeat 3]
+        [--suites analyze process repair_session convert watch] [--formats stl obj ply]
+        [--watch-workers 1 2 4] [--watch-files 8] [--watch-triangles 10000]
+        [--baseline previous.json] [--tolerance 0.2] [--min-delta 0.01]
+
+Each mesh is a UV sphere sized to about the requested triangle count, written
+as binary STL with removed faces (holes), flipped faces, a small shell stored
+twice (duplicate shells) and jittered (near-coincident) vertices.
+
+Suites:
+    analyze         inspect + session registration (create_analyze_session) per inspector
+    process         process_one_file per repair backend (the watch-mode repair step)
+    repair_session  run_repair_session per mode and repair backend
+    convert         convert_mesh for every ordered pair of --formats
+    watch           end-to-end: files dropped into INPUT_DIR of a fresh watch-mode
+                    process until every one is repaired, once per --watch-workers value
+
+The result cache is disabled, so every repeat does the full work. admesh cases
+are skipped when admesh is not on PATH. Results go to stdout as JSON, progress
+to stderr. With --baseline, cases whose median is more than --tolerance (a
+fraction) and --min-delta seconds slower than the baseline's are listed under
+"regressions" and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.metadata
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import trimesh
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+WORK_ROOT = Path(tempfile.mkdtemp(prefix="manifixer-bench-"))
+GENERATE_CHUNK_FACES = 1 << 20
+SUITES = ("analyze", "process", "repair_session", "convert", "watch")
+
+# Set before main is imported: a cache hit would time a file copy, not a repair.
+BENCH_ENV = {"CACHE_ENABLED": "0", "WATCH_MODE": "0", "STARTUP_WARMUP": "0"}
+os.environ.update(BENCH_ENV)
+os.environ["INPUT_DIR"] = str(WORK_ROOT / "input")
+os.environ["OUTPUT_DIR"] = str(WORK_ROOT / "output")
+sys.path.insert(0, str(APP_DIR))
+
+import main  # noqa: E402
+import native_mesh  # noqa: E402
+
+WATCH_PROBE = """
+import json, shutil, sys, time
+from pathlib import Path
+import main
+staging, timeout = Path(sys.argv[1]), float(sys.argv[2])
+main.start_background_services()
+while main.watch_state["backend"] is None:
+    time.sleep(0.05)
+names = sorted(path.name for path in staging.iterdir())
+started = time.perf_counter()
+for name in names:
+    shutil.copy(staging / name, main.INPUT_DIR / name)
+while True:
+    stats = main.session_store.stats_snapshot()
+    processed, failed = stats.get("watch_processed", 0), stats.get("watch_failed", 0)
+    if processed + failed >= len(names) or time.perf_counter() - started > timeout:
+        break
+    time.sleep(0.02)
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "processed": processed,
+    "failed": failed,
+    "watch_backend": main.watch_state["backend"],
+    "scheduler_workers": main.SCHEDULER_WORKERS,
+    "stability_check_seconds": main.STABILITY_CHECK_SECONDS,
+}))
+"""
+
+
+def defective_facets(triangles: int, seed: int = 7) -> np.ndarray:
+    """STL facet records for a defective UV sphere of roughly ``triangles`` faces."""
+    rng = np.random.default_rng(seed)
+    rows = max(4, round(1 + math.sqrt(1 + triangles / 8)))
+    sphere = trimesh.creation.uv_sphere(radius=10.0, count=[rows, 2 * rows])
+    faces = sphere.faces
+    faces = np.delete(faces, rng.choice(len(faces), size=max(1, len(faces) // 200), replace=False), axis=0)
+    flipped = rng.choice(len(faces), size=max(1, len(faces) // 50), replace=False)
+    faces[flipped] = faces[flipped][:, ::-1]
+
+    shell = trimesh.creation.icosphere(subdivisions=1, radius=0.5)
+    shell_corners = (shell.vertices + [15.0, 0.0, 0.0])[shell.faces].astype(np.float32)
+
+    vertices = sphere.vertices.astype(np.float32)
+    facets = np.zeros(len(faces) + 2 * len(shell_corners), dtype=native_mesh.STL_FACET_DTYPE)
+    for start in range(0, len(faces), GENERATE_CHUNK_FACES):
+        corners = vertices[faces[start : start + GENERATE_CHUNK_FACES]]
+        corners += rng.uniform(-1e-4, 1e-4, corners.shape).astype(np.float32)
+        facets["vertices"][start : start + len(corners)] = corners
+    facets["vertices"][len(faces) :] = np.concatenate([shell_corners, shell_corners])
+    return facets
+
+
+def write_mesh(path: Path, triangles: int, seed: int = 7) -> int:
+    facets = defective_facets(triangles, seed)
+    native_mesh.write_stl_facets(path, facets)
+    return len(facets)
+
+
+def time_case(run, repeat: int, setup=None) -> dict:
+    """Best/median wall time of ``run(setup())`` over ``repeat`` runs; a falsy result or exception fails it."""
+    samples: list[float] = []
+    extra: dict = {}
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        try:
+            ok, extra = run(arg)
+        except Exception as exc:
+            return {"ok": False, "error": f"{type(exc).__name__}: {exc}", "seconds_all": samples}
+        samples.append(time.perf_counter() - started)
+        if not ok:
+            return {"ok": False, **extra, "seconds_all": samples}
+    return {
+        "ok": True,
+        **extra,
+        "seconds_best": min(samples),
+        "seconds_median": statistics.median(samples),
+        "seconds_all": samples,
+    }
+
+
+def new_session_dir(source: Path) -> tuple[str, Path, Path]:
+    session_id = uuid.uuid4().hex
+    session_dir = main.SESSION_ROOT / session_id
+    session_dir.mkdir(parents=True)
+    input_path = session_dir / source.name
+    shutil.copyfile(source, input_path)
+    return session_id, session_dir, input_path
+
+
+def drop_session(session_id: str, session_dir: Path) -> None:
+    main.session_store.delete(session_id)
+    main.remove_session_files(str(session_dir))
+
+
+def bench_analyze(source: Path, inspector: str, repeat: int) -> dict:
+    created: list[tuple[str, Path]] = []
+
+    def setup():
+        session_id, session_dir, input_path = new_session_dir(source)
+        created.append((session_id, session_dir))
+        return session_id, session_dir, input_path
+
+    def run(arg):
+        session_id, session_dir, input_path = arg
+        result = main.create_analyze_session(
+            session_id, session_dir, input_path, main.file_sha256(input_path), inspector
+        )
+        return True, {"total_errors": result["total_errors"]}
+
+    try:
+        return time_case(run, repeat, setup)
+    finally:
+        for session_id, session_dir in created:
+            drop_session(session_id, session_dir)
+
+
+def bench_process(source: Path, backend: str, inspector: str, repeat: int, workdir: Path) -> dict:
+    def run(_arg):
+        output_dir = workdir / f"process-{uuid.uuid4().hex[:8]}"
+        output_dir.mkdir()
+        try:
+            ok, _logs, _output, report = main.process_one_file(
+                source, inspector, backend=backend, output_dir=output_dir
+            )
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+        return ok, {"remaining_errors": report["errors"]["after"]}
+
+    return time_case(run, repeat)
+
+
+def bench_repair_session(source: Path, mode: str, backend: str, inspector: str, repeat: int) -> dict:
+    created: list[tuple[str, Path]] = []
+
+    def setup():
+        session_id, session_dir, input_path = new_session_dir(source)
+        created.append((session_id, session_dir))
+        main.create_analyze_session(session_id, session_dir, input_path, main.file_sha256(input_path), inspector)
+        return session_id
+
+    def run(session_id):
+        main.run_repair_session(session_id, mode, backend)
+        sess = main.get_session(session_id, touch=False) or {}
+        # The per-step breakdown recorded by the session itself, from the last repeat.
+        return sess.get("status") == "completed", {
+            "remaining_errors": sess.get("remaining_errors"),
+            "timings": sess.get("timings"),
+        }
+
+    try:
+        return time_case(run, repeat, setup)
+    finally:
+        for session_id, session_dir in created:
+            drop_session(session_id, session_dir)
+
+
+def convert_sources(source: Path, formats: list[str], workdir: Path) -> dict[str, Path]:
+    """The generated STL plus a copy in every other format the converter can write."""
+    sources = {"stl": source}
+    for fmt in formats:
+        if fmt == "stl":
+            continue
+        try:
+            main.convert_mesh(source, workdir / f"source.{fmt}", fmt)
+            sources[fmt] = workdir / f"source.{fmt}"
+        except Exception as exc:
+            print(f"cannot produce a {fmt} source: {exc}", file=sys.stderr)
+    return sources
+
+
+def bench_convert(sources: dict[str, Path], source_fmt: str, target_fmt: str, repeat: int, workdir: Path) -> dict:
+    output = workdir / f"converted-{source_fmt}.{target_fmt}"
+
+    def run(_arg):
+        output.unlink(missing_ok=True)
+        main.convert_mesh(sources[source_fmt], output, target_fmt)
+        return True, {"output_bytes": output.stat().st_size}
+
+    try:
+        return time_case(run, repeat)
+    finally:
+        output.unlink(missing_ok=True)
+
+
+def bench_watch(workers: int, files: int, triangles: int, timeout: float, backends: list[str]) -> dict:
+    run_dir = WORK_ROOT / f"watch-{workers}"
+    staging = run_dir / "staging"
+    staging.mkdir(parents=True)
+    total = 0
+    for index in range(files):
+        # Distinct seeds, so no two files share a digest.
+        total += write_mesh(staging / f"part_{index:03d}.stl", triangles, seed=100 + index)
+    env = {
+        **os.environ,
+        **BENCH_ENV,
+        "WATCH_MODE": "1",
+        "WATCH_WORKERS": str(workers),
+        "INPUT_DIR": str(run_dir / "input"),
+        "OUTPUT_DIR": str(run_dir / "output"),
+    }
+    env.setdefault("STABILITY_CHECK_SECONDS", "1")
+    if "admesh" not in backends:
+        env.setdefault("REPAIR_BACKEND", "native")
+        env.setdefault("INSPECT_BACKEND", "native")
+    try:
+        result = subprocess.run(
+            [sys.executable, "-c", WATCH_PROBE, str(staging), str(timeout)],
+            cwd=APP_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    seconds = probe.pop("seconds")
+    done = probe["processed"] + probe["failed"]
+    error = f"{probe['failed']} of {files} files failed" if done >= files else f"timed out after {done} of {files} files"
+    return {
+        "ok": probe["processed"] == files,
+        **({} if probe["processed"] == files else {"error": error}),
+        **probe,
+        "files": files,
+        "triangles_total": total,
+        "seconds_best": seconds,
+        "seconds_median": seconds,
+        "seconds_all": [seconds],
+        "files_per_second": files / seconds,
+        "triangles_per_second": total / seconds,
+    }
+
+
+def environment(args: argparse.Namespace, backends: list[str], inspector: str) -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "trimesh": importlib.metadata.version("trimesh"),
+        "numpy": np.__version__,
+        "admesh": main.admesh_version() if "admesh" in backends else None,
+        "native_engine": native_mesh.ENGINE_VERSION,
+        "inspector": inspector,
+        "repair_flags": main.REPAIR_FLAGS,
+        "scheduler_workers": main.SCHEDULER_WORKERS,
+        "watch_workers": args.watch_workers,
+        "repeat": args.repeat,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def find_regressions(results: list[dict], baseline_path: Path, tolerance: float, min_delta: float) -> list[dict]:
+    baseline = {item["key"]: item for item in json.loads(baseline_path.read_text())["results"]}
+    regressions = []
+    for item in results:
+        before = baseline.get(item["key"])
+        if not before or not before.get("ok") or not item.get("ok"):
+            continue
+        ratio = item["seconds_median"] / max(before["seconds_median"], 1e-9)
+        # Millisecond cases jitter by more than any sensible tolerance.
+        if ratio > 1 + tolerance and item["seconds_median"] - before["seconds_median"] > min_delta:
+            regressions.append(
+                {
+                    "key": item["key"],
+                    "baseline_seconds": before["seconds_median"],
+                    "seconds": item["seconds_median"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
+
+
+def report(results: list[dict], key: str, item: dict) -> None:
+    item = {"key": key, **item}
+    results.append(item)
+    status = f"median {item['seconds_median']:.3f}s" if item["ok"] else f"FAILED {item.get('error', '')}"
+    print(f"{item['key']:<48} {status}", file=sys.stderr)
+
+
+def run_suites(args: argparse.Namespace, backends: list[str], inspector: str) -> tuple[list[dict], list[dict]]:
+    main.ensure_dirs()
+    # Load trimesh, numpy and the engines once, so the first case does not pay for the imports.
+    main.warm_up()
+    for backend in backends:
+        main.inspector_engine(backend)
+    results: list[dict] = []
+    meshes: list[dict] = []
+    for target in args.triangles:
+        workdir = WORK_ROOT / f"mesh-{target}"
+        workdir.mkdir()
+        source = workdir / f"sphere_{target}.stl"
+        triangles = write_mesh(source, target)
+        meshes.append({"triangles_target": target, "triangles": triangles, "bytes": source.stat().st_size})
+        common = {"triangles": triangles}
+
+        if "analyze" in args.suites:
+            for name in backends:
+                case = bench_analyze(source, name, args.repeat)
+                report(results, f"analyze/{name}/{target}", {"inspector": name, **common, **case})
+        if "process" in args.suites:
+            for backend in backends:
+                case = bench_process(source, backend, inspector, args.repeat, workdir)
+                report(results, f"process/{backend}/{target}", {"backend": backend, **common, **case})
+        if "repair_session" in args.suites:
+            for mode in sorted(main.REPAIR_SESSION_MODES):
+                for backend in backends:
+                    case = bench_repair_session(source, mode, backend, inspector, args.repeat)
+                    report(
+                        results,
+                        f"repair_session/{mode}/{backend}/{target}",
+                        {"mode": mode, "backend": backend, **common, **case},
+                    )
+        if "convert" in args.suites:
+            sources = convert_sources(source, args.formats, workdir)
+            for source_fmt in args.formats:
+                for target_fmt in args.formats:
+                    if source_fmt == target_fmt:
+                        continue
+                    if source_fmt in sources:
+                        case = bench_convert(sources, source_fmt, target_fmt, args.repeat, workdir)
+                    else:
+                        case = {"ok": False, "error": f"no {source_fmt} source", "seconds_all": []}
+                    report(
+                        results,
+                        f"convert/{source_fmt}->{target_fmt}/{target}",
+                        {"source_format": source_fmt, "target_format": target_fmt, **common, **case},
+                    )
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if "watch" in args.suites:
+        for workers in args.watch_workers:
+            case = bench_watch(workers, args.watch_files, args.watch_triangles, args.watch_timeout, backends)
+            report(
+                results,
+                f"watch/workers={workers}/{args.watch_files}x{args.watch_triangles}",
+                {"watch_workers": workers, **case},
+            )
+    return meshes, results
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triangles", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--suites", nargs="+", default=list(SUITES), choices=SUITES)
+    parser.add_argument("--formats", nargs="+", default=sorted(main.CONVERTER_ALLOWED_EXTENSIONS))
+    parser.add_argument("--watch-workers", type=int, nargs="+", default=[main.WATCH_WORKERS])
+    parser.add_argument("--watch-files", type=int, default=8)
+    parser.add_argument("--watch-triangles", type=int, default=10_000)
+    parser.add_argument("--watch-timeout", type=float, default=600.0)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--min-delta", type=float, default=0.01)
+    args = parser.parse_args()
+    unknown = sorted(set(args.formats) - main.CONVERTER_ALLOWED_EXTENSIONS)
+    if unknown:
+        parser.error(f"unsupported formats: {', '.join(unknown)}")
+
+    backends = ["native"]
+    if shutil.which("admesh"):
+        backends.insert(0, "admesh")
+    else:
+        print("admesh not found on PATH; benchmarking the native backend only", file=sys.stderr)
+    # process and repair_session inspect with INSPECT_BACKEND, as the server would.
+    inspector = main.INSPECT_BACKEND if main.INSPECT_BACKEND in backends else "native"
+
+    try:
+        # The app logs to stdout; keep stdout for the JSON result.
+        with contextlib.redirect_stdout(sys.stderr):
+            meshes, results = run_suites(args, backends, inspector)
+    finally:
+        shutil.rmtree(WORK_ROOT, ignore_errors=True)
+
+    output = {"environment": environment(args, backends, inspector), "meshes": meshes, "results": results}
+    if args.baseline:
+        output["regressions"] = find_regressions(results, args.baseline, args.tolerance, args.min_delta)
+        for item in output["regressions"]:
+            print(
+                f"REGRESSION {item['key']}: {item['baseline_seconds']:.3f}s -> {item['seconds']:.3f}s"
+                f" ({item['ratio']:.2f}x)",
+                file=sys.stderr,
+            )
+    print(json.dumps(output, indent=2))
+    if output.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
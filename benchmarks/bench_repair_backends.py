@@ -0,0 +1,91 @@
+"""Compare repair time and result quality of the admesh and native repair backends.
+
+Usage:
+    python benchmarks/bench_repair_backends.py [--subdivisions 4 5 6] [--repeat 3]
+
+Each case is an icosphere with removed faces (holes), flipped faces, a detached
+debris triangle and jittered (near-coincident) vertices, written as binary STL.
+The admesh backend is skipped when admesh is not on PATH.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import trimesh
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+import native_mesh  # noqa: E402
+
+
+def defective_sphere(subdivisions: int, seed: int = 7) -> trimesh.Trimesh:
+    rng = np.random.default_rng(seed)
+    sphere = trimesh.creation.icosphere(subdivisions=subdivisions)
+    faces = sphere.faces.copy()
+    flipped = rng.choice(len(faces), size=max(1, len(faces) // 50), replace=False)
+    faces[flipped] = faces[flipped][:, ::-1]
+    faces = np.delete(faces, rng.choice(len(faces), size=max(1, len(faces) // 200), replace=False), axis=0)
+
+    soup = sphere.vertices[faces].reshape(-1, 3)
+    soup += rng.uniform(-1e-4, 1e-4, soup.shape)
+    debris = np.array([[3.0, 3.0, 3.0], [3.1, 3.0, 3.0], [3.0, 3.1, 3.0]])
+    vertices = np.vstack([soup, debris])
+    triangles = np.arange(len(vertices)).reshape(-1, 3)
+    return trimesh.Trimesh(vertices, triangles, process=False)
+
+
+def run_case(backend: str, source: Path, workdir: Path, repeat: int) -> dict:
+    timings = []
+    ok = False
+    output = workdir / f"{backend}.stl"
+    for _ in range(repeat):
+        output.unlink(missing_ok=True)
+        started = time.perf_counter()
+        ok, _logs = main.run_repair(source, output, backend)
+        timings.append(time.perf_counter() - started)
+    result = native_mesh.inspect_file(output) if ok else {}
+    return {"backend": backend, "ok": ok, "seconds_best": min(timings), "seconds_all": timings, "after": result}
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subdivisions", type=int, nargs="+", default=[4, 5, 6])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = ["native"]
+    if shutil.which("admesh"):
+        backends.insert(0, "admesh")
+    else:
+        print("admesh not found on PATH; benchmarking the native backend only", file=sys.stderr)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="manifixer-bench-") as td:
+        workdir = Path(td)
+        for subdivisions in args.subdivisions:
+            source = workdir / f"sphere_{subdivisions}.stl"
+            mesh = defective_sphere(subdivisions)
+            mesh.export(str(source))
+            before = native_mesh.inspect_file(source)
+            for backend in backends:
+                case = run_case(backend, source, workdir, args.repeat)
+                case.update({"triangles": len(mesh.faces), "before": before})
+                results.append(case)
+                print(
+                    f"{backend:>7} {len(mesh.faces):>9} tris  best {case['seconds_best']:.3f}s  ok={case['ok']}",
+                    file=sys.stderr,
+                )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,102 @@
+"""Measure cold start: importing the app, the first page render and the converter warm-up.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--top 10]
+
+Every sample runs in a fresh interpreter, so nothing is shared through
+``sys.modules`` or the in-process template cache. ``--top`` lists
+the slowest imports seen by ``python -X importtime`` while loading the app.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+heavy = sorted(name for name in ("numpy", "scipy", "trimesh", "native_mesh") if name in sys.modules)
+client = main.app.test_client()
+client.get("/")
+first_page = time.perf_counter()
+main.warm_up()
+warmed = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - started,
+    "first_page_seconds": first_page - imported,
+    "warm_up_seconds": warmed - first_page,
+    "heavy_modules_after_import": heavy,
+}))
+"""
+
+
+def probe_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("WATCH_MODE", "0")
+    env["STARTUP_WARMUP"] = "0"
+    return env
+
+
+def run_probe() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=APP_DIR, env=probe_env(), capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list[dict]:
+    """Cumulative ``-X importtime`` entries for ``import main``, slowest first."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR,
+        env=probe_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        rows.append({"module": name.strip(), "cumulative_seconds": int(cumulative_us) / 1e6})
+    rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+    return rows[:top]
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    samples = []
+    for index in range(args.repeat):
+        sample = run_probe()
+        samples.append(sample)
+        print(
+            f"run {index + 1}: import {sample['import_seconds']:.3f}s  first page {sample['first_page_seconds']:.3f}s"
+            f"  warm-up {sample['warm_up_seconds']:.3f}s",
+            file=sys.stderr,
+        )
+
+    summary = {
+        key: {"median": statistics.median(s[key] for s in samples), "min": min(s[key] for s in samples)}
+        for key in ("import_seconds", "first_page_seconds", "warm_up_seconds")
+    }
+    summary["heavy_modules_after_import"] = samples[-1]["heavy_modules_after_import"]
+    print(json.dumps({"summary": summary, "samples": samples, "slowest_imports": slowest_imports(args.top)}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
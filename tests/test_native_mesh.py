@@ -0,0 +1,122 @@
+"""Cross-check the native inspector against hand-counted fixtures and, when installed, admesh."""
+
+from __future__ import annotations
+
+import re
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+import native_mesh  # noqa: E402
+
+TETRA_VERTICES = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float64)
+TETRA_FACES = np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]])
+
+
+def closed():
+    return TETRA_VERTICES, TETRA_FACES
+
+
+def hole():
+    return TETRA_VERTICES, TETRA_FACES[:3]
+
+
+def flipped():
+    faces = TETRA_FACES.copy()
+    faces[3] = faces[3][::-1]
+    return TETRA_VERTICES, faces
+
+
+def fin():
+    # A third face on edge 0-1, sticking out of the tetrahedron.
+    vertices = np.vstack([TETRA_VERTICES, [[0.5, -1.0, -1.0]]])
+    return vertices, np.vstack([TETRA_FACES, [[1, 0, 4]]])
+
+
+def two_shells():
+    vertices = np.vstack([TETRA_VERTICES, TETRA_VERTICES + 5.0])
+    return vertices, np.vstack([TETRA_FACES, TETRA_FACES + 4])
+
+
+def touching():
+    # The first tetrahedron mirrored through vertex 0: two solids sharing one vertex and no edge.
+    vertices = np.vstack([TETRA_VERTICES, -TETRA_VERTICES[1:]])
+    mirrored = np.where(TETRA_FACES == 0, 0, TETRA_FACES + 3)[:, ::-1]
+    return vertices, np.vstack([TETRA_FACES, mirrored])
+
+
+COUNT_KEYS = ("facets", "edges", "open_edges", "non_manifold_edges", "inconsistent_edges", "shells")
+FIXTURES = {
+    name: (build, dict(zip(COUNT_KEYS, counts)))
+    for name, build, counts in [
+        ("closed", closed, (4, 6, 0, 0, 0, 1)),
+        ("hole", hole, (3, 6, 3, 0, 0, 1)),
+        ("flipped", flipped, (4, 6, 0, 0, 3, 1)),
+        # The fin only meets the tetrahedron on a three-face edge, which links nothing.
+        ("fin", fin, (5, 8, 2, 1, 0, 2)),
+        ("two_shells", two_shells, (8, 12, 0, 0, 0, 2)),
+        ("touching", touching, (8, 12, 0, 0, 0, 2)),
+    ]
+}
+
+
+@pytest.mark.parametrize("name", FIXTURES)
+def test_inspect_arrays_counts(name):
+    build, expected = FIXTURES[name]
+    result = native_mesh.inspect_arrays(*build())
+    assert result == {"degenerate_facets": 0, **expected}
+
+
+@pytest.mark.parametrize("name", FIXTURES)
+def test_inspect_file_matches_arrays(name, tmp_path):
+    build, expected = FIXTURES[name]
+    path = tmp_path / f"{name}.stl"
+    native_mesh.write_binary_stl(path, *build())
+    assert native_mesh.inspect_file(path) == {"degenerate_facets": 0, **expected}
+
+
+@pytest.mark.parametrize("name", FIXTURES)
+def test_native_report_parses_back(name):
+    build, _expected = FIXTURES[name]
+    text, issues, metrics = main.native_inspect_report(native_mesh.inspect_arrays(*build()))
+    assert main.parse_issue_counts(text) == issues
+    assert main.parse_mesh_metrics(text) == metrics
+
+
+def admesh_stats(path: Path, *flags: str) -> dict[str, int]:
+    """admesh's own counts: the final column of its facet table plus its single-value statistics."""
+    _returncode, text = main.run_admesh_command(["admesh", *flags, str(path)])
+    stats = {
+        " ".join(match.group(1).lower().split()): int(match.group(3))
+        for match in main.ADMESH_STATUS_ROW_PATTERN.finditer(text)
+    }
+    for label in ("number of parts", "backwards edges"):
+        match = re.search(rf"{label}\s*:\s*(\d+)", text, flags=re.IGNORECASE)
+        stats[label] = int(match.group(1))
+    return stats
+
+
+@pytest.mark.skipif(shutil.which("admesh") is None, reason="admesh is not on PATH")
+@pytest.mark.parametrize("name", FIXTURES)
+def test_native_matches_admesh(name, tmp_path):
+    path = tmp_path / f"{name}.stl"
+    native_mesh.write_binary_stl(path, *FIXTURES[name][0]())
+    exact = admesh_stats(path, "--exact")
+    # admesh only counts parts while it walks neighbours to fix normal directions.
+    parts = admesh_stats(path, "--exact", "--normal-directions")["number of parts"]
+    _native_text, native_issues, native_metrics = main.run_native_inspect(path)
+
+    assert native_metrics == {"triangle_count": exact["number of facets"], "part_count": parts}
+    assert native_issues["disconnected_shells"] == parts - 1
+    # admesh sees every backwards edge once from each of its two faces.
+    assert native_issues["flipped_normals"] * 2 == exact["backwards edges"]
+    # admesh pairs faces per edge, so an open edge and the third face on a non-manifold
+    # edge both leave one facet edge unmatched (no fixture has more than three faces on an edge).
+    unmatched = sum(n * exact[f"facets with {n} disconnected edge{'s' if n > 1 else ''}"] for n in (1, 2, 3))
+    assert native_issues["holes_open_boundaries"] + native_issues["non_manifold_edges"] == unmatched
@@ -0,0 +1,74 @@
+"""Chunked uploads keep one running sha256 even when every chunk lands on a different worker."""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+import native_mesh  # noqa: E402
+
+CHUNK_BYTES = 4096
+
+
+class CountingFile:
+    def __init__(self, fh, reads: list[int]) -> None:
+        self.fh = fh
+        self.reads = reads
+
+    def read(self, *args):
+        data = self.fh.read(*args)
+        self.reads.append(len(data))
+        return data
+
+    def __getattr__(self, name: str):
+        return getattr(self.fh, name)
+
+
+@pytest.mark.skipif(not main.ResumableSha256.available(), reason="OpenSSL's libcrypto is not loadable")
+def test_chunked_upload_never_rereads_the_file(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    mesh_path = tmp_path / "mesh.stl"
+    native_mesh.write_binary_stl(mesh_path, rng.random((1200, 3)), np.arange(1200).reshape(-1, 3))
+    data = mesh_path.read_bytes()
+
+    client = main.app.test_client()
+    upload_id = client.post("/uploads", json={"filename": "m.stl", "size": len(data)}).get_json()["upload_id"]
+    upload_path = Path(main.session_store.get_upload(upload_id)["path"])
+
+    reads: list[int] = []
+    real_open = Path.open
+
+    def counting_open(self, *args, **kwargs):
+        fh = real_open(self, *args, **kwargs)
+        return CountingFile(fh, reads) if self == upload_path else fh
+
+    monkeypatch.setattr(Path, "open", counting_open)
+    monkeypatch.setattr(main, "file_sha256", lambda path: pytest.fail(f"re-hashed {path}"))
+
+    chunks = 0
+    for start in range(0, len(data), CHUNK_BYTES):
+        # Forget this process's stream, as if the chunk had landed on another worker.
+        main.upload_streams.clear()
+        stop = min(len(data), start + CHUNK_BYTES)
+        response = client.put(
+            f"/uploads/{upload_id}",
+            data=data[start:stop],
+            headers={"Content-Range": f"bytes {start}-{stop - 1}/{len(data)}"},
+        )
+        assert response.status_code == 200
+        chunks += 1
+
+    main.upload_streams.clear()
+    with main.app.app_context():
+        upload, error = main.take_complete_upload(upload_id)
+    assert error is None
+    assert upload["sha256"] == hashlib.sha256(data).hexdigest()
+    # Each reopen reads back the STL header only, never the bytes already hashed.
+    assert sum(reads) <= (chunks + 1) * main.STL_SNIFF_BYTES < len(data)